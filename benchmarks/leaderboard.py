@@ -0,0 +1,128 @@
+# Задержка таблицы лидеров в зависимости от размера истории партий.
+#
+#   python benchmarks/leaderboard.py --games 10000,100000,1000000,10000000
+#
+# Сравнивает агрегацию по всей истории current_games с чтением готовых итогов
+# из user_stats, которое используется в таблице лидеров. Таблицы создаются
+# заново во временной SQLite; другая база задаётся только явно через
+# --database-url, DATABASE_URL не читается.
+import argparse
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+import uuid
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--games", default="10000,100000,1000000,10000000")
+    parser.add_argument("--players", type=int, default=2000)
+    parser.add_argument("--limit", type=int, default=100)
+    parser.add_argument("--repeats", type=int, default=3)
+    parser.add_argument(
+        "--database-url",
+        help="отдельная база для замера: все её таблицы удаляются",
+    )
+    return parser.parse_args()
+
+
+ARGS = parse_args()
+# Адрес задаётся до импорта datasource.database, который создаёт engine
+os.environ["DATABASE_URL"] = (
+    ARGS.database_url or f"sqlite:///{tempfile.mkdtemp()}/leaderboard.db"
+)
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+
+from sqlalchemy import insert, select  # noqa: E402
+from sqlalchemy.dialects.postgresql import UUID as PG_UUID  # noqa: E402
+from sqlalchemy.ext.compiler import compiles  # noqa: E402
+
+
+@compiles(PG_UUID, "sqlite")
+def _uuid_sqlite(type_, compiler, **kw):
+    return "CHAR(32)"
+
+
+from datasource.database import Base, engine  # noqa: E402
+from datasource.migration.user_stats import rebuild  # noqa: E402
+from datasource.model.current_game_entity import CurrentGameEntity  # noqa: E402
+from datasource.repository.user_stats_repository import (  # noqa: E402
+    leaderboard_query,
+    player_totals_query,
+)
+from domain.model.game_state import GameState  # noqa: E402
+
+BATCH_SIZE = 50_000
+
+
+def aggregated_leaderboard_query(limit: int):
+    # Прежняя таблица лидеров: итоги считаются по всей истории на каждый запрос
+    totals = player_totals_query().subquery()
+    return (
+        select(totals.c.user_id, totals.c.win_ratio, totals.c.wins, totals.c.total)
+        .order_by(totals.c.win_ratio.desc(), totals.c.wins.desc(), totals.c.user_id)
+        .limit(limit)
+    )
+
+
+def add_games(count: int, players: list, rng: random.Random) -> None:
+    states = [GameState.PLAYER_WON.value] * 3 + [GameState.DRAW.value]
+    for start in range(0, count, BATCH_SIZE):
+        rows = []
+        for _ in range(min(BATCH_SIZE, count - start)):
+            player1, player2 = rng.sample(players, 2)
+            state = rng.choice(states)
+            winner = (
+                rng.choice([player1, player2])
+                if state == GameState.PLAYER_WON.value
+                else None
+            )
+            rows.append(
+                {
+                    "game_id": str(uuid.UUID(int=rng.getrandbits(128))),
+                    "game_type": "pvp",
+                    "game_state": state,
+                    "player1_id": player1,
+                    "player2_id": player2,
+                    "player1_symbol": 1,
+                    "player2_symbol": 2,
+                    "winner_id": winner,
+                }
+            )
+        with engine.begin() as connection:
+            connection.execute(insert(CurrentGameEntity), rows)
+
+
+def measure(query, repeats: int) -> float:
+    timings = []
+    with engine.connect() as connection:
+        for _ in range(repeats):
+            started = time.perf_counter()
+            connection.execute(query).all()
+            timings.append(time.perf_counter() - started)
+    return statistics.median(timings) * 1000
+
+
+def main(args: argparse.Namespace) -> None:
+    Base.metadata.drop_all(bind=engine)
+    Base.metadata.create_all(bind=engine)
+    rng = random.Random(42)
+    players = [uuid.UUID(int=rng.getrandbits(128)) for _ in range(args.players)]
+
+    print(f"{engine.dialect.name}, {args.players} players, limit {args.limit}")
+    print(f"{'games':>10} {'aggregate, ms':>14} {'user_stats, ms':>15}")
+    loaded = 0
+    for games in sorted(int(size) for size in args.games.split(",")):
+        add_games(games - loaded, players, rng)
+        loaded = games
+        rebuild(engine)
+        aggregated = measure(aggregated_leaderboard_query(args.limit), args.repeats)
+        stats = measure(leaderboard_query(args.limit), args.repeats)
+        print(f"{games:>10} {aggregated:>14.1f} {stats:>15.2f}")
+
+
+if __name__ == "__main__":
+    main(ARGS)
@@ -0,0 +1,209 @@
+# Задержка ходов во время всплеска входов (хэширование паролей scrypt).
+#
+#   RATE=1000 DURATION=5 python benchmarks/login_storm.py
+#
+# Сначала измеряются ходы PvP без нагрузки, затем те же ходы, пока генератор
+# присылает RATE входов в секунду. Приложение слушает HTTP-порт и, как воркер
+# gunicorn gthread, обслуживает запросы не больше чем SERVER_THREADS потоками
+# (по умолчанию 32): лишние соединения ждут свободного потока. Пул хэширования
+# настраивается как в приложении: PASSWORD_HASH_WORKERS, PASSWORD_HASH_QUEUE,
+# PASSWORD_HASH_COST. База берётся из DATABASE_URL (по умолчанию временная
+# SQLite).
+import collections
+import http.client
+import json
+import logging
+import os
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+if "DATABASE_URL" not in os.environ:
+    os.environ["DATABASE_URL"] = f"sqlite:///{tempfile.mkdtemp()}/login_storm.db"
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+
+from sqlalchemy.dialects.postgresql import UUID as PG_UUID  # noqa: E402
+from sqlalchemy.ext.compiler import compiles  # noqa: E402
+
+
+@compiles(PG_UUID, "sqlite")
+def _uuid_sqlite(type_, compiler, **kw):
+    return "CHAR(32)"
+
+
+from werkzeug.serving import BaseWSGIServer  # noqa: E402
+
+from di.container import Container  # noqa: E402
+from web.module.app import create_app  # noqa: E402
+
+RATE = int(os.getenv("RATE", "1000"))
+DURATION = float(os.getenv("DURATION", "5"))
+# Одновременных запросов входа у генератора. Должно быть больше, чем мест
+# в пуле хэширования (потоки + очередь), иначе генератор сам ждёт ответов
+# и не создаёт нагрузку RATE, а лишние входы не получают 503
+IN_FLIGHT = int(os.getenv("IN_FLIGHT", "512"))
+SERVER_THREADS = int(os.getenv("SERVER_THREADS", "32"))
+os.environ["SERVER_THREADS"] = str(SERVER_THREADS)
+
+
+class PooledWSGIServer(BaseWSGIServer):
+    # Соединение обслуживается в пуле из SERVER_THREADS потоков, как в gthread
+    request_queue_size = 4096
+
+    def __init__(self, app, threads):
+        super().__init__("127.0.0.1", 0, app)
+        self._pool = ThreadPoolExecutor(threads, thread_name_prefix="request")
+
+    def process_request(self, request, client_address):
+        self._pool.submit(self._process, request, client_address)
+
+    def _process(self, request, client_address):
+        try:
+            self.finish_request(request, client_address)
+        except Exception:
+            self.handle_error(request, client_address)
+        finally:
+            self.shutdown_request(request)
+
+    def server_close(self):
+        super().server_close()
+        self._pool.shutdown(wait=True)
+
+
+class Client:
+    def __init__(self, port):
+        self.port = port
+
+    def post(self, path, json=None, headers=None):
+        connection = http.client.HTTPConnection("127.0.0.1", self.port, timeout=60)
+        try:
+            connection.request(
+                "POST",
+                path,
+                body=None if json is None else _dumps(json),
+                headers={"Content-Type": "application/json", **(headers or {})},
+            )
+            response = connection.getresponse()
+            return response.status, _loads(response.read())
+        finally:
+            connection.close()
+
+
+def _dumps(value):
+    return json.dumps(value).encode()
+
+
+def _loads(body):
+    return json.loads(body) if body else None
+
+
+def login(client, name):
+    client.post("/auth/register", json={"login": name, "password": "secret"})
+    _, body = client.post("/auth/login", json={"login": name, "password": "secret"})
+    return {"Authorization": f"Bearer {body['access_token']}"}
+
+
+def new_game(client, players):
+    _, body = client.post(
+        "/game/create",
+        json={"game_type": "pvp", "board_size": 7, "win_length": 7},
+        headers=players[0],
+    )
+    game_id = body["game_id"]
+    client.post(f"/game/{game_id}/join", headers=players[1])
+    return game_id
+
+
+def move_latencies(client, players, seconds):
+    latencies = []
+    game_id, cell = new_game(client, players), 0
+    deadline = time.perf_counter() + seconds
+    while time.perf_counter() < deadline:
+        # Ходы по порядку клеток не дают линии из 7, новая партия - до
+        # заполнения поля
+        if cell >= 40:
+            game_id, cell = new_game(client, players), 0
+        started = time.perf_counter()
+        status, body = client.post(
+            f"/game/{game_id}/move", json={"cell": cell}, headers=players[cell % 2]
+        )
+        latencies.append(time.perf_counter() - started)
+        assert status == 200, body
+        cell += 1
+        time.sleep(0.01)
+    return latencies
+
+
+def storm(client, stop, codes):
+    in_flight = threading.Semaphore(IN_FLIGHT)
+    lock = threading.Lock()
+
+    def one():
+        try:
+            status, _ = client.post(
+                "/auth/login", json={"login": "alice", "password": "secret"}
+            )
+            with lock:
+                codes[status] += 1
+        finally:
+            in_flight.release()
+
+    with ThreadPoolExecutor(IN_FLIGHT) as executor:
+        started, sent = time.perf_counter(), 0
+        while not stop.is_set():
+            delay = started + sent / RATE - time.perf_counter()
+            if delay > 0:
+                time.sleep(delay)
+            in_flight.acquire()
+            executor.submit(one)
+            sent += 1
+
+
+def percentile(values, q):
+    values = sorted(values)
+    return values[int(q * (len(values) - 1))] * 1000
+
+
+def main():
+    logging.disable(logging.WARNING)
+    container = Container()
+    server = PooledWSGIServer(create_app(container), SERVER_THREADS)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    client = Client(server.server_port)
+    players = [login(client, "alice"), login(client, "bob")]
+
+    quiet = move_latencies(client, players, 3)
+
+    codes, stop = collections.Counter(), threading.Event()
+    generator = threading.Thread(target=storm, args=(client, stop, codes))
+    generator.start()
+    time.sleep(0.5)
+    started = time.perf_counter()
+    loaded = move_latencies(client, players, DURATION)
+    elapsed = time.perf_counter() - started + 0.5
+    stop.set()
+    generator.join()
+
+    hasher = container.user_service.password_hasher
+    print(
+        f"threads={SERVER_THREADS} workers={hasher.workers} "
+        f"queue={hasher.max_queue} cost={hasher.cost}"
+    )
+    for name, latencies in (("quiet", quiet), ("storm", loaded)):
+        print(
+            f"moves {name:<5} p50 {percentile(latencies, 0.5):.1f} ms "
+            f"p99 {percentile(latencies, 0.99):.1f} ms (n={len(latencies)})"
+        )
+    logins = sum(codes.values())
+    print(
+        f"logins {logins} in {elapsed:.1f}s ({logins / elapsed:.0f}/s): {dict(codes)}"
+    )
+    server.shutdown()
+    server.server_close()
+    container.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,6 @@
+from di.container import Container
+from web.module.asgi_app import create_asgi_app
+
+# Точка входа для ASGI-сервера: uvicorn asgi:app
+container = Container()
+app = create_asgi_app(container)
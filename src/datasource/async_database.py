@@ -0,0 +1,27 @@
+import os
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from sqlalchemy.pool import AsyncAdaptedQueuePool
+from datasource.database import DATABASE_URL, pool_options
+
+
+def _async_url(url: str) -> str:
+    # Тот же адрес БД, но через асинхронный драйвер asyncpg
+    if url.startswith("postgresql://"):
+        return "postgresql+asyncpg://" + url[len("postgresql://") :]
+    if url.startswith("postgresql+psycopg2://"):
+        return "postgresql+asyncpg://" + url[len("postgresql+psycopg2://") :]
+    return url
+
+
+ASYNC_DATABASE_URL = os.getenv("ASYNC_DATABASE_URL", _async_url(DATABASE_URL))
+
+# Класс пула задаётся явно: без него aiosqlite работает без пула и не
+# принимает настройки DB_*
+async_engine = create_async_engine(
+    ASYNC_DATABASE_URL,
+    echo=os.getenv("DB_ECHO", "false").lower() == "true",
+    **pool_options(AsyncAdaptedQueuePool),
+)
+
+# Асинхронные репозитории открывают короткую сессию на каждую операцию
+AsyncSessionLocal = async_sessionmaker(async_engine, expire_on_commit=False)
@@ -1,17 +1,23 @@
+from typing import Dict, List
 from uuid import UUID
 from domain.model.game_field import GameField
 from domain.model.current_game import CurrentGame
+from domain.model.difficulty import Difficulty
 from domain.model.game_state import GameState
 from domain.model.game_type import GameType
+from domain.model.leader_stats import LeaderStats
+from domain.model.lobby_game import LobbyGame
 from domain.model.player_symbol import PlayerSymbol
-from datasource.model.game_field_entity import GameFieldEntity
+from domain.model.users import User
 from datasource.model.current_game_entity import CurrentGameEntity
 
 
 class GameMapper:
     @staticmethod
     def to_domain(entity: CurrentGameEntity) -> CurrentGame:
-        game_field = GameField(board=entity.game_field.board)
+        game_field = GameField(
+            entity.x_mask, entity.o_mask, entity.board_size, entity.win_length
+        )
         game_id = (
             UUID(entity.game_id) if isinstance(entity.game_id, str) else entity.game_id
         )
@@ -28,17 +34,46 @@ class GameMapper:
             current_player_id=entity.current_player_id,
             winner_id=entity.winner_id,
             created_at=entity.created_at,
+            difficulty=Difficulty(entity.difficulty) if entity.difficulty else None,
+            version=entity.version,
+            updated_at=entity.updated_at,
         )
 
     @staticmethod
-    def to_entity(domain: CurrentGame) -> CurrentGameEntity:
-        game_field_entity = GameFieldEntity(board=domain.game_field.board)
+    def to_lobby_game(row) -> LobbyGame:
+        # Строка запроса лобби: game_id, game_type, player1_id, created_at,
+        # board_size, win_length
+        return LobbyGame(
+            game_id=UUID(row.game_id) if isinstance(row.game_id, str) else row.game_id,
+            game_type=GameType(row.game_type),
+            player1_id=row.player1_id,
+            created_at=row.created_at,
+            board_size=row.board_size,
+            win_length=row.win_length,
+        )
 
+    @staticmethod
+    def to_leaders(rows, users: Dict[UUID, User]) -> List[LeaderStats]:
+        # Строки рейтинга (user_id, win_ratio, wins, total); логин - из users
+        result = []
+        for user_id, win_ratio, wins, total in rows:
+            user = users.get(user_id)
+            login = user.login if user else str(user_id)
+            result.append(
+                LeaderStats(user_id=user_id, login=login, win_ratio=win_ratio)
+            )
+        return result
+
+    @staticmethod
+    def to_entity(domain: CurrentGame) -> CurrentGameEntity:
         entity = CurrentGameEntity()
         entity.game_id = str(domain.game_id)
-        entity.game_field = game_field_entity
+        entity.board_size = domain.game_field.size
+        entity.x_mask = domain.game_field.x_mask
+        entity.o_mask = domain.game_field.o_mask
         entity.game_type = domain.game_type.value
         entity.game_state = domain.game_state.value
+        entity.win_length = domain.game_field.win_length
         entity.player1_id = domain.player1_id
         entity.player2_id = domain.player2_id
         entity.player1_symbol = domain.player1_symbol.value
@@ -46,5 +81,8 @@ class GameMapper:
         entity.current_player_id = domain.current_player_id
         entity.winner_id = domain.winner_id
         entity.created_at = domain.created_at
+        entity.difficulty = domain.difficulty.value if domain.difficulty else None
+        entity.version = domain.version
+        entity.updated_at = domain.updated_at
 
         return entity
@@ -0,0 +1,15 @@
+from datasource.model.user_stats_entity import UserStatsEntity
+from domain.model.user_stats import UserStats
+
+
+class UserStatsMapper:
+    @staticmethod
+    def to_domain(entity: UserStatsEntity) -> UserStats:
+        return UserStats(
+            user_id=entity.user_id,
+            wins=entity.wins,
+            losses=entity.losses,
+            draws=entity.draws,
+            total=entity.total,
+            win_ratio=entity.win_ratio,
+        )
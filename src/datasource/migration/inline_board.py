@@ -0,0 +1,158 @@
+import json
+from typing import List, Tuple
+from sqlalchemy import inspect, text
+from sqlalchemy.engine import Engine
+from domain.model.game_field import GameField
+from domain.model.game_state import GameState
+from datasource.database import engine as default_engine
+
+BATCH_SIZE = 1000
+
+
+# Разовый перенос поля из game_fields (JSON в отдельной строке на каждое
+# сохранение) в колонки board_size / x_mask / o_mask таблицы current_games.
+# После переноса game_field_id и вся таблица game_fields удаляются, вместе
+# с накопившимися осиротевшими строками. Партии с испорченным полем или без
+# него прерываются (aborted), а их строки game_fields и прежнее состояние
+# сначала копируются в game_fields_quarantine. Повторный запуск ничего не меняет.
+# Возвращает число перенесённых партий, id партий с испорченным полем и id
+# партий без строки в game_fields.
+def migrate(engine: Engine) -> Tuple[int, List[int], List[int]]:
+    inspector = inspect(engine)
+    if not inspector.has_table("current_games"):
+        return 0, [], []
+    columns = {column["name"] for column in inspector.get_columns("current_games")}
+
+    migrated = 0
+    with engine.begin() as connection:
+        # Колонки, появившиеся у партий раньше, тоже добавляются к старой схеме
+        for column in (
+            "win_length INTEGER NOT NULL DEFAULT 3",
+            "difficulty VARCHAR(10)",
+            "board_size SMALLINT NOT NULL DEFAULT 3",
+            "x_mask BIGINT NOT NULL DEFAULT 0",
+            "o_mask BIGINT NOT NULL DEFAULT 0",
+        ):
+            if column.split()[0] not in columns:
+                connection.execute(
+                    text(f"ALTER TABLE current_games ADD COLUMN {column}")
+                )
+        if "game_field_id" not in columns:
+            return 0, [], []
+
+        rows = connection.execute(
+            text(
+                "SELECT cg.id, cg.win_length, cg.game_state, cg.game_field_id,"
+                " gf.id, gf.board_data"
+                " FROM current_games cg"
+                " LEFT JOIN game_fields gf ON gf.id = cg.game_field_id"
+            )
+        )
+        batch = []
+        quarantined = []
+        skipped = []
+        missing = []
+        for game_id, win_length, game_state, field_id, found_id, board_data in rows:
+            game_field = None
+            if found_id is None:
+                missing.append(game_id)
+            else:
+                try:
+                    game_field = GameField.from_board(
+                        json.loads(board_data), win_length
+                    )
+                except (TypeError, ValueError):
+                    skipped.append(game_id)
+            if game_field is None:
+                # Поле не восстановить: исходная строка и состояние партии
+                # сохраняются в game_fields_quarantine, а сама партия
+                # прерывается, а не продолжается на выдуманном пустом поле
+                quarantined.append(
+                    {
+                        "game_id": game_id,
+                        "game_field_id": field_id,
+                        "board_data": board_data,
+                        "game_state": game_state,
+                    }
+                )
+                continue
+            batch.append(
+                {
+                    "id": game_id,
+                    "board_size": game_field.size,
+                    "win_length": game_field.win_length,
+                    "x_mask": game_field.x_mask,
+                    "o_mask": game_field.o_mask,
+                }
+            )
+            if len(batch) >= BATCH_SIZE:
+                migrated += _write(connection, batch)
+                batch = []
+        if batch:
+            migrated += _write(connection, batch)
+        if quarantined:
+            _quarantine(connection, quarantined)
+
+        connection.execute(text("ALTER TABLE current_games DROP COLUMN game_field_id"))
+        connection.execute(text("DROP TABLE game_fields"))
+    return migrated, skipped, missing
+
+
+def _write(connection, batch) -> int:
+    connection.execute(
+        text(
+            "UPDATE current_games"
+            " SET board_size = :board_size, win_length = :win_length,"
+            " x_mask = :x_mask, o_mask = :o_mask"
+            " WHERE id = :id"
+        ),
+        batch,
+    )
+    return len(batch)
+
+
+def _quarantine(connection, rows) -> None:
+    connection.execute(
+        text(
+            "CREATE TABLE IF NOT EXISTS game_fields_quarantine ("
+            " game_id INTEGER PRIMARY KEY, game_field_id INTEGER,"
+            " board_data TEXT, game_state VARCHAR(30))"
+        )
+    )
+    connection.execute(
+        text(
+            "INSERT INTO game_fields_quarantine"
+            " (game_id, game_field_id, board_data, game_state)"
+            " VALUES (:game_id, :game_field_id, :board_data, :game_state)"
+        ),
+        rows,
+    )
+    connection.execute(
+        text(
+            "UPDATE current_games"
+            " SET game_state = :aborted, current_player_id = NULL"
+            " WHERE id = :game_id"
+        ),
+        [
+            {"game_id": row["game_id"], "aborted": GameState.ABORTED.value}
+            for row in rows
+        ],
+    )
+
+
+if __name__ == "__main__":
+    # python -m datasource.migration.inline_board
+    count, skipped, missing = migrate(default_engine)
+    print(f"Boards moved into current_games: {count}")
+    if skipped:
+        print(
+            f"Malformed boards moved to game_fields_quarantine ({len(skipped)}),"
+            f" current_games.id: {', '.join(str(game_id) for game_id in skipped)}"
+        )
+    if missing:
+        print(
+            f"Games without a game_fields row ({len(missing)}),"
+            f" current_games.id: {', '.join(str(game_id) for game_id in missing)}"
+        )
+    if skipped or missing:
+        print("These games are now aborted; their original state is kept in quarantine")
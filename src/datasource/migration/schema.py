@@ -0,0 +1,67 @@
+from typing import List
+from sqlalchemy import inspect, text
+from sqlalchemy.engine import Engine
+from sqlalchemy.schema import CreateColumn, CreateIndex
+from datasource.database import Base, engine as default_engine
+
+# Модели регистрируют свои таблицы в Base.metadata
+from datasource.model.current_game_entity import CurrentGameEntity  # noqa: F401
+from datasource.model.user_entity import UserEntity  # noqa: F401
+from datasource.model.user_stats_entity import UserStatsEntity  # noqa: F401
+
+
+# Приложение при старте только создаёт недостающие таблицы (create_all) и не
+# меняет существующие. Колонки и индексы, объявленные в моделях позже,
+# добавляет этот скрипт до запуска новой версии. Повторный запуск ничего не меняет.
+# Колонку без значения по умолчанию на стороне БД, не допускающую NULL,
+# в заполненную таблицу не добавить: для неё нужна отдельная миграция.
+def add_missing_columns(engine: Engine) -> List[str]:
+    inspector = inspect(engine)
+    added = []
+    with engine.begin() as connection:
+        for table in Base.metadata.sorted_tables:
+            if not inspector.has_table(table.name):
+                continue
+            existing = {column["name"] for column in inspector.get_columns(table.name)}
+            for column in table.columns:
+                if column.name in existing:
+                    continue
+                if not column.nullable and column.server_default is None:
+                    continue
+                ddl = CreateColumn(column).compile(dialect=engine.dialect)
+                connection.execute(text(f"ALTER TABLE {table.name} ADD COLUMN {ddl}"))
+                added.append(f"{table.name}.{column.name}")
+    return added
+
+
+# На Postgres индекс строится через CREATE INDEX CONCURRENTLY: запись в таблицу
+# не блокируется. Такой DDL не выполняется в транзакции, поэтому соединение
+# работает в AUTOCOMMIT. Прерванная постройка оставляет индекс INVALID: его
+# нужно удалить (DROP INDEX CONCURRENTLY) и запустить скрипт снова
+def add_missing_indexes(engine: Engine) -> List[str]:
+    inspector = inspect(engine)
+    concurrently = engine.dialect.name == "postgresql"
+    added = []
+    with engine.connect().execution_options(isolation_level="AUTOCOMMIT") as connection:
+        for table in Base.metadata.sorted_tables:
+            if not inspector.has_table(table.name):
+                continue
+            existing = {index["name"] for index in inspector.get_indexes(table.name)}
+            for index in sorted(table.indexes, key=lambda index: index.name):
+                if index.name in existing:
+                    continue
+                ddl = str(CreateIndex(index).compile(dialect=engine.dialect))
+                if concurrently:
+                    ddl = ddl.replace("INDEX", "INDEX CONCURRENTLY", 1)
+                connection.execute(text(ddl))
+                added.append(index.name)
+    return added
+
+
+if __name__ == "__main__":
+    # python -m datasource.migration.schema
+    Base.metadata.create_all(bind=default_engine)
+    columns = add_missing_columns(default_engine)
+    print(f"Columns added: {', '.join(columns) or 'none'}")
+    indexes = add_missing_indexes(default_engine)
+    print(f"Indexes added: {', '.join(indexes) or 'none'}")
@@ -0,0 +1,40 @@
+from sqlalchemy import delete, func, insert, select, text
+from sqlalchemy.engine import Engine
+from datasource.database import Base, engine as default_engine
+from datasource.model.user_stats_entity import UserStatsEntity
+from datasource.repository.user_stats_repository import player_totals_query
+
+
+# Пересчёт user_stats по всей истории current_games: заполнение таблицы для
+# уже сыгранных партий и исправление расхождений. Выполняется одной транзакцией.
+def rebuild(engine: Engine) -> int:
+    Base.metadata.create_all(bind=engine, tables=[UserStatsEntity.__table__])
+    with engine.begin() as connection:
+        if connection.dialect.name == "postgresql":
+            # Партии, завершившиеся во время пересчёта, дождутся его окончания
+            # и добавят свои итоги уже к пересчитанным строкам
+            connection.execute(text("LOCK TABLE user_stats IN EXCLUSIVE MODE"))
+        connection.execute(delete(UserStatsEntity))
+        totals = player_totals_query().subquery()
+        connection.execute(
+            insert(UserStatsEntity).from_select(
+                ["user_id", "wins", "losses", "draws", "total", "win_ratio"],
+                select(
+                    totals.c.user_id,
+                    totals.c.wins,
+                    totals.c.losses,
+                    totals.c.draws,
+                    totals.c.total,
+                    totals.c.win_ratio,
+                ),
+            )
+        )
+        return connection.execute(
+            select(func.count()).select_from(UserStatsEntity)
+        ).scalar()
+
+
+if __name__ == "__main__":
+    # python -m datasource.migration.user_stats
+    count = rebuild(default_engine)
+    print(f"Player stats rebuilt: {count}")
@@ -1,8 +1,9 @@
-from sqlalchemy import Column, String, Integer, ForeignKey, DateTime
-from sqlalchemy.orm import relationship
+from sqlalchemy import BigInteger, Column, String, Integer, SmallInteger, DateTime
+from sqlalchemy import Index
 from sqlalchemy.dialects.postgresql import UUID as PG_UUID
 from datasource.database import Base
 from datetime import datetime
+from domain.model.game_state import GameState
 
 
 class CurrentGameEntity(Base):
@@ -10,10 +11,16 @@ class CurrentGameEntity(Base):
 
     id = Column(Integer, primary_key=True, autoincrement=True)
     game_id = Column(String(36), unique=True, nullable=False, index=True)
-    game_field_id = Column(Integer, ForeignKey("game_fields.id"), nullable=False)
+
+    # Поле хранится прямо в строке партии: размер и битовые маски X и O
+    board_size = Column(SmallInteger, nullable=False, default=3, server_default="3")
+    x_mask = Column(BigInteger, nullable=False, default=0, server_default="0")
+    o_mask = Column(BigInteger, nullable=False, default=0, server_default="0")
 
     game_type = Column(String(10), nullable=False)
     game_state = Column(String(30), nullable=False)
+    win_length = Column(Integer, nullable=False, default=3, server_default="3")
+    difficulty = Column(String(10), nullable=True)
 
     player1_id = Column(PG_UUID(as_uuid=True), nullable=False)
     player2_id = Column(PG_UUID(as_uuid=True), nullable=True)
@@ -25,7 +32,56 @@ class CurrentGameEntity(Base):
 
     created_at = Column(DateTime, nullable=False, default=datetime.utcnow)
 
-    game_field = relationship("GameFieldEntity", lazy="joined")
+    # Растёт на единицу при каждой записи партии, служит ETag
+    version = Column(Integer, nullable=False, default=1, server_default="1")
+    # Время последней записи: по нему находятся партии, потерявшие фоновый ход
+    updated_at = Column(DateTime, nullable=True)
+
+    # История игрока читается постранично отдельно по каждому месту в партии,
+    # лобби - по короткому индексу одних только ожидающих второго игрока партий,
+    # незаконченная партия игрока для быстрой игры - по индексам ещё идущих партий
+    __table_args__ = (
+        Index(
+            "ix_current_games_player1_history",
+            player1_id,
+            created_at.desc(),
+            game_id.desc(),
+            postgresql_where=game_state.in_(
+                [GameState.PLAYER_WON.value, GameState.DRAW.value]
+            ),
+        ),
+        Index(
+            "ix_current_games_player2_history",
+            player2_id,
+            created_at.desc(),
+            game_id.desc(),
+            postgresql_where=game_state.in_(
+                [GameState.PLAYER_WON.value, GameState.DRAW.value]
+            ),
+        ),
+        Index(
+            "ix_current_games_player1_active",
+            player1_id,
+            created_at.desc(),
+            postgresql_where=game_state.in_(
+                [GameState.WAITING_FOR_PLAYER.value, GameState.PLAYER_TURN.value]
+            ),
+        ),
+        Index(
+            "ix_current_games_player2_active",
+            player2_id,
+            created_at.desc(),
+            postgresql_where=game_state.in_(
+                [GameState.WAITING_FOR_PLAYER.value, GameState.PLAYER_TURN.value]
+            ),
+        ),
+        Index(
+            "ix_current_games_waiting",
+            created_at,
+            game_id,
+            postgresql_where=game_state == GameState.WAITING_FOR_PLAYER.value,
+        ),
+    )
 
     def __repr__(self):
         return (
@@ -0,0 +1,26 @@
+from sqlalchemy import Column, Float, Index, Integer
+from sqlalchemy.dialects.postgresql import UUID as PG_UUID
+from datasource.database import Base
+
+
+# Итоги игрока, обновляются в той же транзакции, что и завершение партии
+class UserStatsEntity(Base):
+    __tablename__ = "user_stats"
+
+    user_id = Column(PG_UUID(as_uuid=True), primary_key=True)
+    wins = Column(Integer, nullable=False, default=0)
+    losses = Column(Integer, nullable=False, default=0)
+    draws = Column(Integer, nullable=False, default=0)
+    total = Column(Integer, nullable=False, default=0)
+    win_ratio = Column(Float, nullable=False, default=0.0)
+
+    # Таблица лидеров читается по этому индексу первыми limit строками
+    __table_args__ = (
+        Index("ix_user_stats_leaderboard", win_ratio.desc(), wins.desc(), user_id),
+    )
+
+    def __repr__(self):
+        return (
+            f"<UserStatsEntity(user_id='{self.user_id}', wins={self.wins}, "
+            f"total={self.total})>"
+        )
@@ -0,0 +1,68 @@
+import logging
+import select
+import threading
+from typing import Callable, Optional
+import psycopg2
+from psycopg2.extensions import ISOLATION_LEVEL_AUTOCOMMIT
+from sqlalchemy import text
+from sqlalchemy.engine import Engine
+from domain.service.event_transport_interface import EventTransportInterface
+
+logger = logging.getLogger(__name__)
+
+
+# Рассылка событий между воркерами через LISTEN/NOTIFY самой PostgreSQL:
+# отдельной инфраструктуры не требуется. Каждый воркер держит одно
+# слушающее соединение в фоновом потоке, публикация идёт через пул engine.
+class PostgresEventTransport(EventTransportInterface):
+
+    CHANNEL = "game_events"
+
+    def __init__(self, engine: Engine, channel: str = CHANNEL, poll_interval=5.0):
+        self._engine = engine
+        self._channel = channel
+        self._poll_interval = poll_interval
+        self._deliver: Optional[Callable[[str], None]] = None
+        self._stopped = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self, deliver: Callable[[str], None]) -> None:
+        self._deliver = deliver
+        self._stopped.clear()
+        self._thread = threading.Thread(
+            target=self._listen, name="game-events", daemon=True
+        )
+        self._thread.start()
+
+    def publish(self, message: str) -> None:
+        with self._engine.connect() as connection:
+            connection.execute(
+                text("SELECT pg_notify(:channel, :message)"),
+                {"channel": self._channel, "message": message},
+            )
+            connection.commit()
+
+    def close(self) -> None:
+        self._stopped.set()
+
+    def _listen(self) -> None:
+        while not self._stopped.is_set():
+            connection = None
+            try:
+                connection = psycopg2.connect(
+                    **self._engine.url.translate_connect_args(username="user")
+                )
+                connection.set_isolation_level(ISOLATION_LEVEL_AUTOCOMMIT)
+                with connection.cursor() as cursor:
+                    cursor.execute(f'LISTEN "{self._channel}"')
+                while not self._stopped.is_set():
+                    if select.select([connection], [], [], self._poll_interval)[0]:
+                        connection.poll()
+                        while connection.notifies:
+                            self._deliver(connection.notifies.pop(0).payload)
+            except psycopg2.Error:
+                logger.exception("Game events listener lost its connection")
+                self._stopped.wait(1.0)
+            finally:
+                if connection is not None:
+                    connection.close()
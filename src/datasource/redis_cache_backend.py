@@ -0,0 +1,120 @@
+import logging
+import struct
+import threading
+from typing import Dict, List, Optional
+import redis
+from domain.service.cache_backend_interface import CacheBackendInterface
+
+logger = logging.getLogger(__name__)
+
+# Перед значением хранится его версия (0 - запись без версии)
+_VERSION = struct.Struct(">Q")
+
+
+# Общий кэш узлов через сервер с протоколом Redis. Недоступность сервера не
+# ломает запросы: чтение считается промахом, запись пропускается.
+class RedisCacheBackend(CacheBackendInterface):
+    remote = True
+    MAX_RETRIES = 3
+
+    def __init__(self, url: str, socket_timeout: float = 0.5):
+        self._client = redis.Redis.from_url(
+            url, socket_timeout=socket_timeout, socket_connect_timeout=socket_timeout
+        )
+        self._lock = threading.Lock()
+        self._errors = 0
+        self._stale_writes = 0
+
+    def get(self, key: str) -> Optional[bytes]:
+        try:
+            data = self._client.get(key)
+        except redis.RedisError:
+            self._count_error("get", key)
+            return None
+        return data[_VERSION.size :] if data is not None else None
+
+    def set(
+        self, key: str, value: bytes, ttl: float, version: Optional[int] = None
+    ) -> bool:
+        data = _VERSION.pack(version or 0) + value
+        try:
+            if version is None:
+                self._client.set(key, data, px=int(ttl * 1000))
+                return True
+            return self._set_if_newer(key, data, version, int(ttl * 1000))
+        except redis.RedisError:
+            self._count_error("set", key)
+            # Прежнее значение могло устареть, поэтому его лучше удалить
+            self.delete(key)
+            return False
+
+    def _set_if_newer(self, key: str, data: bytes, version: int, ttl_ms: int) -> bool:
+        # WATCH/MULTI/EXEC: запись проходит, только если ключ не изменился
+        # между проверкой версии и записью
+        with self._client.pipeline() as pipe:
+            for _ in range(self.MAX_RETRIES):
+                try:
+                    pipe.watch(key)
+                    current = pipe.get(key)
+                    current_version = (
+                        _VERSION.unpack_from(current)[0] if current is not None else -1
+                    )
+                    if current_version >= version:
+                        # Та же версия уже записана (например, этим же узлом)
+                        pipe.unwatch()
+                        if current_version > version:
+                            with self._lock:
+                                self._stale_writes += 1
+                        return False
+                    pipe.multi()
+                    pipe.set(key, data, px=ttl_ms)
+                    pipe.execute()
+                    return True
+                except redis.WatchError:
+                    continue
+        # Ключ постоянно меняют другие узлы: оставляем его им
+        return False
+
+    def get_many(self, keys: List[str]) -> List[Optional[bytes]]:
+        # Один MGET вместо запроса на каждый ключ
+        if not keys:
+            return []
+        try:
+            values = self._client.mget(keys)
+        except redis.RedisError:
+            self._count_error("mget", keys[0])
+            return [None] * len(keys)
+        return [data[_VERSION.size :] if data is not None else None for data in values]
+
+    def set_many(self, items: Dict[str, bytes], ttl: float) -> None:
+        if not items:
+            return
+        try:
+            with self._client.pipeline(transaction=False) as pipe:
+                for key, value in items.items():
+                    pipe.set(key, _VERSION.pack(0) + value, px=int(ttl * 1000))
+                pipe.execute()
+        except redis.RedisError:
+            self._count_error("set_many", next(iter(items)))
+
+    def delete(self, key: str) -> None:
+        try:
+            self._client.delete(key)
+        except redis.RedisError:
+            self._count_error("delete", key)
+
+    def get_stats(self) -> dict:
+        with self._lock:
+            return {
+                "backend": "redis",
+                "errors": self._errors,
+                "stale_writes": self._stale_writes,
+            }
+
+    def close(self) -> None:
+        self._client.close()
+
+    def _count_error(self, operation: str, key: str) -> None:
+        with self._lock:
+            self._errors += 1
+        logger.warning("Cache %s failed for %s", operation, key, exc_info=True)
@@ -0,0 +1,142 @@
+from datetime import datetime
+from typing import Optional, List, Tuple
+from uuid import UUID
+from sqlalchemy import Row, select, update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+from datasource.model.current_game_entity import CurrentGameEntity
+from datasource.repository.game_repository import (
+    active_game_query,
+    claim_query,
+    history_query,
+    lobby_query,
+)
+from datasource.repository.user_stats_repository import (
+    FINISHED_STATES,
+    game_outcomes,
+    increment_stats,
+    insert_stats,
+    leaderboard_query,
+)
+from domain.model.game_state import GameState
+
+
+class AsyncGameRepository:
+
+    def __init__(self, session_factory: async_sessionmaker[AsyncSession]):
+        self._session_factory = session_factory
+
+    async def save_game(self, game: CurrentGameEntity) -> CurrentGameEntity:
+        async with self._session_factory() as session:
+            session.add(game)
+            await session.commit()
+            return game
+
+    async def update_game(self, game: CurrentGameEntity, expected_version: int) -> bool:
+        finished = game.game_state in FINISHED_STATES
+        statement = update(CurrentGameEntity).where(
+            CurrentGameEntity.game_id == game.game_id,
+            CurrentGameEntity.version == expected_version,
+        )
+        async with self._session_factory() as session:
+            result = await session.execute(
+                statement.values(
+                    x_mask=game.x_mask,
+                    o_mask=game.o_mask,
+                    game_state=game.game_state,
+                    player2_id=game.player2_id,
+                    current_player_id=game.current_player_id,
+                    winner_id=game.winner_id,
+                    version=game.version,
+                    updated_at=game.updated_at,
+                )
+            )
+            # Итоги игроков учитываются один раз: завершить партию может только
+            # один UPDATE, заставший прочитанную версию
+            if result.rowcount and finished:
+                await self._record_finished_game(session, game)
+            await session.commit()
+            return bool(result.rowcount)
+
+    @staticmethod
+    async def _record_finished_game(
+        session: AsyncSession, game: CurrentGameEntity
+    ) -> None:
+        for user_id, outcome in game_outcomes(game):
+            result = await session.execute(increment_stats(user_id, outcome))
+            if result.rowcount:
+                continue
+            try:
+                async with session.begin_nested():
+                    await session.execute(insert_stats(user_id, outcome))
+            except IntegrityError:
+                await session.execute(increment_stats(user_id, outcome))
+
+    async def get_game(self, game_id: UUID) -> Optional[CurrentGameEntity]:
+        async with self._session_factory() as session:
+            result = await session.execute(
+                select(CurrentGameEntity).where(
+                    CurrentGameEntity.game_id == str(game_id)
+                )
+            )
+            return result.scalars().first()
+
+    async def claim_game(
+        self,
+        player_id: UUID,
+        board_size: int,
+        win_length: int,
+        game_id: Optional[UUID] = None,
+    ) -> Optional[CurrentGameEntity]:
+        async with self._session_factory() as session:
+            result = await session.execute(
+                claim_query(player_id, board_size, win_length, game_id)
+            )
+            entity = result.scalars().first()
+            await session.commit()
+            return entity
+
+    async def get_active_game(
+        self, player_id: UUID, board_size: int, win_length: int
+    ) -> Optional[CurrentGameEntity]:
+        async with self._session_factory() as session:
+            result = await session.execute(
+                active_game_query(player_id, board_size, win_length)
+            )
+            return result.scalars().first()
+
+    async def get_version(self, game_id: UUID) -> Optional[int]:
+        async with self._session_factory() as session:
+            # None и для партии, ждущей хода компьютера: её читают целиком
+            result = await session.execute(
+                select(CurrentGameEntity.version).where(
+                    CurrentGameEntity.game_id == str(game_id),
+                    CurrentGameEntity.game_state != GameState.COMPUTER_THINKING.value,
+                )
+            )
+            return result.scalar()
+
+    async def get_available_games(
+        self,
+        limit: int,
+        after: Optional[Tuple[datetime, UUID]] = None,
+        game_type: Optional[str] = None,
+    ) -> List[Row]:
+        async with self._session_factory() as session:
+            result = await session.execute(lobby_query(limit, after, game_type))
+            return list(result.all())
+
+    async def get_completed_games_by_user(
+        self,
+        user_id: UUID,
+        limit: int,
+        after: Optional[Tuple[datetime, UUID]] = None,
+    ) -> List[CurrentGameEntity]:
+        async with self._session_factory() as session:
+            result = await session.execute(history_query(user_id, limit, after))
+            return list(result.scalars().all())
+
+    async def get_leaderboard(self, limit: int) -> List[Tuple[UUID, float, int, int]]:
+        async with self._session_factory() as session:
+            result = await session.execute(leaderboard_query(limit))
+            return [tuple(row) for row in result]
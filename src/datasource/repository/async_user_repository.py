@@ -0,0 +1,39 @@
+from typing import List, Optional
+from uuid import UUID
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+from datasource.model.user_entity import UserEntity
+
+
+class AsyncUserRepository:
+    def __init__(self, session_factory: async_sessionmaker[AsyncSession]):
+        self.session_factory = session_factory
+
+    async def save(self, user: UserEntity) -> UserEntity:
+        async with self.session_factory() as session:
+            session.add(user)
+            await session.commit()
+            return user
+
+    async def find_by_login(self, login: str) -> Optional[UserEntity]:
+        async with self.session_factory() as session:
+            result = await session.execute(
+                select(UserEntity).where(UserEntity.login == login)
+            )
+            return result.scalars().first()
+
+    async def find_by_id(self, user_id: UUID) -> Optional[UserEntity]:
+        async with self.session_factory() as session:
+            result = await session.execute(
+                select(UserEntity).where(UserEntity.user_id == user_id)
+            )
+            return result.scalars().first()
+
+    async def find_by_ids(self, user_ids: List[UUID]) -> List[UserEntity]:
+        if not user_ids:
+            return []
+        async with self.session_factory() as session:
+            result = await session.execute(
+                select(UserEntity).where(UserEntity.user_id.in_(user_ids))
+            )
+            return list(result.scalars().all())
@@ -1,9 +1,19 @@
+from datetime import datetime
 from typing import Optional, List, Tuple
 from uuid import UUID
-from collections import defaultdict
+from sqlalchemy import Row, Select, Update, select, tuple_, union_all, update
 from sqlalchemy.orm import Session
 from datasource.model.current_game_entity import CurrentGameEntity
+from datasource.repository.user_stats_repository import (
+    FINISHED_STATES,
+    leaderboard_query,
+    record_finished_game,
+)
 from domain.model.game_state import GameState
+from domain.model.game_type import GameType
+
+# Ещё идущие PvP-партии (индексы ix_current_games_player*_active)
+ACTIVE_STATES = [GameState.WAITING_FOR_PLAYER.value, GameState.PLAYER_TURN.value]
 
 
 class GameRepository:
@@ -19,15 +29,20 @@ class GameRepository:
         )
 
         if existing_game:
-            existing_game.game_field = game.game_field
+            existing_game.board_size = game.board_size
+            existing_game.x_mask = game.x_mask
+            existing_game.o_mask = game.o_mask
             existing_game.game_type = game.game_type
             existing_game.game_state = game.game_state
+            existing_game.win_length = game.win_length
+            existing_game.difficulty = game.difficulty
             existing_game.player1_id = game.player1_id
             existing_game.player2_id = game.player2_id
             existing_game.player1_symbol = game.player1_symbol
             existing_game.player2_symbol = game.player2_symbol
             existing_game.current_player_id = game.current_player_id
             existing_game.winner_id = game.winner_id
+            existing_game.version = game.version
             self._session.merge(existing_game)
             self._session.commit()
             return existing_game
@@ -37,6 +52,63 @@ class GameRepository:
             self._session.refresh(game)
             return game
 
+    # Запись уже загруженной партии одним UPDATE без предварительного SELECT.
+    # Оптимистичная блокировка: строка меняется, только если её версия всё ещё
+    # равна прочитанной; иначе UPDATE не затрагивает строк и возвращается False
+    def update_game(self, game: CurrentGameEntity, expected_version: int) -> bool:
+        finished = game.game_state in FINISHED_STATES
+        try:
+            query = self._session.query(CurrentGameEntity).filter(
+                CurrentGameEntity.game_id == game.game_id,
+                CurrentGameEntity.version == expected_version,
+            )
+            updated = query.update(
+                {
+                    CurrentGameEntity.x_mask: game.x_mask,
+                    CurrentGameEntity.o_mask: game.o_mask,
+                    CurrentGameEntity.game_state: game.game_state,
+                    CurrentGameEntity.player2_id: game.player2_id,
+                    CurrentGameEntity.current_player_id: game.current_player_id,
+                    CurrentGameEntity.winner_id: game.winner_id,
+                    CurrentGameEntity.version: game.version,
+                    CurrentGameEntity.updated_at: game.updated_at,
+                },
+                synchronize_session=False,
+            )
+            # Итоги игроков учитываются один раз: завершить партию может только
+            # один UPDATE, заставший прочитанную версию
+            if updated and finished:
+                record_finished_game(self._session, game)
+            self._session.commit()
+        except Exception:
+            self._session.rollback()
+            raise
+        return bool(updated)
+
+    def claim_game(
+        self,
+        player_id: UUID,
+        board_size: int,
+        win_length: int,
+        game_id: Optional[UUID] = None,
+    ) -> Optional[CurrentGameEntity]:
+        try:
+            entity = (
+                self._session.execute(
+                    claim_query(player_id, board_size, win_length, game_id)
+                )
+                .scalars()
+                .first()
+            )
+            if entity:
+                # Партия уже прочитана из RETURNING, commit не должен её сбрасывать
+                self._session.expunge(entity)
+            self._session.commit()
+        except Exception:
+            self._session.rollback()
+            raise
+        return entity
+
     def get_game(self, game_id: UUID) -> Optional[CurrentGameEntity]:
         return (
             self._session.query(CurrentGameEntity)
@@ -44,17 +116,34 @@ class GameRepository:
             .first()
         )
 
-    def get_available_games(self) -> List[CurrentGameEntity]:
+    def get_active_game(
+        self, player_id: UUID, board_size: int, win_length: int
+    ) -> Optional[CurrentGameEntity]:
         return (
-            self._session.query(CurrentGameEntity)
+            self._session.execute(active_game_query(player_id, board_size, win_length))
+            .scalars()
+            .first()
+        )
+
+    def get_version(self, game_id: UUID) -> Optional[int]:
+        # None и для партии, ждущей хода компьютера: её читают целиком
+        return (
+            self._session.query(CurrentGameEntity.version)
+            .filter_by(game_id=str(game_id))
             .filter(
-                CurrentGameEntity.game_state.in_(
-                    [GameState.WAITING_FOR_PLAYER.value, GameState.PLAYER_TURN.value]
-                )
+                CurrentGameEntity.game_state != GameState.COMPUTER_THINKING.value
             )
-            .all()
+            .scalar()
         )
 
+    def get_available_games(
+        self,
+        limit: int,
+        after: Optional[Tuple[datetime, UUID]] = None,
+        game_type: Optional[str] = None,
+    ) -> List[Row]:
+        return list(self._session.execute(lobby_query(limit, after, game_type)))
+
     def delete_game(self, game_id: UUID) -> bool:
         game = self.get_game(game_id)
         if game:
@@ -63,52 +152,149 @@ class GameRepository:
             return True
         return False
 
-    def get_completed_games_by_user(self, user_id: UUID) -> List[CurrentGameEntity]:
-        return (
-            self._session.query(CurrentGameEntity)
-            .filter(
-                (CurrentGameEntity.player1_id == user_id)
-                | (CurrentGameEntity.player2_id == user_id)
-            )
-            .filter(
-                CurrentGameEntity.game_state.in_(
-                    [GameState.PLAYER_WON.value, GameState.DRAW.value]
-                )
-            )
-            .order_by(CurrentGameEntity.created_at.desc())
-            .all()
+    def get_completed_games_by_user(
+        self,
+        user_id: UUID,
+        limit: int,
+        after: Optional[Tuple[datetime, UUID]] = None,
+    ) -> List[CurrentGameEntity]:
+        return list(
+            self._session.execute(history_query(user_id, limit, after)).scalars()
         )
 
     def get_leaderboard(self, limit: int) -> List[Tuple[UUID, float, int, int]]:
-        completed_games = (
-            self._session.query(CurrentGameEntity)
-            .filter(
-                CurrentGameEntity.game_state.in_(
-                    [GameState.PLAYER_WON.value, GameState.DRAW.value]
-                )
+        return [tuple(row) for row in self._session.execute(leaderboard_query(limit))]
+
+    def close(self) -> None:
+        self._session.close()
+
+
+def claim_query(
+    player_id: UUID,
+    board_size: int,
+    win_length: int,
+    game_id: Optional[UUID] = None,
+) -> Update:
+    # Присоединение второго игрока одним условным UPDATE: из одновременных
+    # претендентов на партию его выполнит ровно один. Без game_id берётся
+    # самая старая подходящая партия; занятые чужими транзакциями строки
+    # пропускаются (SKIP LOCKED), а не ожидаются
+    waiting = select(CurrentGameEntity.id).where(
+        CurrentGameEntity.game_state == GameState.WAITING_FOR_PLAYER.value,
+        CurrentGameEntity.game_type == GameType.PVP.value,
+        CurrentGameEntity.board_size == board_size,
+        CurrentGameEntity.win_length == win_length,
+        CurrentGameEntity.player1_id != player_id,
+    )
+    if game_id:
+        waiting = waiting.where(CurrentGameEntity.game_id == str(game_id))
+    else:
+        waiting = (
+            waiting.order_by(CurrentGameEntity.created_at, CurrentGameEntity.game_id)
+            .limit(1)
+            .with_for_update(skip_locked=True)
+        )
+    return (
+        update(CurrentGameEntity)
+        .where(
+            CurrentGameEntity.id == waiting.scalar_subquery(),
+            CurrentGameEntity.game_state == GameState.WAITING_FOR_PLAYER.value,
+        )
+        .values(
+            player2_id=player_id,
+            game_state=GameState.PLAYER_TURN.value,
+            current_player_id=CurrentGameEntity.player1_id,
+            version=CurrentGameEntity.version + 1,
+            updated_at=datetime.utcnow(),
+        )
+        .returning(CurrentGameEntity)
+        .execution_options(synchronize_session=False, populate_existing=True)
+    )
+
+
+def active_game_query(player_id: UUID, board_size: int, win_length: int) -> Select:
+    # Последняя незаконченная PvP-партия игрока с таким полем: ожидающая
+    # соперника или уже начатая. Каждое место игрока читается своим индексом
+    def seat(player_column) -> Select:
+        return (
+            select(CurrentGameEntity.id)
+            .where(
+                player_column == player_id,
+                CurrentGameEntity.game_state.in_(ACTIVE_STATES),
+                CurrentGameEntity.game_type == GameType.PVP.value,
+                CurrentGameEntity.board_size == board_size,
+                CurrentGameEntity.win_length == win_length,
             )
-            .all()
+            .order_by(CurrentGameEntity.created_at.desc())
+            .limit(1)
         )
 
-        user_stats = defaultdict(lambda: {"wins": 0, "total": 0})
+    ids = union_all(
+        select(seat(CurrentGameEntity.player1_id).subquery().c.id),
+        select(seat(CurrentGameEntity.player2_id).subquery().c.id),
+    ).subquery()
+    return (
+        select(CurrentGameEntity)
+        .where(CurrentGameEntity.id.in_(select(ids.c.id)))
+        .order_by(CurrentGameEntity.created_at.desc())
+        .limit(1)
+    )
 
-        for game in completed_games:
-            if game.player1_id:
-                user_stats[game.player1_id]["total"] += 1
-                if game.winner_id == game.player1_id:
-                    user_stats[game.player1_id]["wins"] += 1
 
-            if game.player2_id:
-                user_stats[game.player2_id]["total"] += 1
-                if game.winner_id == game.player2_id:
-                    user_stats[game.player2_id]["wins"] += 1
+def lobby_query(
+    limit: int,
+    after: Optional[Tuple[datetime, UUID]] = None,
+    game_type: Optional[str] = None,
+) -> Select:
+    # Страница лобби по ключу (created_at, game_id), дольше всех ожидающие
+    # партии первыми. Читаются только колонки списка, без масок досок
+    query = select(
+        CurrentGameEntity.game_id,
+        CurrentGameEntity.game_type,
+        CurrentGameEntity.player1_id,
+        CurrentGameEntity.created_at,
+        CurrentGameEntity.board_size,
+        CurrentGameEntity.win_length,
+    ).where(CurrentGameEntity.game_state == GameState.WAITING_FOR_PLAYER.value)
+    if game_type:
+        query = query.where(CurrentGameEntity.game_type == game_type)
+    if after:
+        query = query.where(
+            tuple_(CurrentGameEntity.created_at, CurrentGameEntity.game_id)
+            > tuple_(after[0], str(after[1]))
+        )
+    return query.order_by(
+        CurrentGameEntity.created_at, CurrentGameEntity.game_id
+    ).limit(limit)
 
-        results = []
-        for user_id, stats in user_stats.items():
-            if stats["total"] > 0:
-                win_ratio = stats["wins"] / stats["total"]
-                results.append((user_id, win_ratio, stats["wins"], stats["total"]))
 
-        results.sort(key=lambda x: (x[1], x[2]), reverse=True)
+def history_query(
+    user_id: UUID, limit: int, after: Optional[Tuple[datetime, UUID]] = None
+) -> Select:
+    # Страница истории по ключу (created_at, game_id). Вместо OR по двум
+    # колонкам каждое место игрока читается своим индексом не дальше limit
+    # строк, и из двух веток берутся первые limit партий
+    def seat(player_column) -> Select:
+        query = select(CurrentGameEntity.id).where(
+            player_column == user_id,
+            CurrentGameEntity.game_state.in_(FINISHED_STATES),
+        )
+        if after:
+            query = query.where(
+                tuple_(CurrentGameEntity.created_at, CurrentGameEntity.game_id)
+                < tuple_(after[0], str(after[1]))
+            )
+        return query.order_by(
+            CurrentGameEntity.created_at.desc(), CurrentGameEntity.game_id.desc()
+        ).limit(limit)
 
-        return results[:limit]
+    ids = union_all(
+        select(seat(CurrentGameEntity.player1_id).subquery().c.id),
+        select(seat(CurrentGameEntity.player2_id).subquery().c.id),
+    ).subquery()
+    return (
+        select(CurrentGameEntity)
+        .where(CurrentGameEntity.id.in_(select(ids.c.id)))
+        .order_by(CurrentGameEntity.created_at.desc(), CurrentGameEntity.game_id.desc())
+        .limit(limit)
+    )
@@ -1,5 +1,6 @@
-from typing import Optional
+from typing import List, Optional
 from uuid import UUID
+from sqlalchemy import update
 from sqlalchemy.orm import Session
 from datasource.model.user_entity import UserEntity
 
@@ -20,3 +21,23 @@ class UserRepository:
         return (
             self.session.query(UserEntity).filter(UserEntity.user_id == user_id).first()
         )
+
+    def find_by_ids(self, user_ids: List[UUID]) -> List[UserEntity]:
+        if not user_ids:
+            return []
+        return (
+            self.session.query(UserEntity)
+            .filter(UserEntity.user_id.in_(user_ids))
+            .all()
+        )
+
+    def update_password(self, user_id: UUID, password: str) -> None:
+        self.session.execute(
+            update(UserEntity)
+            .where(UserEntity.user_id == user_id)
+            .values(password=password)
+        )
+        self.session.commit()
+
+    def close(self) -> None:
+        self.session.close()
@@ -0,0 +1,138 @@
+from typing import List, Optional, Tuple
+from uuid import UUID
+from sqlalchemy import Float, Insert, Select, Update, case, cast, func, insert
+from sqlalchemy import select, union_all, update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+from datasource.model.current_game_entity import CurrentGameEntity
+from datasource.model.user_stats_entity import UserStatsEntity
+from domain.model.game_state import GameState
+
+WIN = "wins"
+LOSS = "losses"
+DRAW = "draws"
+
+FINISHED_STATES = [GameState.PLAYER_WON.value, GameState.DRAW.value]
+
+
+class UserStatsRepository:
+    def __init__(self, session: Session):
+        self.session = session
+
+    def find_by_user_id(self, user_id: UUID) -> Optional[UserStatsEntity]:
+        return self.session.get(UserStatsEntity, user_id)
+
+    def get_leaderboard(self, limit: int) -> List[Tuple[UUID, float, int, int]]:
+        return [tuple(row) for row in self.session.execute(leaderboard_query(limit))]
+
+
+def record_finished_game(session: Session, game: CurrentGameEntity) -> None:
+    # Вызывается внутри транзакции, завершающей партию
+    for user_id, outcome in game_outcomes(game):
+        if session.execute(increment_stats(user_id, outcome)).rowcount:
+            continue
+        try:
+            with session.begin_nested():
+                session.execute(insert_stats(user_id, outcome))
+        except IntegrityError:
+            # Первую строку игрока успела вставить параллельная партия
+            session.execute(increment_stats(user_id, outcome))
+
+
+def game_outcomes(game: CurrentGameEntity) -> List[Tuple[UUID, str]]:
+    # Победа компьютера в PvC хранится без winner_id и считается поражением игрока
+    outcomes = []
+    for player_id in (game.player1_id, game.player2_id):
+        if not player_id:
+            continue
+        if game.game_state == GameState.DRAW.value:
+            outcomes.append((player_id, DRAW))
+        elif game.winner_id == player_id:
+            outcomes.append((player_id, WIN))
+        else:
+            outcomes.append((player_id, LOSS))
+    return outcomes
+
+
+def increment_stats(user_id: UUID, outcome: str) -> Update:
+    # В SET справа стоят значения строки до обновления
+    wins = UserStatsEntity.wins + (1 if outcome == WIN else 0)
+    total = UserStatsEntity.total + 1
+    return (
+        update(UserStatsEntity)
+        .where(UserStatsEntity.user_id == user_id)
+        .values(
+            wins=wins,
+            losses=UserStatsEntity.losses + (1 if outcome == LOSS else 0),
+            draws=UserStatsEntity.draws + (1 if outcome == DRAW else 0),
+            total=total,
+            win_ratio=cast(wins, Float) / total,
+        )
+    )
+
+
+def insert_stats(user_id: UUID, outcome: str) -> Insert:
+    return insert(UserStatsEntity).values(
+        user_id=user_id,
+        wins=1 if outcome == WIN else 0,
+        losses=1 if outcome == LOSS else 0,
+        draws=1 if outcome == DRAW else 0,
+        total=1,
+        win_ratio=1.0 if outcome == WIN else 0.0,
+    )
+
+
+def leaderboard_query(limit: int) -> Select:
+    return (
+        select(
+            UserStatsEntity.user_id,
+            UserStatsEntity.win_ratio,
+            UserStatsEntity.wins,
+            UserStatsEntity.total,
+        )
+        .where(UserStatsEntity.total > 0)
+        .order_by(
+            UserStatsEntity.win_ratio.desc(),
+            UserStatsEntity.wins.desc(),
+            UserStatsEntity.user_id,
+        )
+        .limit(limit)
+    )
+
+
+def player_totals_query() -> Select:
+    # Итоги всех игроков по истории партий: участия первым и вторым игроком
+    # объединяются (UNION ALL) и группируются по игроку. Время растёт с историей,
+    # поэтому таблица лидеров читает user_stats, а запрос нужен только миграции
+    completed = CurrentGameEntity.game_state.in_(FINISHED_STATES)
+    draw = case((CurrentGameEntity.game_state == GameState.DRAW.value, 1), else_=0)
+    participations = union_all(
+        select(
+            CurrentGameEntity.player1_id.label("user_id"),
+            case(
+                (CurrentGameEntity.winner_id == CurrentGameEntity.player1_id, 1),
+                else_=0,
+            ).label("win"),
+            draw.label("draw"),
+        ).where(completed),
+        select(
+            CurrentGameEntity.player2_id.label("user_id"),
+            case(
+                (CurrentGameEntity.winner_id == CurrentGameEntity.player2_id, 1),
+                else_=0,
+            ).label("win"),
+            draw.label("draw"),
+        ).where(completed, CurrentGameEntity.player2_id.is_not(None)),
+    ).subquery()
+
+    wins = func.sum(participations.c.win)
+    draws = func.sum(participations.c.draw)
+    total = func.count()
+    return select(
+        participations.c.user_id,
+        wins.label("wins"),
+        (total - wins - draws).label("losses"),
+        draws.label("draws"),
+        total.label("total"),
+        (cast(wins, Float) / total).label("win_ratio"),
+    ).group_by(participations.c.user_id)
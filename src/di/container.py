@@ -1,13 +1,29 @@
-from sqlalchemy.orm import Session
+import os
+from sqlalchemy.orm import scoped_session
 from datetime import timedelta
-from datasource.database import get_db_session, init_db
+from datasource.database import db_session, get_db_session, init_db
 from datasource.repository.game_repository import GameRepository
 from datasource.repository.user_repository import UserRepository
+from datasource.repository.user_stats_repository import UserStatsRepository
 from domain.service.game_service_impl import GameServiceImpl
 from domain.service.game_service_interface import GameServiceInterface
+from domain.service.game_rules import GameRules
+from domain.service.game_event_bus import GameEventBus
+from domain.service.game_cache import GameCache
+from domain.service.matchmaker import Matchmaker
+from domain.service.user_cache import UserCache
+from domain.service.memory_cache_backend import MemoryCacheBackend
 from domain.service.user_service import UserService
+from domain.service.password_hasher import PasswordHasher
 from domain.service.auth_service import AuthService
 from domain.service.jwt_provider import JwtProvider
+from domain.service.verified_token_cache import VerifiedTokenCache
+from domain.service.tablebase import Tablebase
+from domain.service.alpha_beta_engine import AlphaBetaEngine
+from domain.service.mcts_engine import MctsEngine, SearchPool
+from domain.service.computer_move_worker import ComputerMoveWorker
+from domain.service.position_analyzer import PositionAnalyzer
+from domain.model.difficulty import Difficulty
 from web.module.user_authenticator import UserAuthenticator
 
 
@@ -15,27 +31,152 @@ class Container:
     def __init__(self):
         init_db()
 
-        self._session: Session = get_db_session()
+        # Репозитории работают через scoped_session: у каждого запроса своя
+        # сессия, которую приложение закрывает по окончании запроса
+        self._session: scoped_session = db_session
 
         self._game_repository = GameRepository(self._session)
         self._user_repository = UserRepository(self._session)
+        self._user_stats_repository = UserStatsRepository(self._session)
 
         self._jwt_provider = JwtProvider(
             access_token_expires=timedelta(minutes=15),
             refresh_token_expires=timedelta(days=30),
         )
 
-        self._user_service = UserService(self._user_repository)
+        # Кэш партий и пользователей: в памяти процесса или общий для узлов
+        self._cache_backend = None
+        if os.getenv("CACHE_BACKEND", "memory").lower() == "redis":
+            from datasource.redis_cache_backend import RedisCacheBackend
+
+            self._cache_backend = RedisCacheBackend(
+                os.getenv("CACHE_URL", "redis://localhost:6379/0")
+            )
+        else:
+            cache_size = int(os.getenv("CACHE_SIZE", str(MemoryCacheBackend.MAX_SIZE)))
+            if cache_size > 0:
+                self._cache_backend = MemoryCacheBackend(cache_size)
+
+        self._game_cache = None
+        self._user_cache = None
+        if self._cache_backend:
+            self._game_cache = GameCache(
+                self._cache_backend,
+                float(os.getenv("GAME_CACHE_TTL", str(GameCache.TTL))),
+            )
+            self._user_cache = UserCache(
+                self._cache_backend,
+                float(os.getenv("USER_CACHE_TTL", str(UserCache.TTL))),
+            )
+
+        # Хэширование паролей (scrypt) в отдельном пуле: по умолчанию не больше
+        # половины ядер этого воркера сервера, чтобы всплеск входов не отнимал
+        # процессор у партий. Пул есть в каждом воркере. Вход ждёт хэша в потоке
+        # запроса, поэтому хэши в работе и в очереди вместе занимают не больше
+        # половины потоков воркера (gunicorn.conf.py передаёт SERVER_THREADS),
+        # остальные входы сразу получают 503
+        hash_workers = int(
+            os.getenv("PASSWORD_HASH_WORKERS", str(max(1, self._cpu_share() // 2)))
+        )
+        request_threads = max(1, int(os.getenv("SERVER_THREADS", "32")))
+        self._password_hasher = PasswordHasher(
+            cost=int(os.getenv("PASSWORD_HASH_COST", str(PasswordHasher.COST))),
+            workers=hash_workers,
+            max_queue=int(
+                os.getenv(
+                    "PASSWORD_HASH_QUEUE",
+                    str(max(0, request_threads // 2 - hash_workers)),
+                )
+            ),
+        )
+
+        self._user_service = UserService(
+            self._user_repository,
+            self._user_cache,
+            self._user_stats_repository,
+            self._password_hasher,
+        )
+
+        # Файл таблицы отображается в память и разделяется между процессами
+        self._tablebase = Tablebase.load_or_build(os.getenv("TABLEBASE_PATH"))
+        self._alpha_beta_engine = AlphaBetaEngine(
+            time_budget=float(os.getenv("AI_TIME_BUDGET", "1.0")),
+            table_size=int(os.getenv("AI_TABLE_SIZE", "200000")),
+        )
+
+        # Ядра делятся между воркерами сервера: пул поиска есть в каждом из них
+        self._search_pool = SearchPool(
+            int(os.getenv("AI_WORKERS", str(self._cpu_share())))
+        )
+        self._difficulty_engines = {
+            Difficulty.EASY: MctsEngine(
+                self._search_pool,
+                playouts=int(os.getenv("AI_EASY_PLAYOUTS", "200")),
+            ),
+            Difficulty.MEDIUM: MctsEngine(
+                self._search_pool,
+                playouts=int(os.getenv("AI_MEDIUM_PLAYOUTS", "5000")),
+            ),
+            Difficulty.HARD: MctsEngine(
+                self._search_pool,
+                time_budget=float(os.getenv("AI_HARD_TIME_BUDGET", "2.0")),
+            ),
+        }
+
+        self._computer_move_worker = ComputerMoveWorker(
+            workers=int(os.getenv("AI_ASYNC_WORKERS", "2")),
+            max_queue=int(os.getenv("AI_ASYNC_QUEUE", "100")),
+        )
+        self._computer_move_deadline = float(
+            os.getenv("AI_ASYNC_DEADLINE", str(GameRules.COMPUTER_MOVE_DEADLINE))
+        )
+
+        # События партий для SSE; между воркерами - через LISTEN/NOTIFY PostgreSQL
+        events_transport = None
+        if os.getenv("EVENTS_TRANSPORT", "local").lower() == "postgres":
+            from datasource.database import engine
+            from datasource.pg_event_transport import PostgresEventTransport
+
+            events_transport = PostgresEventTransport(engine)
+        self._event_bus = GameEventBus(events_transport)
+
+        # Кэш в памяти узнаёт об изменениях из других воркеров через шину
+        if self._game_cache and not self._game_cache.remote:
+            self._event_bus.observe(self._game_cache.put)
+
+        # Очереди быстрой игры общие для синхронного и асинхронного сервисов
+        self._matchmaker = Matchmaker()
+
+        self._async_game_service = None
 
         self._game_service: GameServiceInterface = GameServiceImpl(
-            self._game_repository, self._user_service
+            self._game_repository,
+            self._user_service,
+            [self._tablebase, self._alpha_beta_engine],
+            self._difficulty_engines,
+            self._computer_move_worker,
+            lambda: GameRepository(get_db_session()),
+            PositionAnalyzer(self._tablebase),
+            self._event_bus,
+            self._game_cache,
+            self._matchmaker,
+            self._computer_move_deadline,
         )
 
-        self._auth_service = AuthService(self._user_service, self._jwt_provider)
+        # Проверенные токены доступа; 0 - проверять подпись на каждый запрос
+        token_cache_size = int(
+            os.getenv("AUTH_TOKEN_CACHE_SIZE", str(VerifiedTokenCache.MAX_SIZE))
+        )
+        self._token_cache = (
+            VerifiedTokenCache(token_cache_size) if token_cache_size > 0 else None
+        )
+        self._auth_service = AuthService(
+            self._user_service, self._jwt_provider, self._token_cache
+        )
         self._authenticator = UserAuthenticator(self._auth_service)
 
     @property
-    def session(self) -> Session:
+    def session(self) -> scoped_session:
         return self._session
 
     @property
@@ -58,6 +199,35 @@ class Container:
     def game_service(self) -> GameServiceInterface:
         return self._game_service
 
+    @property
+    def async_game_service(self):
+        # Асинхронный стек (asyncpg) собирается только для ASGI-приложения
+        if self._async_game_service is None:
+            from datasource.async_database import AsyncSessionLocal
+            from datasource.repository.async_game_repository import (
+                AsyncGameRepository,
+            )
+            from datasource.repository.async_user_repository import (
+                AsyncUserRepository,
+            )
+            from domain.service.async_game_service_impl import AsyncGameServiceImpl
+
+            self._async_game_service = AsyncGameServiceImpl(
+                AsyncGameRepository(AsyncSessionLocal),
+                AsyncUserRepository(AsyncSessionLocal),
+                GameRules(
+                    [self._tablebase, self._alpha_beta_engine],
+                    self._difficulty_engines,
+                    self._computer_move_deadline,
+                ),
+                self._event_bus,
+                self._game_cache,
+                self._user_cache,
+                self._matchmaker,
+                self._computer_move_worker,
+            )
+        return self._async_game_service
+
     @property
     def user_service(self) -> UserService:
         return self._user_service
@@ -74,6 +244,32 @@ class Container:
     def jwt_provider(self) -> JwtProvider:
         return self._jwt_provider
 
+    @property
+    def tablebase(self) -> Tablebase:
+        return self._tablebase
+
+    def close_session(self, exception=None):
+        self._session.remove()
+
+    async def close_async(self):
+        if self._async_game_service is not None:
+            from datasource.async_database import async_engine
+
+            await async_engine.dispose()
+        self.close()
+
     def close(self):
         if self._session:
-            self._session.close()
+            self._session.remove()
+        self._computer_move_worker.shutdown()
+        self._password_hasher.shutdown()
+        self._search_pool.shutdown()
+        self._event_bus.close()
+        if self._cache_backend:
+            self._cache_backend.close()
+
+    @staticmethod
+    def _cpu_share() -> int:
+        # Ядра на один процесс сервера: gunicorn.conf.py передаёт число воркеров
+        server_workers = max(1, int(os.getenv("SERVER_WORKERS", "1")))
+        return max(1, (os.cpu_count() or 1) // server_workers)
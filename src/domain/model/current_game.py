@@ -2,6 +2,7 @@ from uuid import UUID
 from typing import Optional
 from dataclasses import dataclass, field
 from datetime import datetime
+from .difficulty import Difficulty
 from .game_field import GameField
 from .game_state import GameState
 from .game_type import GameType
@@ -21,6 +22,9 @@ class CurrentGame:
     current_player_id: Optional[UUID]
     winner_id: Optional[UUID] = None
     created_at: datetime = field(default_factory=datetime.utcnow)
+    difficulty: Optional[Difficulty] = None
+    version: int = 1
+    updated_at: Optional[datetime] = None
 
     def is_player_turn(self, player_id: UUID) -> bool:
         return (
@@ -29,7 +33,11 @@ class CurrentGame:
         )
 
     def is_game_over(self) -> bool:
-        return self.game_state in [GameState.DRAW, GameState.PLAYER_WON]
+        return self.game_state in [
+            GameState.DRAW,
+            GameState.PLAYER_WON,
+            GameState.ABORTED,
+        ]
 
     def get_opponent_id(self, player_id: UUID) -> Optional[UUID]:
         if player_id == self.player1_id:
@@ -1,11 +1,163 @@
-from typing import List
+from functools import lru_cache
+from typing import List, Optional, Tuple
 
 
+# Поле хранится как две битовые маски: бит i (i = row * size + col) установлен,
+# если клетка занята соответствующим игроком.
 class GameField:
 
     EMPTY = 0
     PLAYER_X = 1
     PLAYER_O = 2
 
-    def __init__(self, board: List[List[int]] = None):
-        self.board = board if board else [[0, 0, 0], [0, 0, 0], [0, 0, 0]]
+    DEFAULT_SIZE = 3
+    DEFAULT_WIN_LENGTH = 3
+    MIN_SIZE = 3
+    MAX_SIZE = 7
+
+    __slots__ = ("x_mask", "o_mask", "size", "win_length")
+
+    def __init__(
+        self,
+        x_mask: int = 0,
+        o_mask: int = 0,
+        size: int = DEFAULT_SIZE,
+        win_length: int = DEFAULT_WIN_LENGTH,
+    ):
+        if not self.MIN_SIZE <= size <= self.MAX_SIZE:
+            raise ValueError(
+                f"Board size must be between {self.MIN_SIZE} and {self.MAX_SIZE}"
+            )
+        if not self.MIN_SIZE <= win_length <= size:
+            raise ValueError(f"Win length must be between {self.MIN_SIZE} and {size}")
+        full_mask = (1 << size * size) - 1
+        if x_mask & o_mask or (x_mask | o_mask) & ~full_mask:
+            raise ValueError("Invalid board format")
+        self.x_mask = x_mask
+        self.o_mask = o_mask
+        self.size = size
+        self.win_length = win_length
+
+    @classmethod
+    def from_board(
+        cls, board: List[List[int]], win_length: Optional[int] = None
+    ) -> "GameField":
+        if not isinstance(board, list):
+            raise ValueError("Invalid board format")
+        size = len(board)
+        if any(not isinstance(row, list) or len(row) != size for row in board):
+            raise ValueError("Invalid board format")
+        if not cls.MIN_SIZE <= size <= cls.MAX_SIZE:
+            raise ValueError("Invalid board format")
+
+        x_mask = 0
+        o_mask = 0
+        for i in range(size):
+            for j in range(size):
+                cell = board[i][j]
+                # Только int: True == 1 и 2.0 == 2 иначе сошли бы за фигуры
+                if type(cell) is not int:
+                    raise ValueError("Invalid board format")
+                if cell == cls.PLAYER_X:
+                    x_mask |= 1 << (i * size + j)
+                elif cell == cls.PLAYER_O:
+                    o_mask |= 1 << (i * size + j)
+                elif cell != cls.EMPTY:
+                    raise ValueError("Invalid board format")
+        return cls(x_mask, o_mask, size, win_length or cls.DEFAULT_WIN_LENGTH)
+
+    def to_board(self) -> List[List[int]]:
+        return [
+            [self.get_cell(i * self.size + j) for j in range(self.size)]
+            for i in range(self.size)
+        ]
+
+    def get_cell(self, index: int) -> int:
+        bit = 1 << index
+        if self.x_mask & bit:
+            return self.PLAYER_X
+        if self.o_mask & bit:
+            return self.PLAYER_O
+        return self.EMPTY
+
+    def mask_of(self, symbol_value: int) -> int:
+        return self.x_mask if symbol_value == self.PLAYER_X else self.o_mask
+
+    @property
+    def cells(self) -> int:
+        return self.size * self.size
+
+    @property
+    def full_mask(self) -> int:
+        return (1 << self.cells) - 1
+
+    @property
+    def win_masks(self) -> Tuple[int, ...]:
+        return self.win_masks_for(self.size, self.win_length)
+
+    @property
+    def occupied_mask(self) -> int:
+        return self.x_mask | self.o_mask
+
+    @property
+    def empty_mask(self) -> int:
+        return ~self.occupied_mask & self.full_mask
+
+    def is_full(self) -> bool:
+        return self.occupied_mask == self.full_mask
+
+    def winner(self) -> Optional[int]:
+        for win_mask in self.win_masks:
+            if self.x_mask & win_mask == win_mask:
+                return self.PLAYER_X
+            if self.o_mask & win_mask == win_mask:
+                return self.PLAYER_O
+        return None
+
+    def with_move(self, index: int, symbol_value: int) -> "GameField":
+        bit = 1 << index
+        if self.occupied_mask & bit:
+            raise ValueError("Cell is already occupied")
+        if symbol_value == self.PLAYER_X:
+            return GameField(
+                self.x_mask | bit, self.o_mask, self.size, self.win_length
+            )
+        return GameField(self.x_mask, self.o_mask | bit, self.size, self.win_length)
+
+    def with_masks(self, x_mask: int, o_mask: int) -> "GameField":
+        return GameField(x_mask, o_mask, self.size, self.win_length)
+
+    @staticmethod
+    @lru_cache(maxsize=None)
+    def win_masks_for(size: int, win_length: int) -> Tuple[int, ...]:
+        # Порядок как у классической проверки: строки, столбцы, диагонали
+        masks = []
+        directions = ((0, 1), (1, 0), (1, 1), (1, -1))
+        for di, dj in directions:
+            for i in range(size):
+                for j in range(size):
+                    end_i = i + di * (win_length - 1)
+                    end_j = j + dj * (win_length - 1)
+                    if not (0 <= end_i < size and 0 <= end_j < size):
+                        continue
+                    mask = 0
+                    for step in range(win_length):
+                        mask |= 1 << ((i + di * step) * size + j + dj * step)
+                    masks.append(mask)
+        return tuple(masks)
+
+    def __eq__(self, other) -> bool:
+        if not isinstance(other, GameField):
+            return NotImplemented
+        return (
+            self.x_mask == other.x_mask
+            and self.o_mask == other.o_mask
+            and self.size == other.size
+            and self.win_length == other.win_length
+        )
+
+    def __repr__(self):
+        return (
+            f"<GameField(size={self.size}, win_length={self.win_length}, "
+            f"x_mask={self.x_mask:#x}, o_mask={self.o_mask:#x})>"
+        )
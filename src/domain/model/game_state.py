@@ -4,5 +4,8 @@ from enum import Enum
 class GameState(Enum):
     WAITING_FOR_PLAYER = "waiting_for_player"
     PLAYER_TURN = "player_turn"
+    COMPUTER_THINKING = "computer_thinking"
     DRAW = "draw"
     PLAYER_WON = "player_won"
+    # Ход компьютера не удалось вычислить ни одним движком: партия прервана
+    ABORTED = "aborted"
@@ -0,0 +1,15 @@
+from uuid import UUID
+from dataclasses import dataclass
+from datetime import datetime
+from .game_type import GameType
+
+
+# Партия в лобби: только то, что нужно для списка ожидающих игр
+@dataclass
+class LobbyGame:
+    game_id: UUID
+    game_type: GameType
+    player1_id: UUID
+    created_at: datetime
+    board_size: int
+    win_length: int
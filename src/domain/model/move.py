@@ -0,0 +1,13 @@
+from dataclasses import dataclass
+from typing import Optional
+from .game_field import GameField
+
+
+# Ход задаётся парой (row, col), упакованным индексом клетки cell = row * size + col
+# или, для старых клиентов, полной доской после хода
+@dataclass
+class Move:
+    row: Optional[int] = None
+    col: Optional[int] = None
+    cell: Optional[int] = None
+    board: Optional[GameField] = None
@@ -0,0 +1,14 @@
+from dataclasses import dataclass
+from typing import List, Optional
+
+
+@dataclass
+class PositionAnalysis:
+    winners: List[Optional[int]]
+    terminal: List[bool]
+    to_move: List[Optional[int]]
+    best_moves: List[Optional[int]]
+    scores: List[Optional[int]]
+
+    def __len__(self) -> int:
+        return len(self.winners)
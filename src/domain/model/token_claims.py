@@ -0,0 +1,10 @@
+from uuid import UUID
+from dataclasses import dataclass
+
+
+@dataclass
+class TokenClaims:
+    token_type: str
+    user_id: UUID
+    # Момент истечения токена (exp), секунды Unix-времени
+    expires_at: float
@@ -0,0 +1,12 @@
+from uuid import UUID
+from dataclasses import dataclass
+
+
+@dataclass
+class UserStats:
+    user_id: UUID
+    wins: int = 0
+    losses: int = 0
+    draws: int = 0
+    total: int = 0
+    win_ratio: float = 0.0
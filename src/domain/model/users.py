@@ -1,8 +1,9 @@
+from typing import Optional
 from uuid import UUID
 
 
 class User:
-    def __init__(self, user_id: UUID, login: str, password: str):
+    def __init__(self, user_id: UUID, login: str, password: Optional[str]):
         self.user_id = user_id
         self.login = login
         self.password = password
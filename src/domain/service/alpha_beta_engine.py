@@ -0,0 +1,372 @@
+import random
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, List, Optional, Tuple
+from domain.model.game_field import GameField
+from domain.model.player_symbol import PlayerSymbol
+from domain.model.search_result import SearchResult
+from domain.service.search_engine_interface import SearchEngineInterface
+
+
+WIN_SCORE = 1_000_000
+_MATE_BOUND = WIN_SCORE - 1000
+
+_EXACT = 0
+_LOWER = 1
+_UPPER = 2
+
+
+class _SearchTimeout(Exception):
+    pass
+
+
+class _Geometry:
+    # Всё, что зависит только от (size, win_length), считается один раз
+    def __init__(self, size: int, win_length: int):
+        self.size = size
+        self.cells = size * size
+        self.full_mask = (1 << self.cells) - 1
+        self.win_masks = GameField.win_masks_for(size, win_length)
+        self.masks_by_cell: List[Tuple[int, ...]] = [
+            tuple(mask for mask in self.win_masks if mask >> cell & 1)
+            for cell in range(self.cells)
+        ]
+        self.weights = [0] + [10**count for count in range(win_length)]
+
+        center = (size - 1) / 2
+        self.by_centrality = sorted(
+            range(self.cells),
+            key=lambda cell: max(abs(cell // size - center), abs(cell % size - center)),
+        )
+        self.neighbours = []
+        for cell in range(self.cells):
+            row, col = divmod(cell, size)
+            mask = 0
+            for di in (-1, 0, 1):
+                for dj in (-1, 0, 1):
+                    i, j = row + di, col + dj
+                    if (di or dj) and 0 <= i < size and 0 <= j < size:
+                        mask |= 1 << (i * size + j)
+            self.neighbours.append(mask)
+        # На крупных полях рассматриваем только клетки рядом с уже занятыми
+        self.local_moves = self.cells > 16
+
+        rng = random.Random(size * 100 + win_length)
+        self.zobrist = [
+            [rng.getrandbits(64) for _ in range(self.cells)] for _ in range(2)
+        ]
+        self.zobrist_side = rng.getrandbits(64)
+
+
+class _SearchContext:
+    def __init__(self, geometry: _Geometry, deadline: float, table_size: int):
+        self.geometry = geometry
+        self.deadline = deadline
+        self.table_size = table_size
+        self.table: "OrderedDict[int, Tuple[int, int, int, Optional[int]]]" = (
+            OrderedDict()
+        )
+        self.history = [0] * geometry.cells
+        self.nodes = 0
+        self.check_timeout = False
+
+
+class AlphaBetaEngine(SearchEngineInterface):
+    def __init__(
+        self,
+        time_budget: float = 1.0,
+        max_depth: Optional[int] = None,
+        table_size: int = 200_000,
+    ):
+        self.time_budget = time_budget
+        self.max_depth = max_depth
+        self.table_size = table_size
+        self._geometries: Dict[Tuple[int, int], _Geometry] = {}
+        self._lock = threading.Lock()
+        self._searches = 0
+        self._total_nodes = 0
+        self._total_time = 0.0
+        self._last_result: Optional[SearchResult] = None
+
+    def supports(self, game_field: GameField) -> bool:
+        return True
+
+    def search(self, game_field: GameField, symbol: PlayerSymbol) -> SearchResult:
+        started = time.perf_counter()
+        geometry = self._geometry(game_field.size, game_field.win_length)
+        ctx = _SearchContext(geometry, started + self.time_budget, self.table_size)
+
+        own = game_field.mask_of(symbol.value)
+        other = game_field.occupied_mask & ~own
+        side = 0 if symbol == PlayerSymbol.X else 1
+        position_hash = self._hash(geometry, own, other, side)
+
+        best_move = None
+        best_score = 0
+        completed_depth = 0
+        empty = geometry.cells - bin(own | other).count("1")
+        max_depth = min(self.max_depth or empty, empty)
+
+        for depth in range(1, max_depth + 1):
+            # Первую итерацию доводим до конца, чтобы ход был всегда
+            ctx.check_timeout = depth > 1
+            try:
+                score, move = self._search_root(
+                    ctx, own, other, side, position_hash, depth, best_move
+                )
+            except _SearchTimeout:
+                break
+            best_move, best_score, completed_depth = move, score, depth
+            if abs(best_score) >= _MATE_BOUND:
+                break
+            if time.perf_counter() >= ctx.deadline:
+                break
+
+        result = SearchResult(
+            move=best_move,
+            score=best_score,
+            depth=completed_depth,
+            nodes=ctx.nodes,
+            elapsed=time.perf_counter() - started,
+        )
+        with self._lock:
+            self._searches += 1
+            self._total_nodes += result.nodes
+            self._total_time += result.elapsed
+            self._last_result = result
+        return result
+
+    def get_stats(self) -> dict:
+        with self._lock:
+            last = self._last_result
+            return {
+                "engine": "alpha_beta",
+                "searches": self._searches,
+                "nodes": self._total_nodes,
+                "seconds": round(self._total_time, 3),
+                "nodes_per_second": (
+                    round(self._total_nodes / self._total_time)
+                    if self._total_time > 0
+                    else 0
+                ),
+                "last_depth": last.depth if last else None,
+                "last_nodes_per_second": (
+                    round(last.nodes_per_second) if last else None
+                ),
+            }
+
+    def _geometry(self, size: int, win_length: int) -> _Geometry:
+        key = (size, win_length)
+        geometry = self._geometries.get(key)
+        if geometry is None:
+            geometry = _Geometry(size, win_length)
+            self._geometries[key] = geometry
+        return geometry
+
+    @staticmethod
+    def _hash(geometry: _Geometry, own: int, other: int, side: int) -> int:
+        value = geometry.zobrist_side if side else 0
+        for cell in range(geometry.cells):
+            if own >> cell & 1:
+                value ^= geometry.zobrist[side][cell]
+            elif other >> cell & 1:
+                value ^= geometry.zobrist[1 - side][cell]
+        return value
+
+    def _search_root(
+        self,
+        ctx: _SearchContext,
+        own: int,
+        other: int,
+        side: int,
+        position_hash: int,
+        depth: int,
+        previous_best: Optional[int],
+    ) -> Tuple[int, Optional[int]]:
+        geometry = ctx.geometry
+        free = geometry.full_mask & ~(own | other)
+        alpha = -WIN_SCORE - 1
+        beta = WIN_SCORE + 1
+        best_move = None
+        for cell in self._ordered_moves(ctx, own, other, free, previous_best):
+            bit = 1 << cell
+            if self._is_win(geometry, own | bit, cell):
+                return WIN_SCORE - 1, cell
+            score = -self._negamax(
+                ctx,
+                other,
+                own | bit,
+                1 - side,
+                position_hash ^ geometry.zobrist[side][cell] ^ geometry.zobrist_side,
+                depth - 1,
+                -beta,
+                -alpha,
+                1,
+            )
+            if best_move is None or score > alpha:
+                alpha = score
+                best_move = cell
+        return alpha, best_move
+
+    def _negamax(
+        self,
+        ctx: _SearchContext,
+        own: int,
+        other: int,
+        side: int,
+        position_hash: int,
+        depth: int,
+        alpha: int,
+        beta: int,
+        ply: int,
+    ) -> int:
+        ctx.nodes += 1
+        if (
+            ctx.check_timeout
+            and not ctx.nodes & 1023
+            and time.perf_counter() >= ctx.deadline
+        ):
+            raise _SearchTimeout()
+
+        geometry = ctx.geometry
+        free = geometry.full_mask & ~(own | other)
+        if not free:
+            return 0
+        if depth == 0:
+            return self._evaluate(geometry, own, other)
+
+        original_alpha = alpha
+        table_move = None
+        entry = ctx.table.get(position_hash)
+        if entry is not None:
+            entry_depth, entry_value, entry_flag, table_move = entry
+            if entry_depth >= depth:
+                entry_value = self._from_table(entry_value, ply)
+                if entry_flag == _EXACT:
+                    return entry_value
+                if entry_flag == _LOWER:
+                    alpha = max(alpha, entry_value)
+                else:
+                    beta = min(beta, entry_value)
+                if alpha >= beta:
+                    return entry_value
+
+        best_score = -WIN_SCORE - 1
+        best_move = None
+        for cell in self._ordered_moves(ctx, own, other, free, table_move):
+            bit = 1 << cell
+            if self._is_win(geometry, own | bit, cell):
+                score = WIN_SCORE - ply - 1
+            else:
+                score = -self._negamax(
+                    ctx,
+                    other,
+                    own | bit,
+                    1 - side,
+                    position_hash
+                    ^ geometry.zobrist[side][cell]
+                    ^ geometry.zobrist_side,
+                    depth - 1,
+                    -beta,
+                    -alpha,
+                    ply + 1,
+                )
+            if score > best_score:
+                best_score = score
+                best_move = cell
+            if score > alpha:
+                alpha = score
+            if alpha >= beta:
+                ctx.history[cell] += depth * depth
+                break
+
+        if best_score <= original_alpha:
+            flag = _UPPER
+        elif best_score >= beta:
+            flag = _LOWER
+        else:
+            flag = _EXACT
+        self._store(
+            ctx, position_hash, depth, self._to_table(best_score, ply), flag, best_move
+        )
+        return best_score
+
+    @staticmethod
+    def _store(
+        ctx: _SearchContext,
+        position_hash: int,
+        depth: int,
+        value: int,
+        flag: int,
+        move: Optional[int],
+    ) -> None:
+        table = ctx.table
+        if position_hash in table:
+            table.move_to_end(position_hash)
+        elif len(table) >= ctx.table_size:
+            table.popitem(last=False)
+        table[position_hash] = (depth, value, flag, move)
+
+    @staticmethod
+    def _to_table(score: int, ply: int) -> int:
+        # Оценки выигрыша в таблице храним относительно текущего узла
+        if score >= _MATE_BOUND:
+            return score + ply
+        if score <= -_MATE_BOUND:
+            return score - ply
+        return score
+
+    @staticmethod
+    def _from_table(score: int, ply: int) -> int:
+        if score >= _MATE_BOUND:
+            return score - ply
+        if score <= -_MATE_BOUND:
+            return score + ply
+        return score
+
+    @staticmethod
+    def _is_win(geometry: _Geometry, mask: int, cell: int) -> bool:
+        for win_mask in geometry.masks_by_cell[cell]:
+            if mask & win_mask == win_mask:
+                return True
+        return False
+
+    @staticmethod
+    def _evaluate(geometry: _Geometry, own: int, other: int) -> int:
+        weights = geometry.weights
+        score = 0
+        for win_mask in geometry.win_masks:
+            own_part = own & win_mask
+            other_part = other & win_mask
+            if own_part and not other_part:
+                score += weights[bin(own_part).count("1")]
+            elif other_part and not own_part:
+                score -= weights[bin(other_part).count("1")]
+        return score
+
+    @staticmethod
+    def _ordered_moves(
+        ctx: _SearchContext,
+        own: int,
+        other: int,
+        free: int,
+        first: Optional[int],
+    ) -> List[int]:
+        geometry = ctx.geometry
+        occupied = own | other
+        candidates = free
+        if geometry.local_moves and occupied:
+            near = 0
+            for cell in range(geometry.cells):
+                if occupied >> cell & 1:
+                    near |= geometry.neighbours[cell]
+            candidates &= near
+
+        history = ctx.history
+        moves = [cell for cell in geometry.by_centrality if candidates >> cell & 1]
+        moves.sort(key=lambda cell: -history[cell])
+        if first is not None and candidates >> first & 1:
+            moves.remove(first)
+            moves.insert(0, first)
+        return moves
@@ -0,0 +1,436 @@
+import asyncio
+from dataclasses import replace
+from datetime import datetime
+from typing import Awaitable, Callable, Dict, Optional, List, Tuple
+from uuid import UUID
+from domain.model.current_game import CurrentGame
+from domain.model.difficulty import Difficulty
+from domain.model.game_field import GameField
+from domain.model.game_state import GameState
+from domain.model.game_type import GameType
+from domain.model.leader_stats import LeaderStats
+from domain.model.lobby_game import LobbyGame
+from domain.model.move import Move
+from domain.model.users import User
+from domain.service.async_game_service_interface import AsyncGameServiceInterface
+from domain.service.game_rules import GameRules
+from domain.service.computer_move_worker import ComputerMoveWorker
+from domain.service.game_event_bus import GameEventBus, Listener
+from domain.service.game_cache import GameCache
+from domain.service.game_conflict_error import GameConflictError
+from domain.service.matchmaker import Matchmaker, QueueKey
+from domain.service.user_cache import UserCache
+from datasource.model.current_game_entity import CurrentGameEntity
+from datasource.repository.async_game_repository import AsyncGameRepository
+from datasource.repository.async_user_repository import AsyncUserRepository
+from datasource.mapper.game_mapper import GameMapper
+from datasource.mapper.user_mapper import UserMapper
+
+
+class AsyncGameServiceImpl(AsyncGameServiceInterface):
+    # Попытки записи партии при одновременных изменениях (версия в БД сменилась)
+    MAX_SAVE_ATTEMPTS = 3
+
+    def __init__(
+        self,
+        repository: AsyncGameRepository,
+        user_repository: AsyncUserRepository,
+        rules: GameRules,
+        event_bus: GameEventBus = None,
+        cache: GameCache = None,
+        user_cache: UserCache = None,
+        matchmaker: Matchmaker = None,
+        computer_move_worker: ComputerMoveWorker = None,
+    ):
+        self._repository = repository
+        self._user_repository = user_repository
+        self._mapper = GameMapper()
+        self._user_mapper = UserMapper()
+        self._rules = rules
+        self._event_bus = event_bus
+        self._cache = cache
+        self._user_cache = user_cache
+        self._matchmaker = matchmaker
+        self._computer_move_worker = computer_move_worker
+
+    async def create_game(
+        self,
+        player_id: UUID,
+        game_type: GameType,
+        board_size: int = GameField.DEFAULT_SIZE,
+        win_length: int = GameField.DEFAULT_WIN_LENGTH,
+        difficulty: Optional[Difficulty] = None,
+    ) -> CurrentGame:
+        game = self._rules.new_game(
+            player_id, game_type, board_size, win_length, difficulty
+        )
+
+        return await self._insert(game)
+
+    async def quickmatch(
+        self,
+        player_id: UUID,
+        board_size: int = GameField.DEFAULT_SIZE,
+        win_length: int = GameField.DEFAULT_WIN_LENGTH,
+    ) -> CurrentGame:
+        game = self._rules.new_game(player_id, GameType.PVP, board_size, win_length)
+        key = (board_size, win_length)
+
+        if self._matchmaker:
+            waiting_id = self._matchmaker.waiting_game(key, player_id)
+            if waiting_id:
+                waiting = await self._load(waiting_id)
+                # Партию мог занять соперник из очереди, через /join или в
+                # другом процессе: тогда игрок получает её, а не вторую партию
+                if waiting and not waiting.is_game_over():
+                    return waiting
+                self._matchmaker.discard(key, waiting_id, player_id)
+
+        # Повторный запрос, попавший в другой воркер, находит партию игрока в БД
+        entity = await self._repository.get_active_game(
+            player_id, board_size, win_length
+        )
+        if entity:
+            return self._rejoined(entity, key, player_id)
+
+        if self._matchmaker:
+            while True:
+                candidate_id = self._matchmaker.pop(key, player_id)
+                if not candidate_id:
+                    break
+                entity = await self._repository.claim_game(
+                    player_id, board_size, win_length, candidate_id
+                )
+                if entity:
+                    return await self._matched(entity, key, player_id)
+
+        entity = await self._repository.claim_game(player_id, board_size, win_length)
+        if entity:
+            return await self._matched(entity, key, player_id)
+
+        game = await self._insert(game)
+        if self._matchmaker:
+            self._matchmaker.push(key, game.game_id, player_id)
+        return game
+
+    async def join_game(self, game_id: UUID, player_id: UUID) -> CurrentGame:
+        async def join(game: CurrentGame) -> CurrentGame:
+            self._rules.join(game, player_id)
+            return game
+
+        for attempt in range(self.MAX_SAVE_ATTEMPTS):
+            game = await self._load_for_update(game_id, attempt > 0, join)
+
+            if await self._save(game):
+                return game
+        raise GameConflictError(f"Game with ID {game_id} is being updated")
+
+    async def make_move(
+        self, game_id: UUID, player_id: UUID, move: Move, async_reply: bool = False
+    ) -> CurrentGame:
+        async def play(game: CurrentGame) -> CurrentGame:
+            if self._rules.computer_move_overdue(game):
+                game = await self._recover_computer_move(game)
+            self._rules.play(game, player_id, move)
+            return game
+
+        for attempt in range(self.MAX_SAVE_ATTEMPTS):
+            game = await self._load_for_update(game_id, attempt > 0, play)
+
+            reserved = (
+                async_reply
+                and self._rules.needs_computer_move(game)
+                and self._reserve_computer_move()
+            )
+            if reserved:
+                self._rules.await_computer_move(game)
+            elif self._rules.needs_computer_move(game):
+                # Поиск хода занимает процессор, поэтому выполняется вне цикла событий
+                await asyncio.to_thread(self._rules.apply_computer_move, game)
+            else:
+                self._rules.finish_turn(game, player_id)
+
+            try:
+                saved = await self._save(game)
+            except Exception:
+                if reserved:
+                    self._computer_move_worker.release()
+                raise
+
+            if saved:
+                if reserved:
+                    # Копия: ответ клиенту сериализует исходный объект
+                    self._computer_move_worker.submit(
+                        self._run_computer_move,
+                        replace(game),
+                        asyncio.get_running_loop(),
+                    )
+                return game
+            if reserved:
+                self._computer_move_worker.release()
+        raise GameConflictError(f"Game with ID {game_id} is being updated")
+
+    def _reserve_computer_move(self) -> bool:
+        if not self._computer_move_worker:
+            return False
+        # При переполненной очереди отвечаем синхронно, как без async
+        return self._computer_move_worker.reserve()
+
+    def _run_computer_move(
+        self, game: CurrentGame, loop: asyncio.AbstractEventLoop
+    ) -> None:
+        # Поток фонового пула: поиск хода. Запись выполняется в цикле событий
+        # асинхронным репозиторием, поток ждёт её, чтобы пул учитывал задачу целиком
+        self._rules.resume_computer_move(game)
+        asyncio.run_coroutine_threadsafe(self._store_computer_move(game), loop).result(
+            timeout=self._rules.computer_move_deadline
+        )
+
+    async def _store_computer_move(self, game: CurrentGame) -> None:
+        for attempt in range(self.MAX_SAVE_ATTEMPTS):
+            if attempt > 0:
+                game = await self._load(game.game_id, fresh=True)
+                if not game or game.game_state != GameState.COMPUTER_THINKING:
+                    return
+                await asyncio.to_thread(self._rules.resume_computer_move, game)
+            if await self._save(game):
+                return
+
+    async def get_game(self, game_id: UUID) -> Optional[CurrentGame]:
+        game = await self._load(game_id)
+        if game and self._rules.computer_move_overdue(game):
+            game = await self._recover_computer_move(game)
+        if game and self._event_bus:
+            self._event_bus.remember_game(game)
+        return game
+
+    async def recover_computer_move(self, game_id: UUID) -> None:
+        # Для потоков событий; ответ компьютера придёт подписчикам событием
+        game = await self._load(game_id, fresh=True)
+        if game and self._rules.computer_move_overdue(game):
+            await self._recover_computer_move(game)
+
+    async def get_game_version(self, game_id: UUID) -> Optional[int]:
+        if self._event_bus:
+            version = self._event_bus.known_version(game_id)
+            if version is not None:
+                return version
+        if self._cache:
+            game = await self._cache_call(self._cache, self._cache.get, game_id)
+            if game:
+                # Ждущая хода компьютера партия читается целиком (get_game),
+                # чтобы пропавший фоновый ход был пересчитан
+                if game.game_state == GameState.COMPUTER_THINKING:
+                    return None
+                return game.version
+        version = await self._repository.get_version(game_id)
+        if version is not None and self._event_bus:
+            self._event_bus.remember_version(game_id, version)
+        return version
+
+    async def wait_for_version(
+        self, game_id: UUID, version: int, timeout: float
+    ) -> Optional[CurrentGame]:
+        loop = asyncio.get_running_loop()
+        updates: asyncio.Queue = asyncio.Queue()
+
+        def listener(game: CurrentGame) -> None:
+            loop.call_soon_threadsafe(updates.put_nowait, game)
+
+        if self._event_bus:
+            self._event_bus.subscribe(game_id, listener)
+        try:
+            game = await self.get_game(game_id)
+            deadline = loop.time() + timeout
+            while (
+                game
+                and self._event_bus
+                and game.version <= version
+                and not game.is_game_over()
+            ):
+                remaining = deadline - loop.time()
+                if remaining <= 0:
+                    break
+                try:
+                    update = await asyncio.wait_for(updates.get(), remaining)
+                except asyncio.TimeoutError:
+                    break
+                if update.version > game.version:
+                    game = update
+            return game
+        finally:
+            if self._event_bus:
+                self._event_bus.unsubscribe(game_id, listener)
+
+    async def get_available_games(
+        self,
+        limit: int = 20,
+        after: Optional[Tuple[datetime, UUID]] = None,
+        game_type: Optional[GameType] = None,
+    ) -> List[LobbyGame]:
+        self._rules.check_limit(limit)
+
+        rows = await self._repository.get_available_games(
+            limit, after, game_type.value if game_type else None
+        )
+        return [self._mapper.to_lobby_game(row) for row in rows]
+
+    async def get_completed_games_by_user(
+        self,
+        user_id: UUID,
+        limit: int = 20,
+        after: Optional[Tuple[datetime, UUID]] = None,
+    ) -> List[CurrentGame]:
+        self._rules.check_limit(limit)
+
+        entities = await self._repository.get_completed_games_by_user(
+            user_id, limit, after
+        )
+        return [self._mapper.to_domain(entity) for entity in entities]
+
+    async def get_leaderboard(self, limit: int) -> List[LeaderStats]:
+        self._rules.check_limit(limit)
+
+        leaderboard_data = await self._repository.get_leaderboard(limit)
+        users = await self._find_users([row[0] for row in leaderboard_data])
+
+        return self._mapper.to_leaders(leaderboard_data, users)
+
+    async def _load_for_update(
+        self,
+        game_id: UUID,
+        fresh: bool,
+        apply: Callable[[CurrentGame], Awaitable[CurrentGame]],
+    ) -> CurrentGame:
+        # Ошибка правил на копии из кэша перепроверяется по партии из БД
+        while True:
+            game = await self._load(game_id, fresh=fresh)
+            if not game:
+                raise ValueError(f"Game with ID {game_id} not found")
+            try:
+                return await apply(game)
+            except GameConflictError:
+                raise
+            except ValueError:
+                if fresh or not self._cache:
+                    raise
+                fresh = True
+
+    async def _load(self, game_id: UUID, fresh: bool = False) -> Optional[CurrentGame]:
+        if self._cache and not fresh:
+            if self._event_bus:
+                self._event_bus.start()
+            game = await self._cache_call(self._cache, self._cache.get, game_id)
+            if game:
+                return game
+
+        entity = await self._repository.get_game(game_id)
+        if not entity:
+            return None
+        game = self._mapper.to_domain(entity)
+        if self._cache:
+            await self._cache_call(self._cache, self._cache.put, game)
+        return game
+
+    async def _find_users(self, user_ids: List[UUID]) -> Dict[UUID, User]:
+        users = {}
+        if self._user_cache:
+            users = await self._cache_call(
+                self._user_cache, self._user_cache.get_many, user_ids
+            )
+
+        missing = [user_id for user_id in user_ids if user_id not in users]
+        if missing:
+            found = [
+                self._user_mapper.to_domain(entity)
+                for entity in await self._user_repository.find_by_ids(missing)
+            ]
+            if self._user_cache:
+                await self._cache_call(
+                    self._user_cache, self._user_cache.put_many, found
+                )
+            users.update((user.user_id, user) for user in found)
+        return users
+
+    @staticmethod
+    async def _cache_call(cache, method, *args):
+        # Сетевой кэш не должен блокировать цикл событий
+        if cache.remote:
+            return await asyncio.to_thread(method, *args)
+        return method(*args)
+
+    async def _recover_computer_move(self, game: CurrentGame) -> CurrentGame:
+        # Фоновый ход синхронного сервиса не записан вовремя: отвечаем сами
+        for attempt in range(self.MAX_SAVE_ATTEMPTS):
+            if attempt > 0:
+                game = await self._load(game.game_id, fresh=True)
+                if not game or not self._rules.computer_move_overdue(game):
+                    return game
+            await asyncio.to_thread(self._rules.resume_computer_move, game)
+            if await self._save(game):
+                return game
+        raise GameConflictError(f"Game with ID {game.game_id} is being updated")
+
+    async def _save(self, game: CurrentGame) -> bool:
+        expected_version = self._rules.next_version(game)
+        if self._cache and self._cache.remote:
+            # Общий кэш не должен отдавать прежнюю версию после фиксации хода
+            await self._cache_call(self._cache, self._cache.pending, game)
+        try:
+            updated = await self._repository.update_game(
+                self._mapper.to_entity(game), expected_version
+            )
+        except Exception:
+            if self._cache:
+                await self._cache_call(
+                    self._cache, self._cache.invalidate, game.game_id
+                )
+            raise
+        if updated:
+            await self._saved(game)
+        return updated
+
+    async def _insert(self, game: CurrentGame) -> CurrentGame:
+        saved_entity = await self._repository.save_game(self._mapper.to_entity(game))
+
+        game = self._mapper.to_domain(saved_entity)
+        if self._cache:
+            await self._cache_call(self._cache, self._cache.put, game)
+        return game
+
+    async def _matched(
+        self, entity: CurrentGameEntity, key: QueueKey, player_id: UUID
+    ) -> CurrentGame:
+        game = await self._claimed(entity)
+        if self._matchmaker:
+            self._matchmaker.joined(key, game.game_id, player_id)
+        return game
+
+    def _rejoined(
+        self, entity: CurrentGameEntity, key: QueueKey, player_id: UUID
+    ) -> CurrentGame:
+        game = self._mapper.to_domain(entity)
+        if self._matchmaker:
+            self._matchmaker.joined(key, game.game_id, player_id)
+        return game
+
+    async def _claimed(self, entity: CurrentGameEntity) -> CurrentGame:
+        game = self._mapper.to_domain(entity)
+        await self._saved(game)
+        return game
+
+    async def _saved(self, game: CurrentGame) -> None:
+        if self._cache:
+            await self._cache_call(self._cache, self._cache.put, game)
+        if self._event_bus:
+            # Рассылка может ходить в БД (NOTIFY), поэтому вне цикла событий
+            await asyncio.to_thread(self._event_bus.publish, game)
+
+    def subscribe(self, game_id: UUID, listener: Listener) -> None:
+        if not self._event_bus:
+            raise ValueError("Game events are not available")
+        self._event_bus.subscribe(game_id, listener)
+
+    def unsubscribe(self, game_id: UUID, listener: Listener) -> None:
+        if self._event_bus:
+            self._event_bus.unsubscribe(game_id, listener)
@@ -2,15 +2,23 @@ from typing import Optional
 from uuid import UUID
 from domain.service.user_service import UserService
 from domain.service.jwt_provider import JwtProvider
+from domain.service.password_hasher_busy_error import PasswordHasherBusyError
+from domain.service.verified_token_cache import VerifiedTokenCache
 from domain.model.sign_up_request import SignUpRequest
 from web.model.jwt_request_dto import JwtRequestDto
 from web.model.jwt_response_dto import JwtResponseDto
 
 
 class AuthService:
-    def __init__(self, user_service: UserService, jwt_provider: JwtProvider):
+    def __init__(
+        self,
+        user_service: UserService,
+        jwt_provider: JwtProvider,
+        token_cache: VerifiedTokenCache = None,
+    ):
         self.user_service = user_service
         self.jwt_provider = jwt_provider
+        self.token_cache = token_cache
 
     def register(self, sign_up_request: SignUpRequest) -> bool:
         try:
@@ -23,6 +31,8 @@ class AuthService:
         try:
             user = self.user_service.find_by_login(jwt_request.login)
             if not user:
+                # Ответ занимает столько же времени, сколько неверный пароль
+                self.user_service.verify_unknown_login(jwt_request.password)
                 return None
 
             if not self.user_service.verify_password(user, jwt_request.password):
@@ -35,18 +45,18 @@ class AuthService:
                 type="Bearer", access_token=access_token, refresh_token=refresh_token
             )
 
+        except PasswordHasherBusyError:
+            raise
         except Exception:
             return None
 
     def refresh_access_token(self, refresh_token: str) -> Optional[JwtResponseDto]:
         try:
-            if not self.jwt_provider.validate_refresh_token(refresh_token):
-                return None
-            user_id = self.jwt_provider.get_uuid_from_token(refresh_token)
-            if not user_id:
+            claims = self.jwt_provider.decode(refresh_token)
+            if not claims or claims.token_type != "refresh":
                 return None
 
-            user = self.user_service.find_by_id(user_id)
+            user = self.user_service.find_by_id(claims.user_id)
             if not user:
                 return None
 
@@ -63,14 +73,11 @@ class AuthService:
 
     def refresh_refresh_token(self, refresh_token: str) -> Optional[JwtResponseDto]:
         try:
-            if not self.jwt_provider.validate_refresh_token(refresh_token):
-                return None
-
-            user_id = self.jwt_provider.get_uuid_from_token(refresh_token)
-            if not user_id:
+            claims = self.jwt_provider.decode(refresh_token)
+            if not claims or claims.token_type != "refresh":
                 return None
 
-            user = self.user_service.find_by_id(user_id)
+            user = self.user_service.find_by_id(claims.user_id)
             if not user:
                 return None
 
@@ -88,11 +95,18 @@ class AuthService:
 
     def authenticate_by_token(self, access_token: str) -> Optional[UUID]:
         try:
-            if not self.jwt_provider.validate_access_token(access_token):
+            if self.token_cache:
+                user_id = self.token_cache.get(access_token)
+                if user_id:
+                    return user_id
+
+            claims = self.jwt_provider.decode(access_token)
+            if not claims or claims.token_type != "access":
                 return None
 
-            user_id = self.jwt_provider.get_uuid_from_token(access_token)
-            return user_id
+            if self.token_cache:
+                self.token_cache.put(access_token, claims)
+            return claims.user_id
 
         except Exception:
             return None
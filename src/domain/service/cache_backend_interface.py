@@ -0,0 +1,39 @@
+from abc import ABC, abstractmethod
+from typing import Dict, List, Optional
+
+
+# Хранилище кэша "ключ - байты" с временем жизни записей. Запись с версией
+# заменяет только более старую: запоздавшая запись не затирает новое состояние.
+class CacheBackendInterface(ABC):
+    # Сетевое хранилище: из асинхронного кода его вызывают вне цикла событий
+    remote = False
+
+    @abstractmethod
+    def get(self, key: str) -> Optional[bytes]:
+        pass
+
+    @abstractmethod
+    def set(
+        self, key: str, value: bytes, ttl: float, version: Optional[int] = None
+    ) -> bool:
+        pass
+
+    @abstractmethod
+    def get_many(self, keys: List[str]) -> List[Optional[bytes]]:
+        pass
+
+    @abstractmethod
+    def set_many(self, items: Dict[str, bytes], ttl: float) -> None:
+        pass
+
+    @abstractmethod
+    def delete(self, key: str) -> None:
+        pass
+
+    @abstractmethod
+    def get_stats(self) -> dict:
+        pass
+
+    @abstractmethod
+    def close(self) -> None:
+        pass
@@ -0,0 +1,100 @@
+import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class ComputerMoveWorker:
+    # Ограниченный пул фоновых потоков для ответных ходов компьютера:
+    # не больше `workers` задач выполняется и не больше `max_queue` ждёт
+    def __init__(self, workers: int = 2, max_queue: int = 100):
+        self.workers = workers
+        self.max_queue = max_queue
+        self._executor = ThreadPoolExecutor(
+            max_workers=workers, thread_name_prefix="computer-move"
+        )
+        self._slots = threading.BoundedSemaphore(workers + max_queue)
+        self._lock = threading.Lock()
+        self._queued = 0
+        self._running = 0
+        self._completed = 0
+        self._failed = 0
+        self._rejected = 0
+        self._total_wait = 0.0
+        self._total_compute = 0.0
+        self._max_compute = 0.0
+        self._last_compute: Optional[float] = None
+
+    def reserve(self) -> bool:
+        if self._slots.acquire(blocking=False):
+            return True
+        with self._lock:
+            self._rejected += 1
+        return False
+
+    def release(self) -> None:
+        self._slots.release()
+
+    # Вызывается только после успешного reserve(), слот освобождается по завершении
+    def submit(self, fn: Callable, *args) -> None:
+        with self._lock:
+            self._queued += 1
+        submitted = time.perf_counter()
+
+        def run():
+            started = time.perf_counter()
+            with self._lock:
+                self._queued -= 1
+                self._running += 1
+                self._total_wait += started - submitted
+            failed = False
+            try:
+                fn(*args)
+            except Exception:
+                failed = True
+                logger.exception("Background computer move failed")
+            finally:
+                elapsed = time.perf_counter() - started
+                with self._lock:
+                    self._running -= 1
+                    if failed:
+                        self._failed += 1
+                    else:
+                        self._completed += 1
+                    self._total_compute += elapsed
+                    self._max_compute = max(self._max_compute, elapsed)
+                    self._last_compute = elapsed
+                self._slots.release()
+
+        self._executor.submit(run)
+
+    def get_stats(self) -> dict:
+        with self._lock:
+            finished = self._completed + self._failed
+            return {
+                "workers": self.workers,
+                "max_queue": self.max_queue,
+                "queue_depth": self._queued,
+                "running": self._running,
+                "completed": self._completed,
+                "failed": self._failed,
+                "rejected": self._rejected,
+                "avg_wait_seconds": (
+                    round(self._total_wait / finished, 4) if finished else None
+                ),
+                "avg_compute_seconds": (
+                    round(self._total_compute / finished, 4) if finished else None
+                ),
+                "max_compute_seconds": round(self._max_compute, 4),
+                "last_compute_seconds": (
+                    round(self._last_compute, 4)
+                    if self._last_compute is not None
+                    else None
+                ),
+            }
+
+    def shutdown(self, wait: bool = True) -> None:
+        self._executor.shutdown(wait=wait)
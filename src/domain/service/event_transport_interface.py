@@ -0,0 +1,18 @@
+from abc import ABC, abstractmethod
+from typing import Callable
+
+
+# Доставка событий шины между процессами сервера. Сообщения - готовые строки,
+# каждый процесс получает и свои, и чужие сообщения через deliver.
+class EventTransportInterface(ABC):
+    @abstractmethod
+    def start(self, deliver: Callable[[str], None]) -> None:
+        pass
+
+    @abstractmethod
+    def publish(self, message: str) -> None:
+        pass
+
+    @abstractmethod
+    def close(self) -> None:
+        pass
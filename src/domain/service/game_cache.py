@@ -0,0 +1,172 @@
+import struct
+import threading
+from datetime import datetime, timezone
+from typing import Optional
+from uuid import UUID
+from domain.model.current_game import CurrentGame
+from domain.model.difficulty import Difficulty
+from domain.model.game_field import GameField
+from domain.model.game_state import GameState
+from domain.model.game_type import GameType
+from domain.model.player_symbol import PlayerSymbol
+from domain.service.cache_backend_interface import CacheBackendInterface
+
+
+# Кэш активных партий поверх хранилища (в памяти процесса или общего для
+# узлов). Пишется сквозным образом при каждом сохранении партии, поэтому
+# чтение партии перед ходом и запросы состояния не ходят в БД.
+class GameCache:
+    TTL = 300.0
+    # Сколько живёт метка записи, если записавший процесс не дошёл до put()
+    PENDING_TTL = 30.0
+    KEY_PREFIX = "ttt:game:"
+
+    def __init__(self, backend: CacheBackendInterface, ttl: float = TTL):
+        self._backend = backend
+        self._ttl = ttl
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._misses = 0
+
+    @property
+    def remote(self) -> bool:
+        return self._backend.remote
+
+    def get(self, game_id: UUID) -> Optional[CurrentGame]:
+        data = self._backend.get(self._key(game_id))
+        with self._lock:
+            if not data:
+                self._misses += 1
+            else:
+                self._hits += 1
+        # Каждый раз новый объект: сервис меняет партию на месте
+        return unpack_game(data) if data else None
+
+    def put(self, game: CurrentGame) -> None:
+        # Запоздавшая запись (событие другого воркера, чтение до чужого хода)
+        # не откатывает более новую версию. Версия записи в хранилище -
+        # удвоенная версия партии: между соседними помещается метка pending()
+        self._backend.set(
+            self._key(game.game_id), pack_game(game), self._ttl, game.version * 2
+        )
+
+    def pending(self, game: CurrentGame) -> None:
+        # Ставится перед записью версии game.version в БД. До put() узлы
+        # получают промах и читают БД, а прочитанная ими прежняя версия не
+        # займёт ключ. Если процесс упадёт между фиксацией и put(), первый же
+        # промах положит в кэш новую версию из БД, а не старую
+        self._backend.set(
+            self._key(game.game_id), b"", self.PENDING_TTL, game.version * 2 - 1
+        )
+
+    def invalidate(self, game_id: UUID) -> None:
+        self._backend.delete(self._key(game_id))
+
+    def get_stats(self) -> dict:
+        with self._lock:
+            lookups = self._hits + self._misses
+            stats = {
+                "ttl": self._ttl,
+                "hits": self._hits,
+                "misses": self._misses,
+                "hit_ratio": round(self._hits / lookups, 4) if lookups else 0.0,
+            }
+        stats.update(self._backend.get_stats())
+        return stats
+
+    def _key(self, game_id: UUID) -> str:
+        return f"{self.KEY_PREFIX}{game_id.hex}"
+
+
+# Компактная двоичная запись партии (около 130 байт вместо ~450 в JSON).
+# Первый байт - номер формата, отсутствующий игрок записывается нулевым UUID,
+# отсутствующее время - нулём.
+_FORMAT = 2
+_GAME = struct.Struct(">B16sBBQQBBBBB16s16s16s16sdQd")
+_GAME_TYPES = tuple(GameType)
+_GAME_STATES = tuple(GameState)
+_DIFFICULTIES = (None,) + tuple(Difficulty)
+_NO_ID = bytes(16)
+
+
+def pack_game(game: CurrentGame) -> bytes:
+    field = game.game_field
+    created_at = game.created_at or datetime.utcnow()
+    return _GAME.pack(
+        _FORMAT,
+        game.game_id.bytes,
+        field.size,
+        field.win_length,
+        field.x_mask,
+        field.o_mask,
+        _GAME_TYPES.index(game.game_type),
+        _GAME_STATES.index(game.game_state),
+        game.player1_symbol.value,
+        game.player2_symbol.value,
+        _DIFFICULTIES.index(game.difficulty),
+        game.player1_id.bytes,
+        _id_bytes(game.player2_id),
+        _id_bytes(game.current_player_id),
+        _id_bytes(game.winner_id),
+        _timestamp(created_at),
+        game.version,
+        _timestamp(game.updated_at),
+    )
+
+
+def unpack_game(data: bytes) -> Optional[CurrentGame]:
+    if len(data) != _GAME.size or data[0] != _FORMAT:
+        # Запись другой версии формата (во время выкладки) считаем промахом
+        return None
+    (
+        _,
+        game_id,
+        size,
+        win_length,
+        x_mask,
+        o_mask,
+        game_type,
+        game_state,
+        player1_symbol,
+        player2_symbol,
+        difficulty,
+        player1_id,
+        player2_id,
+        current_player_id,
+        winner_id,
+        created_at,
+        version,
+        updated_at,
+    ) = _GAME.unpack(data)
+    return CurrentGame(
+        game_id=UUID(bytes=game_id),
+        game_field=GameField(x_mask, o_mask, size, win_length),
+        game_type=_GAME_TYPES[game_type],
+        game_state=_GAME_STATES[game_state],
+        player1_id=UUID(bytes=player1_id),
+        player2_id=_id_from_bytes(player2_id),
+        player1_symbol=PlayerSymbol.from_value(player1_symbol),
+        player2_symbol=PlayerSymbol.from_value(player2_symbol),
+        current_player_id=_id_from_bytes(current_player_id),
+        winner_id=_id_from_bytes(winner_id),
+        created_at=_datetime(created_at),
+        difficulty=_DIFFICULTIES[difficulty],
+        version=version,
+        updated_at=_datetime(updated_at) if updated_at else None,
+    )
+
+
+def _timestamp(value: Optional[datetime]) -> float:
+    return value.replace(tzinfo=timezone.utc).timestamp() if value else 0.0
+
+
+def _datetime(value: float) -> datetime:
+    return datetime.fromtimestamp(value, timezone.utc).replace(tzinfo=None)
+
+
+def _id_bytes(value: Optional[UUID]) -> bytes:
+    return value.bytes if value else _NO_ID
+
+
+def _id_from_bytes(value: bytes) -> Optional[UUID]:
+    return UUID(bytes=value) if value != _NO_ID else None
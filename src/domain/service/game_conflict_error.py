@@ -0,0 +1,4 @@
+# Партию одновременно изменил другой запрос, и повторные попытки не помогли.
+# Наследует ValueError, поэтому без отдельной обработки остаётся ошибкой запроса
+class GameConflictError(ValueError):
+    pass
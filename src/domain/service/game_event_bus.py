@@ -0,0 +1,218 @@
+import json
+import logging
+import os
+import threading
+import time
+from collections import OrderedDict, defaultdict
+from datetime import datetime
+from typing import Callable, Dict, List, Optional, Tuple
+from uuid import UUID, uuid4
+from domain.model.current_game import CurrentGame
+from domain.model.difficulty import Difficulty
+from domain.model.game_field import GameField
+from domain.model.game_state import GameState
+from domain.model.game_type import GameType
+from domain.model.player_symbol import PlayerSymbol
+from domain.service.event_transport_interface import EventTransportInterface
+
+logger = logging.getLogger(__name__)
+
+Listener = Callable[[CurrentGame], None]
+
+
+# Шина изменений партий внутри процесса: подписчики (SSE-потоки) получают
+# новое состояние игры сразу после записи в БД. С транспортом события
+# дополнительно расходятся по остальным воркерам сервера.
+class GameEventBus:
+    # Последние известные версии партий, чтобы отвечать 304 без запроса в БД
+    MAX_VERSIONS = 100_000
+    VERSION_TTL = 30.0
+
+    def __init__(self, transport: Optional[EventTransportInterface] = None):
+        self._transport = transport
+        self._versions: "OrderedDict[UUID, Tuple[int, float]]" = OrderedDict()
+        self._listeners: Dict[UUID, List[Listener]] = defaultdict(list)
+        self._observers: List[Listener] = []
+        self._lock = threading.Lock()
+        self._origin = uuid4().hex
+        self._started_pid: Optional[int] = None
+        self._published = 0
+        self._delivered = 0
+
+    def subscribe(self, game_id: UUID, listener: Listener) -> None:
+        self.start()
+        with self._lock:
+            self._listeners[game_id].append(listener)
+
+    def observe(self, listener: Listener) -> None:
+        # Получает изменения всех партий (например, кэш партий)
+        with self._lock:
+            self._observers.append(listener)
+
+    def unsubscribe(self, game_id: UUID, listener: Listener) -> None:
+        with self._lock:
+            listeners = self._listeners.get(game_id)
+            if listeners and listener in listeners:
+                listeners.remove(listener)
+                if not listeners:
+                    del self._listeners[game_id]
+
+    def publish(self, game: CurrentGame) -> None:
+        with self._lock:
+            self._published += 1
+        self._deliver_local(game)
+        if self._transport is None:
+            return
+        self.start()
+        try:
+            self._transport.publish(
+                json.dumps({"origin": self._origin, "game": encode_game(game)})
+            )
+        except Exception:
+            # Подписчики этого процесса уже получили событие, остальные
+            # догонят состояние при следующем изменении или переподключении
+            logger.exception("Failed to publish game event %s", game.game_id)
+
+    def known_version(self, game_id: UUID) -> Optional[int]:
+        # Без общего транспорта запись могла пройти в другом воркере мимо шины,
+        # поэтому версии из памяти доверяем только при рассылке между процессами.
+        # TTL ограничивает устаревание, если уведомление было потеряно.
+        if self._transport is None:
+            return None
+        self.start()
+        with self._lock:
+            entry = self._versions.get(game_id)
+            if entry is None:
+                return None
+            version, seen_at = entry
+            if time.monotonic() - seen_at > self.VERSION_TTL:
+                del self._versions[game_id]
+                return None
+            return version
+
+    def remember_version(self, game_id: UUID, version: int) -> None:
+        with self._lock:
+            self._remember_version(game_id, version)
+
+    def remember_game(self, game: CurrentGame) -> None:
+        with self._lock:
+            self._remember_game(game)
+
+    def _remember_game(self, game: CurrentGame) -> None:
+        # Версия партии, ждущей хода компьютера, не запоминается: ответ 304 по
+        # ней не дошёл бы до проверки, не пропал ли фоновый ход
+        if game.game_state == GameState.COMPUTER_THINKING:
+            self._versions.pop(game.game_id, None)
+        else:
+            self._remember_version(game.game_id, game.version)
+
+    def _remember_version(self, game_id: UUID, version: int) -> None:
+        entry = self._versions.get(game_id)
+        if entry is not None and entry[0] > version:
+            return
+        self._versions[game_id] = (version, time.monotonic())
+        self._versions.move_to_end(game_id)
+        if len(self._versions) > self.MAX_VERSIONS:
+            self._versions.popitem(last=False)
+
+    def get_stats(self) -> dict:
+        with self._lock:
+            return {
+                "subscribers": sum(len(items) for items in self._listeners.values()),
+                "games": len(self._listeners),
+                "published": self._published,
+                "delivered": self._delivered,
+            }
+
+    def close(self) -> None:
+        if self._transport is not None:
+            self._transport.close()
+
+    def start(self) -> None:
+        # Транспорт запускается в каждом воркере после fork, а не в мастере
+        if self._transport is None or self._started_pid == os.getpid():
+            return
+        with self._lock:
+            if self._started_pid == os.getpid():
+                return
+            self._transport.start(self._on_message)
+            self._started_pid = os.getpid()
+
+    def _on_message(self, message: str) -> None:
+        try:
+            data = json.loads(message)
+            if data.get("origin") == self._origin:
+                return
+            game = decode_game(data["game"])
+        except (ValueError, KeyError, TypeError):
+            logger.warning("Ignoring malformed game event")
+            return
+        self._deliver_local(game)
+
+    def _deliver_local(self, game: CurrentGame) -> None:
+        with self._lock:
+            self._remember_game(game)
+            listeners = list(self._listeners.get(game.game_id, ()))
+            self._delivered += len(listeners)
+            listeners = self._observers + listeners
+        for listener in listeners:
+            try:
+                listener(game)
+            except Exception:
+                logger.exception("Game event listener failed")
+
+
+def encode_game(game: CurrentGame) -> dict:
+    return {
+        "game_id": str(game.game_id),
+        "size": game.game_field.size,
+        "win_length": game.game_field.win_length,
+        "x_mask": game.game_field.x_mask,
+        "o_mask": game.game_field.o_mask,
+        "game_type": game.game_type.value,
+        "game_state": game.game_state.value,
+        "player1_id": str(game.player1_id),
+        "player2_id": str(game.player2_id) if game.player2_id else None,
+        "player1_symbol": game.player1_symbol.value,
+        "player2_symbol": game.player2_symbol.value,
+        "current_player_id": (
+            str(game.current_player_id) if game.current_player_id else None
+        ),
+        "winner_id": str(game.winner_id) if game.winner_id else None,
+        "created_at": game.created_at.isoformat() if game.created_at else None,
+        "difficulty": game.difficulty.value if game.difficulty else None,
+        "version": game.version,
+        "updated_at": game.updated_at.isoformat() if game.updated_at else None,
+    }
+
+
+def decode_game(data: dict) -> CurrentGame:
+    return CurrentGame(
+        game_id=UUID(data["game_id"]),
+        game_field=GameField(
+            data["x_mask"], data["o_mask"], data["size"], data["win_length"]
+        ),
+        game_type=GameType(data["game_type"]),
+        game_state=GameState(data["game_state"]),
+        player1_id=UUID(data["player1_id"]),
+        player2_id=UUID(data["player2_id"]) if data["player2_id"] else None,
+        player1_symbol=PlayerSymbol.from_value(data["player1_symbol"]),
+        player2_symbol=PlayerSymbol.from_value(data["player2_symbol"]),
+        current_player_id=(
+            UUID(data["current_player_id"]) if data["current_player_id"] else None
+        ),
+        winner_id=UUID(data["winner_id"]) if data["winner_id"] else None,
+        created_at=(
+            datetime.fromisoformat(data["created_at"])
+            if data["created_at"]
+            else datetime.utcnow()
+        ),
+        difficulty=Difficulty(data["difficulty"]) if data["difficulty"] else None,
+        version=data["version"],
+        # События воркеров прежней версии приходят без updated_at
+        updated_at=(
+            datetime.fromisoformat(data["updated_at"])
+            if data.get("updated_at")
+            else None
+        ),
+    )
@@ -0,0 +1,263 @@
+import logging
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional
+from uuid import UUID, uuid4
+from domain.model.current_game import CurrentGame
+from domain.model.difficulty import Difficulty
+from domain.model.game_field import GameField
+from domain.model.game_state import GameState
+from domain.model.game_type import GameType
+from domain.model.move import Move
+from domain.model.player_symbol import PlayerSymbol
+from domain.service.search_engine_interface import SearchEngineInterface
+
+logger = logging.getLogger(__name__)
+
+
+# Правила игры над CurrentGame в памяти, без обращения к хранилищу.
+# Общие для синхронного и асинхронного сервисов.
+class GameRules:
+    # Сколько секунд партия может ждать фоновый ход компьютера. Дольше - задача
+    # потеряна (ошибка записи, перезапуск воркера), и ход вычисляется заново
+    COMPUTER_MOVE_DEADLINE = 30.0
+
+    def __init__(
+        self,
+        engines: List[SearchEngineInterface],
+        difficulty_engines: Dict[Difficulty, SearchEngineInterface] = None,
+        computer_move_deadline: float = COMPUTER_MOVE_DEADLINE,
+    ):
+        # Движки перебираются по порядку, ход делает первый поддерживающий поле
+        self.engines = engines
+        # Альтернативные соперники (MCTS), выбираемые уровнем сложности игры
+        self.difficulty_engines = difficulty_engines if difficulty_engines else {}
+        self.computer_move_deadline = computer_move_deadline
+
+    def new_game(
+        self,
+        player_id: UUID,
+        game_type: GameType,
+        board_size: int = GameField.DEFAULT_SIZE,
+        win_length: int = GameField.DEFAULT_WIN_LENGTH,
+        difficulty: Optional[Difficulty] = None,
+    ) -> CurrentGame:
+        if difficulty and game_type != GameType.PVC:
+            raise ValueError("Difficulty applies only to PvC games")
+        if difficulty and difficulty not in self.difficulty_engines:
+            raise ValueError(f"Difficulty '{difficulty.value}' is not available")
+
+        game_id = uuid4()
+        game_field = GameField(size=board_size, win_length=win_length)
+
+        player1_symbol = PlayerSymbol.X
+        player2_symbol = PlayerSymbol.O
+
+        if game_type == GameType.PVP:
+            return CurrentGame(
+                game_id=game_id,
+                game_field=game_field,
+                game_type=game_type,
+                game_state=GameState.WAITING_FOR_PLAYER,
+                player1_id=player_id,
+                player2_id=None,
+                player1_symbol=player1_symbol,
+                player2_symbol=player2_symbol,
+                current_player_id=None,
+                winner_id=None,
+            )
+        return CurrentGame(
+            game_id=game_id,
+            game_field=game_field,
+            game_type=game_type,
+            game_state=GameState.PLAYER_TURN,
+            player1_id=player_id,
+            player2_id=None,
+            player1_symbol=player1_symbol,
+            player2_symbol=player2_symbol,
+            current_player_id=player_id,
+            winner_id=None,
+            difficulty=difficulty,
+        )
+
+    def join(self, game: CurrentGame, player_id: UUID) -> None:
+        if game.game_state != GameState.WAITING_FOR_PLAYER:
+            raise ValueError("Game is not available for joining")
+
+        if game.game_type != GameType.PVP:
+            raise ValueError("Only PvP games can be joined")
+
+        if game.player1_id == player_id:
+            raise ValueError("Cannot join your own game")
+
+        game.player2_id = player_id
+        game.game_state = GameState.PLAYER_TURN
+        game.current_player_id = game.player1_id
+
+    def play(self, game: CurrentGame, player_id: UUID, move: Move) -> None:
+        if game.is_game_over():
+            raise ValueError("Game is already over")
+
+        if not game.is_player_turn(player_id):
+            raise ValueError("Not your turn")
+
+        symbol = game.get_player_symbol(player_id)
+        cell = self.resolve_cell(game.game_field, move, symbol)
+        game.game_field = game.game_field.with_move(cell, symbol.value)
+
+        self.update_game_state(game)
+
+    # Ответ компьютера вычисляется в фоне, игрок ждёт его без права хода
+    @staticmethod
+    def await_computer_move(game: CurrentGame) -> None:
+        game.game_state = GameState.COMPUTER_THINKING
+        game.current_player_id = None
+
+    def needs_computer_move(self, game: CurrentGame) -> bool:
+        return not game.is_game_over() and game.game_type == GameType.PVC
+
+    # Передача хода после хода игрока: ответ компьютера в PvC или смена игрока в PvP
+    def finish_turn(self, game: CurrentGame, player_id: UUID) -> None:
+        if self.needs_computer_move(game):
+            self.apply_computer_move(game)
+        elif not game.is_game_over() and game.game_type == GameType.PVP:
+            game.current_player_id = game.get_opponent_id(player_id)
+
+    def apply_computer_move(self, game: CurrentGame) -> None:
+        self._apply_engine_move(game, self.select_engine(game))
+
+    # Ответ компьютера в партии, ожидающей его (COMPUTER_THINKING). Если поиск
+    # не удался, ход ищут остальные движки, поддерживающие поле; если не смог
+    # ни один, партия прерывается: отдать ход игроку значит дать ему два хода подряд
+    def resume_computer_move(self, game: CurrentGame) -> None:
+        game.game_state = GameState.PLAYER_TURN
+        candidates = [self.difficulty_engines.get(game.difficulty)] + [
+            engine for engine in self.engines if engine.supports(game.game_field)
+        ]
+        tried = []
+        for engine in candidates:
+            if engine is None or engine in tried:
+                continue
+            tried.append(engine)
+            try:
+                self._apply_engine_move(game, engine)
+                return
+            except Exception:
+                logger.exception(
+                    "Computer move by %s failed in game %s",
+                    type(engine).__name__,
+                    game.game_id,
+                )
+        game.game_state = GameState.ABORTED
+        game.current_player_id = None
+
+    def _apply_engine_move(
+        self, game: CurrentGame, engine: SearchEngineInterface
+    ) -> None:
+        result = engine.search(game.game_field, game.player2_symbol)
+        logger.debug(
+            "Computer move in game %s: depth=%d nodes=%d nps=%.0f",
+            game.game_id,
+            result.depth,
+            result.nodes,
+            result.nodes_per_second,
+        )
+
+        if result.move is not None:
+            game.game_field = game.game_field.with_move(
+                result.move, game.player2_symbol.value
+            )
+
+            self.update_game_state(game)
+
+            if not game.is_game_over():
+                game.current_player_id = game.player1_id
+
+    def computer_move_overdue(self, game: CurrentGame) -> bool:
+        if game.game_state != GameState.COMPUTER_THINKING:
+            return False
+        since = game.updated_at or game.created_at
+        return datetime.utcnow() - since > timedelta(
+            seconds=self.computer_move_deadline
+        )
+
+    def select_engine(self, game: CurrentGame) -> SearchEngineInterface:
+        if game.difficulty in self.difficulty_engines:
+            return self.difficulty_engines[game.difficulty]
+        for engine in self.engines:
+            if engine.supports(game.game_field):
+                return engine
+        raise ValueError("No search engine supports this board")
+
+    @staticmethod
+    def resolve_cell(game_field: GameField, move: Move, symbol: PlayerSymbol) -> int:
+        if move.board is not None:
+            return GameRules._cell_from_board(game_field, move.board, symbol)
+
+        if move.cell is not None:
+            cell = move.cell
+        elif move.row is not None and move.col is not None:
+            if not (
+                0 <= move.row < game_field.size and 0 <= move.col < game_field.size
+            ):
+                raise ValueError("Move is outside the board")
+            cell = move.row * game_field.size + move.col
+        else:
+            raise ValueError("Move must specify row and col or cell")
+
+        if not 0 <= cell < game_field.cells:
+            raise ValueError("Move is outside the board")
+        if game_field.occupied_mask >> cell & 1:
+            raise ValueError("Cell is already occupied")
+        return cell
+
+    @staticmethod
+    def _cell_from_board(
+        game_field: GameField, board: GameField, symbol: PlayerSymbol
+    ) -> int:
+        # Старый формат: новая доска должна отличаться ровно одной фигурой игрока
+        if board.size != game_field.size:
+            raise ValueError("Invalid board format")
+        own = game_field.mask_of(symbol.value)
+        other = game_field.occupied_mask & ~own
+        new_own = board.mask_of(symbol.value)
+        new_other = board.occupied_mask & ~new_own
+        added = new_own & ~own
+        if new_other != other or own & ~new_own or not added or added & (added - 1):
+            raise ValueError(
+                "Board must differ from the current one by exactly one move"
+            )
+        return added.bit_length() - 1
+
+    # Новая версия партии перед записью: по прежней версия проверяется в UPDATE
+    @staticmethod
+    def next_version(game: CurrentGame) -> int:
+        game.version += 1
+        game.updated_at = datetime.utcnow()
+        return game.version - 1
+
+    @staticmethod
+    def check_limit(limit: int) -> None:
+        if limit < 1:
+            raise ValueError("Limit must be greater than 0")
+        if limit > 100:
+            raise ValueError("Limit must not exceed 100")
+
+    @staticmethod
+    def update_game_state(game: CurrentGame) -> None:
+        winner_symbol = game.game_field.winner()
+
+        if winner_symbol is not None:
+            if winner_symbol == game.player1_symbol.value:
+                game.winner_id = game.player1_id
+            elif winner_symbol == game.player2_symbol.value:
+                if game.game_type == GameType.PVP:
+                    game.winner_id = game.player2_id
+                else:
+                    game.winner_id = None
+
+            game.game_state = GameState.PLAYER_WON
+            game.current_player_id = None
+        elif game.game_field.is_full():
+            game.game_state = GameState.DRAW
+            game.current_player_id = None
+            game.winner_id = None
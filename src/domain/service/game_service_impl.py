@@ -1,281 +1,455 @@
-from typing import Optional, List
-from uuid import UUID, uuid4
+import queue
+import time
+from datetime import datetime
+from typing import Callable, Dict, Optional, List, Tuple
+from uuid import UUID
 from domain.model.current_game import CurrentGame
+from domain.model.difficulty import Difficulty
 from domain.model.game_field import GameField
 from domain.model.game_state import GameState
 from domain.model.game_type import GameType
-from domain.model.player_symbol import PlayerSymbol
 from domain.model.leader_stats import LeaderStats
+from domain.model.lobby_game import LobbyGame
+from domain.model.move import Move
+from domain.model.position_analysis import PositionAnalysis
 from domain.service.game_service_interface import GameServiceInterface
 from domain.service.user_service import UserService
+from domain.service.search_engine_interface import SearchEngineInterface
+from domain.service.game_rules import GameRules
+from domain.service.alpha_beta_engine import AlphaBetaEngine
+from domain.service.tablebase import Tablebase
+from domain.service.computer_move_worker import ComputerMoveWorker
+from domain.service.position_analyzer import PositionAnalyzer
+from domain.service.game_event_bus import GameEventBus, Listener
+from domain.service.game_cache import GameCache
+from domain.service.game_conflict_error import GameConflictError
+from domain.service.matchmaker import Matchmaker, QueueKey
+from datasource.model.current_game_entity import CurrentGameEntity
 from datasource.repository.game_repository import GameRepository
 from datasource.mapper.game_mapper import GameMapper
 
 
 class GameServiceImpl(GameServiceInterface):
-    def __init__(self, repository: GameRepository, user_service: UserService = None):
+    # Попытки записи партии при одновременных изменениях (версия в БД сменилась)
+    MAX_SAVE_ATTEMPTS = 3
+
+    def __init__(
+        self,
+        repository: GameRepository,
+        user_service: UserService = None,
+        engines: List[SearchEngineInterface] = None,
+        difficulty_engines: Dict[Difficulty, SearchEngineInterface] = None,
+        computer_move_worker: ComputerMoveWorker = None,
+        repository_factory: Callable[[], GameRepository] = None,
+        position_analyzer: PositionAnalyzer = None,
+        event_bus: GameEventBus = None,
+        cache: GameCache = None,
+        matchmaker: Matchmaker = None,
+        computer_move_deadline: float = GameRules.COMPUTER_MOVE_DEADLINE,
+    ):
         self._repository = repository
         self._mapper = GameMapper()
         self._user_service = user_service
+        self._rules = GameRules(
+            engines if engines else [Tablebase.build(), AlphaBetaEngine()],
+            difficulty_engines,
+            computer_move_deadline,
+        )
+        # Фоновые ходы компьютера работают со своим репозиторием (своей сессией)
+        self._computer_move_worker = computer_move_worker
+        self._repository_factory = repository_factory
+        self._position_analyzer = position_analyzer
+        self._event_bus = event_bus
+        self._cache = cache
+        self._matchmaker = matchmaker
+
+    def create_game(
+        self,
+        player_id: UUID,
+        game_type: GameType,
+        board_size: int = GameField.DEFAULT_SIZE,
+        win_length: int = GameField.DEFAULT_WIN_LENGTH,
+        difficulty: Optional[Difficulty] = None,
+    ) -> CurrentGame:
+        game = self._rules.new_game(
+            player_id, game_type, board_size, win_length, difficulty
+        )
 
-    def create_game(self, player_id: UUID, game_type: GameType) -> CurrentGame:
-        game_id = uuid4()
-        empty_board = [[0, 0, 0], [0, 0, 0], [0, 0, 0]]
-        game_field = GameField(board=empty_board)
-
-        player1_symbol = PlayerSymbol.X
-        player2_symbol = PlayerSymbol.O
-
-        if game_type == GameType.PVP:
-            game = CurrentGame(
-                game_id=game_id,
-                game_field=game_field,
-                game_type=game_type,
-                game_state=GameState.WAITING_FOR_PLAYER,
-                player1_id=player_id,
-                player2_id=None,
-                player1_symbol=player1_symbol,
-                player2_symbol=player2_symbol,
-                current_player_id=None,
-                winner_id=None,
-            )
-        else:
-            game = CurrentGame(
-                game_id=game_id,
-                game_field=game_field,
-                game_type=game_type,
-                game_state=GameState.PLAYER_TURN,
-                player1_id=player_id,
-                player2_id=None,
-                player1_symbol=player1_symbol,
-                player2_symbol=player2_symbol,
-                current_player_id=player_id,
-                winner_id=None,
-            )
+        return self._insert(game)
 
-        entity = self._mapper.to_entity(game)
-        saved_entity = self._repository.save_game(entity)
+    def quickmatch(
+        self,
+        player_id: UUID,
+        board_size: int = GameField.DEFAULT_SIZE,
+        win_length: int = GameField.DEFAULT_WIN_LENGTH,
+    ) -> CurrentGame:
+        # Партия на случай, если соперника нет; заодно проверяет параметры поля
+        game = self._rules.new_game(player_id, GameType.PVP, board_size, win_length)
+        key = (board_size, win_length)
+
+        if self._matchmaker:
+            # Повторный запрос игрока возвращает его же партию, пока она не окончена
+            waiting_id = self._matchmaker.waiting_game(key, player_id)
+            if waiting_id:
+                waiting = self._load(waiting_id)
+                # Партию мог занять соперник из очереди, через /join или в
+                # другом процессе: тогда игрок получает её, а не вторую партию
+                if waiting and not waiting.is_game_over():
+                    return waiting
+                self._matchmaker.discard(key, waiting_id, player_id)
+
+        # Очередь есть в каждом процессе: повторный запрос, попавший в другой
+        # воркер, находит партию игрока в БД и не создаёт вторую
+        entity = self._repository.get_active_game(player_id, board_size, win_length)
+        if entity:
+            return self._rejoined(entity, key, player_id)
+
+        if self._matchmaker:
+            # Партию из очереди мог занять /join или другой процесс: тогда
+            # захват не удаётся и берётся следующая
+            while True:
+                candidate_id = self._matchmaker.pop(key, player_id)
+                if not candidate_id:
+                    break
+                entity = self._repository.claim_game(
+                    player_id, board_size, win_length, candidate_id
+                )
+                if entity:
+                    return self._matched(entity, key, player_id)
+
+        entity = self._repository.claim_game(player_id, board_size, win_length)
+        if entity:
+            return self._matched(entity, key, player_id)
 
-        return self._mapper.to_domain(saved_entity)
+        game = self._insert(game)
+        if self._matchmaker:
+            self._matchmaker.push(key, game.game_id, player_id)
+        return game
 
     def join_game(self, game_id: UUID, player_id: UUID) -> CurrentGame:
-        entity = self._repository.get_game(game_id)
-        if not entity:
-            raise ValueError(f"Game with ID {game_id} not found")
-
-        game = self._mapper.to_domain(entity)
-
-        if game.game_state != GameState.WAITING_FOR_PLAYER:
-            raise ValueError("Game is not available for joining")
+        def join(game: CurrentGame) -> CurrentGame:
+            self._rules.join(game, player_id)
+            return game
 
-        if game.game_type != GameType.PVP:
-            raise ValueError("Only PvP games can be joined")
+        for attempt in range(self.MAX_SAVE_ATTEMPTS):
+            game = self._load_for_update(game_id, attempt > 0, join)
 
-        if game.player1_id == player_id:
-            raise ValueError("Cannot join your own game")
-
-        game.player2_id = player_id
-        game.game_state = GameState.PLAYER_TURN
-        game.current_player_id = game.player1_id
-
-        entity = self._mapper.to_entity(game)
-        saved_entity = self._repository.save_game(entity)
-
-        return self._mapper.to_domain(saved_entity)
+            if self._save(game):
+                return game
+        raise GameConflictError(f"Game with ID {game_id} is being updated")
 
     def make_move(
-        self, game_id: UUID, player_id: UUID, board: List[List[int]]
+        self,
+        game_id: UUID,
+        player_id: UUID,
+        move: Move,
+        async_reply: bool = False,
     ) -> CurrentGame:
-
-        entity = self._repository.get_game(game_id)
+        # Если партию изменили между чтением и записью, ход проверяется
+        # заново на свежем состоянии: например, очередь хода уже перешла
+        def play(game: CurrentGame) -> CurrentGame:
+            if self._rules.computer_move_overdue(game):
+                game = self._recover_computer_move(game)
+            self._rules.play(game, player_id, move)
+            return game
+
+        for attempt in range(self.MAX_SAVE_ATTEMPTS):
+            game = self._load_for_update(game_id, attempt > 0, play)
+
+            reserved = (
+                async_reply
+                and self._rules.needs_computer_move(game)
+                and self._reserve_computer_move()
+            )
+            if reserved:
+                self._rules.await_computer_move(game)
+            else:
+                self._rules.finish_turn(game, player_id)
+
+            # Ход игрока, ответ компьютера и смена хода записываются одним UPDATE
+            try:
+                saved = self._save(game)
+            except Exception:
+                if reserved:
+                    self._computer_move_worker.release()
+                raise
+
+            if saved:
+                if reserved:
+                    self._computer_move_worker.submit(
+                        self._run_computer_move, game.game_id
+                    )
+                return game
+            if reserved:
+                self._computer_move_worker.release()
+        raise GameConflictError(f"Game with ID {game_id} is being updated")
+
+    def _reserve_computer_move(self) -> bool:
+        if not self._computer_move_worker or not self._repository_factory:
+            return False
+        # При переполненной очереди отвечаем синхронно, как без async
+        return self._computer_move_worker.reserve()
+
+    def _run_computer_move(self, game_id: UUID) -> None:
+        repository = self._repository_factory()
+        try:
+            for attempt in range(self.MAX_SAVE_ATTEMPTS):
+                game = self._load(game_id, repository, fresh=attempt > 0)
+                if not game or game.game_state != GameState.COMPUTER_THINKING:
+                    return
+                self._rules.resume_computer_move(game)
+                if self._save(game, repository):
+                    return
+        finally:
+            repository.close()
+
+    def _recover_computer_move(
+        self, game: CurrentGame, repository: GameRepository = None
+    ) -> CurrentGame:
+        # Фоновый ход не записан вовремя: отвечаем в текущем запросе. Если
+        # фоновая задача всё же успела, её запись побеждает по версии
+        for attempt in range(self.MAX_SAVE_ATTEMPTS):
+            if attempt > 0:
+                game = self._load(game.game_id, repository, fresh=True)
+                if not game or not self._rules.computer_move_overdue(game):
+                    return game
+            self._rules.resume_computer_move(game)
+            if self._save(game, repository):
+                return game
+        raise GameConflictError(f"Game with ID {game.game_id} is being updated")
+
+    def _load_for_update(
+        self,
+        game_id: UUID,
+        fresh: bool,
+        apply: Callable[[CurrentGame], CurrentGame],
+    ) -> CurrentGame:
+        # Копия из кэша может отставать от БД (событие о ходе в другом воркере
+        # ещё не дошло): прежде чем вернуть ошибку правил, партия читается из БД
+        while True:
+            game = self._load(game_id, fresh=fresh)
+            if not game:
+                raise ValueError(f"Game with ID {game_id} not found")
+            try:
+                return apply(game)
+            except GameConflictError:
+                raise
+            except ValueError:
+                if fresh or not self._cache:
+                    raise
+                fresh = True
+
+    def _load(
+        self, game_id: UUID, repository: GameRepository = None, fresh: bool = False
+    ) -> Optional[CurrentGame]:
+        # fresh - прочитать из БД в обход кэша, после конфликта записи
+        if self._cache and not fresh:
+            if self._event_bus:
+                # Кэш воркера обновляют события о ходах в других воркерах
+                self._event_bus.start()
+            game = self._cache.get(game_id)
+            if game:
+                return game
+
+        repository = repository if repository else self._repository
+        entity = repository.get_game(game_id)
         if not entity:
-            raise ValueError(f"Game with ID {game_id} not found")
-
+            return None
         game = self._mapper.to_domain(entity)
+        if self._cache:
+            self._cache.put(game)
+        return game
 
-        if game.is_game_over():
-            raise ValueError("Game is already over")
-
-        if not game.is_player_turn(player_id):
-            raise ValueError("Not your turn")
-
-        if not board or len(board) != 3 or any(len(row) != 3 for row in board):
-            raise ValueError("Invalid board format")
-
-        game.game_field = GameField(board=board)
-
-        self._update_game_state(game)
+    # False - партию успели изменить (или удалить) после чтения
+    def _save(self, game: CurrentGame, repository: GameRepository = None) -> bool:
+        repository = repository if repository else self._repository
+        expected_version = self._rules.next_version(game)
+        if self._cache and self._cache.remote:
+            # Общий кэш не должен отдавать прежнюю версию после фиксации хода
+            self._cache.pending(game)
+        try:
+            updated = repository.update_game(
+                self._mapper.to_entity(game), expected_version
+            )
+        except Exception:
+            # Неизвестно, что осталось в БД: следующее чтение пойдёт в неё
+            if self._cache:
+                self._cache.invalidate(game.game_id)
+            raise
+        if updated:
+            self._saved(game)
+        return updated
+
+    def _insert(self, game: CurrentGame) -> CurrentGame:
+        saved_entity = self._repository.save_game(self._mapper.to_entity(game))
 
-        entity = self._mapper.to_entity(game)
-        saved_entity = self._repository.save_game(entity)
         game = self._mapper.to_domain(saved_entity)
-
-        if not game.is_game_over() and game.game_type == GameType.PVC:
-            game = self._make_computer_move(game)
-
-        if not game.is_game_over() and game.game_type == GameType.PVP:
-            game.current_player_id = game.get_opponent_id(player_id)
-            entity = self._mapper.to_entity(game)
-            saved_entity = self._repository.save_game(entity)
-            game = self._mapper.to_domain(saved_entity)
-
+        if self._cache:
+            self._cache.put(game)
         return game
 
-    def _make_computer_move(self, game: CurrentGame) -> CurrentGame:
-        board = game.game_field.board
-        best_score = float("-inf")
-        best_move = None
-
-        computer_symbol = game.player2_symbol
-        player_symbol = game.player1_symbol
-
-        for i in range(3):
-            for j in range(3):
-                if board[i][j] == 0:
-                    board[i][j] = computer_symbol.value
-                    score = self._minimax(
-                        board, 0, False, computer_symbol, player_symbol
-                    )
-                    board[i][j] = 0
-
-                    if score > best_score:
-                        best_score = score
-                        best_move = (i, j)
-
-        if best_move:
-            new_board = [row[:] for row in board]
-            new_board[best_move[0]][best_move[1]] = computer_symbol.value
-            game.game_field = GameField(board=new_board)
-
-            self._update_game_state(game)
-
-            if not game.is_game_over():
-                game.current_player_id = game.player1_id
+    def _matched(
+        self, entity: CurrentGameEntity, key: QueueKey, player_id: UUID
+    ) -> CurrentGame:
+        game = self._claimed(entity)
+        if self._matchmaker:
+            self._matchmaker.joined(key, game.game_id, player_id)
+        return game
 
-            entity = self._mapper.to_entity(game)
-            saved_entity = self._repository.save_game(entity)
-            return self._mapper.to_domain(saved_entity)
+    def _rejoined(
+        self, entity: CurrentGameEntity, key: QueueKey, player_id: UUID
+    ) -> CurrentGame:
+        game = self._mapper.to_domain(entity)
+        if self._matchmaker:
+            self._matchmaker.joined(key, game.game_id, player_id)
+        return game
 
+    def _claimed(self, entity: CurrentGameEntity) -> CurrentGame:
+        game = self._mapper.to_domain(entity)
+        self._saved(game)
         return game
 
-    def _minimax(
-        self,
-        board: List[List[int]],
-        depth: int,
-        is_maximizing: bool,
-        computer_symbol: PlayerSymbol,
-        player_symbol: PlayerSymbol,
-    ) -> int:
-        winner_symbol = self._check_winner_symbol(board)
-
-        if winner_symbol == computer_symbol.value:
-            return 10 - depth
-        elif winner_symbol == player_symbol.value:
-            return depth - 10
-        elif self._is_board_full(board):
-            return 0
-
-        if is_maximizing:
-            best_score = float("-inf")
-            for i in range(3):
-                for j in range(3):
-                    if board[i][j] == 0:
-                        board[i][j] = computer_symbol.value
-                        score = self._minimax(
-                            board, depth + 1, False, computer_symbol, player_symbol
-                        )
-                        board[i][j] = 0
-                        best_score = max(score, best_score)
-            return best_score
-        else:
-            best_score = float("inf")
-            for i in range(3):
-                for j in range(3):
-                    if board[i][j] == 0:
-                        board[i][j] = player_symbol.value
-                        score = self._minimax(
-                            board, depth + 1, True, computer_symbol, player_symbol
-                        )
-                        board[i][j] = 0
-                        best_score = min(score, best_score)
-            return best_score
-
-    def _update_game_state(self, game: CurrentGame) -> None:
-        winner_symbol = self._check_winner_symbol(game.game_field.board)
-
-        if winner_symbol is not None:
-            if winner_symbol == game.player1_symbol.value:
-                game.winner_id = game.player1_id
-            elif winner_symbol == game.player2_symbol.value:
-                if game.game_type == GameType.PVP:
-                    game.winner_id = game.player2_id
-                else:
-                    game.winner_id = None
-
-            game.game_state = GameState.PLAYER_WON
-            game.current_player_id = None
-        elif self._is_board_full(game.game_field.board):
-            game.game_state = GameState.DRAW
-            game.current_player_id = None
-            game.winner_id = None
-
-    def _check_winner_symbol(self, board: List[List[int]]) -> Optional[int]:
-
-        for i in range(3):
-            if board[i][0] == board[i][1] == board[i][2] != 0:
-                return board[i][0]
-
-        for j in range(3):
-            if board[0][j] == board[1][j] == board[2][j] != 0:
-                return board[0][j]
-
-        if board[0][0] == board[1][1] == board[2][2] != 0:
-            return board[0][0]
-
-        if board[0][2] == board[1][1] == board[2][0] != 0:
-            return board[0][2]
-
-        return None
-
-    def _is_board_full(self, board: List[List[int]]) -> bool:
-
-        return all(board[i][j] != 0 for i in range(3) for j in range(3))
+    def _saved(self, game: CurrentGame) -> None:
+        if self._cache:
+            self._cache.put(game)
+        if self._event_bus:
+            self._event_bus.publish(game)
+
+    def subscribe(self, game_id: UUID, listener: Listener) -> None:
+        if not self._event_bus:
+            raise ValueError("Game events are not available")
+        self._event_bus.subscribe(game_id, listener)
+
+    def unsubscribe(self, game_id: UUID, listener: Listener) -> None:
+        if self._event_bus:
+            self._event_bus.unsubscribe(game_id, listener)
+
+    def analyze_positions(self, boards: List) -> PositionAnalysis:
+        if not self._position_analyzer:
+            raise ValueError("Position analysis is not available")
+        return self._position_analyzer.analyze(boards)
+
+    def get_computer_move_stats(self) -> Optional[dict]:
+        if not self._computer_move_worker:
+            return None
+        return self._computer_move_worker.get_stats()
+
+    def get_engine_stats(self) -> List[dict]:
+        stats = [engine.get_stats() for engine in self._rules.engines]
+        for difficulty, engine in self._rules.difficulty_engines.items():
+            stats.append({"difficulty": difficulty.value, **engine.get_stats()})
+        return stats
+
+    def get_cache_stats(self) -> Optional[dict]:
+        if not self._cache:
+            return None
+        stats = self._cache.get_stats()
+        if self._user_service and self._user_service.cache:
+            stats["users"] = self._user_service.cache.get_stats()
+        return stats
 
     def get_game(self, game_id: UUID) -> Optional[CurrentGame]:
 
-        entity = self._repository.get_game(game_id)
-        if entity:
-            return self._mapper.to_domain(entity)
-        return None
-
-    def get_available_games(self) -> List[CurrentGame]:
+        game = self._load(game_id)
+        if game and self._rules.computer_move_overdue(game):
+            game = self._recover_computer_move(game)
+        if game and self._event_bus:
+            self._event_bus.remember_game(game)
+        return game
 
-        entities = self._repository.get_available_games()
-        return [self._mapper.to_domain(entity) for entity in entities]
+    def recover_computer_move(self, game_id: UUID) -> None:
+        # Для потоков событий: они работают после конца запроса, поэтому партия
+        # читается своей сессией, как в фоновом ходе. Ответ компьютера придёт
+        # подписчикам событием
+        if not self._repository_factory:
+            return
+        repository = self._repository_factory()
+        try:
+            game = self._load(game_id, repository, fresh=True)
+            if game and self._rules.computer_move_overdue(game):
+                self._recover_computer_move(game, repository)
+        finally:
+            repository.close()
+
+    def get_game_version(self, game_id: UUID) -> Optional[int]:
+        if self._event_bus:
+            version = self._event_bus.known_version(game_id)
+            if version is not None:
+                return version
+        if self._cache:
+            game = self._cache.get(game_id)
+            if game:
+                # Ждущая хода компьютера партия читается целиком (get_game),
+                # чтобы пропавший фоновый ход был пересчитан
+                if game.game_state == GameState.COMPUTER_THINKING:
+                    return None
+                return game.version
+        version = self._repository.get_version(game_id)
+        if version is not None and self._event_bus:
+            self._event_bus.remember_version(game_id, version)
+        return version
+
+    def wait_for_version(
+        self, game_id: UUID, version: int, timeout: float
+    ) -> Optional[CurrentGame]:
+        # Long-poll: ждём, пока версия партии станет больше известной клиенту
+        updates = queue.Queue()
+        if self._event_bus:
+            self._event_bus.subscribe(game_id, updates.put)
+        try:
+            game = self.get_game(game_id)
+            deadline = time.monotonic() + timeout
+            while (
+                game
+                and self._event_bus
+                and game.version <= version
+                and not game.is_game_over()
+            ):
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    update = updates.get(timeout=remaining)
+                except queue.Empty:
+                    break
+                if update.version > game.version:
+                    game = update
+            return game
+        finally:
+            if self._event_bus:
+                self._event_bus.unsubscribe(game_id, updates.put)
+
+    def get_available_games(
+        self,
+        limit: int = 20,
+        after: Optional[Tuple[datetime, UUID]] = None,
+        game_type: Optional[GameType] = None,
+    ) -> List[LobbyGame]:
+        self._rules.check_limit(limit)
+
+        rows = self._repository.get_available_games(
+            limit, after, game_type.value if game_type else None
+        )
+        return [self._mapper.to_lobby_game(row) for row in rows]
+
+    def get_completed_games_by_user(
+        self,
+        user_id: UUID,
+        limit: int = 20,
+        after: Optional[Tuple[datetime, UUID]] = None,
+    ) -> List[CurrentGame]:
+        self._rules.check_limit(limit)
 
-    def get_completed_games_by_user(self, user_id: UUID) -> List[CurrentGame]:
-        entities = self._repository.get_completed_games_by_user(user_id)
+        entities = self._repository.get_completed_games_by_user(user_id, limit, after)
         return [self._mapper.to_domain(entity) for entity in entities]
 
     def get_leaderboard(self, limit: int) -> List[LeaderStats]:
-        if limit < 1:
-            raise ValueError("Limit must be greater than 0")
-        if limit > 100:
-            raise ValueError("Limit must not exceed 100")
+        self._rules.check_limit(limit)
 
         leaderboard_data = self._repository.get_leaderboard(limit)
 
-        result = []
-
-        for user_id, win_ratio, wins, total in leaderboard_data:
-            user = None
-            if self._user_service:
-                user = self._user_service.find_by_id(user_id)
-
-            login = user.login if user else str(user_id)
-
-            result.append(
-                LeaderStats(user_id=user_id, login=login, win_ratio=win_ratio)
-            )
+        users = {}
+        if self._user_service:
+            users = self._user_service.find_by_ids([row[0] for row in leaderboard_data])
 
-        return result
+        return self._mapper.to_leaders(leaderboard_data, users)
@@ -1,14 +1,36 @@
 from abc import ABC, abstractmethod
-from typing import Optional, List
+from datetime import datetime
+from typing import Callable, Optional, List, Tuple
 from uuid import UUID
 from ..model.current_game import CurrentGame
+from ..model.difficulty import Difficulty
+from ..model.game_field import GameField
 from ..model.game_type import GameType
 from ..model.leader_stats import LeaderStats
+from ..model.lobby_game import LobbyGame
+from ..model.move import Move
+from ..model.position_analysis import PositionAnalysis
 
 
 class GameServiceInterface(ABC):
     @abstractmethod
-    def create_game(self, player_id: UUID, game_type: GameType) -> CurrentGame:
+    def create_game(
+        self,
+        player_id: UUID,
+        game_type: GameType,
+        board_size: int = GameField.DEFAULT_SIZE,
+        win_length: int = GameField.DEFAULT_WIN_LENGTH,
+        difficulty: Optional[Difficulty] = None,
+    ) -> CurrentGame:
+        pass
+
+    @abstractmethod
+    def quickmatch(
+        self,
+        player_id: UUID,
+        board_size: int = GameField.DEFAULT_SIZE,
+        win_length: int = GameField.DEFAULT_WIN_LENGTH,
+    ) -> CurrentGame:
         pass
 
     @abstractmethod
@@ -17,7 +39,11 @@ class GameServiceInterface(ABC):
 
     @abstractmethod
     def make_move(
-        self, game_id: UUID, player_id: UUID, board: List[List[int]]
+        self,
+        game_id: UUID,
+        player_id: UUID,
+        move: Move,
+        async_reply: bool = False,
     ) -> CurrentGame:
         pass
 
@@ -26,13 +52,63 @@ class GameServiceInterface(ABC):
         pass
 
     @abstractmethod
-    def get_available_games(self) -> List[CurrentGame]:
+    def recover_computer_move(self, game_id: UUID) -> None:
+        pass
+
+    @abstractmethod
+    def get_game_version(self, game_id: UUID) -> Optional[int]:
         pass
 
     @abstractmethod
-    def get_completed_games_by_user(self, user_id: UUID) -> List[CurrentGame]:
+    def wait_for_version(
+        self, game_id: UUID, version: int, timeout: float
+    ) -> Optional[CurrentGame]:
+        pass
+
+    @abstractmethod
+    def get_available_games(
+        self,
+        limit: int = 20,
+        after: Optional[Tuple[datetime, UUID]] = None,
+        game_type: Optional[GameType] = None,
+    ) -> List[LobbyGame]:
+        pass
+
+    @abstractmethod
+    def get_completed_games_by_user(
+        self,
+        user_id: UUID,
+        limit: int = 20,
+        after: Optional[Tuple[datetime, UUID]] = None,
+    ) -> List[CurrentGame]:
         pass
 
     @abstractmethod
     def get_leaderboard(self, limit: int) -> List[LeaderStats]:
         pass
+
+    @abstractmethod
+    def analyze_positions(self, boards: List) -> PositionAnalysis:
+        pass
+
+    @abstractmethod
+    def get_engine_stats(self) -> List[dict]:
+        pass
+
+    @abstractmethod
+    def get_computer_move_stats(self) -> Optional[dict]:
+        pass
+
+    @abstractmethod
+    def get_cache_stats(self) -> Optional[dict]:
+        pass
+
+    @abstractmethod
+    def subscribe(self, game_id: UUID, listener: Callable[[CurrentGame], None]) -> None:
+        pass
+
+    @abstractmethod
+    def unsubscribe(
+        self, game_id: UUID, listener: Callable[[CurrentGame], None]
+    ) -> None:
+        pass
@@ -1,12 +1,14 @@
 from datetime import timedelta
 from typing import Optional
 from uuid import UUID
+from flask import Flask, has_app_context
 from flask_jwt_extended import (
     create_access_token,
     create_refresh_token,
     decode_token,
 )
 from jwt.exceptions import InvalidTokenError, ExpiredSignatureError, DecodeError
+from domain.model.token_claims import TokenClaims
 from domain.model.users import User
 
 
@@ -18,6 +20,11 @@ class JwtProvider:
     ):
         self.access_token_expires = access_token_expires
         self.refresh_token_expires = refresh_token_expires
+        self._app: Optional[Flask] = None
+
+    def init_app(self, app: Flask) -> None:
+        # Настройки JWT берутся из приложения, в том числе вне запроса Flask (ASGI)
+        self._app = app
 
     def generate_access_token(self, user: User) -> str:
         return create_access_token(
@@ -29,31 +36,19 @@ class JwtProvider:
             identity=str(user.user_id), expires_delta=self.refresh_token_expires
         )
 
-    def validate_access_token(self, token: str) -> bool:
-        try:
-            decoded = decode_token(token)
-            if decoded.get("type") != "access":
-                return False
-            return True
-        except (InvalidTokenError, ExpiredSignatureError, DecodeError, Exception):
-            return False
-
-    def validate_refresh_token(self, token: str) -> bool:
-        try:
-            decoded = decode_token(token)
-            if decoded.get("type") != "refresh":
-                return False
-            return True
-        except (InvalidTokenError, ExpiredSignatureError, DecodeError, Exception):
-            return False
-
-    def get_uuid_from_token(self, token: str) -> Optional[UUID]:
+    # Одна проверка подписи и срока: тип токена и пользователь вместе
+    def decode(self, token: str) -> Optional[TokenClaims]:
         try:
-            decoded = decode_token(token)
-            identity = decoded.get("sub")
-            if identity:
-                return UUID(identity)
-            return None
+            if self._app and not has_app_context():
+                with self._app.app_context():
+                    decoded = decode_token(token)
+            else:
+                decoded = decode_token(token)
+            return TokenClaims(
+                token_type=decoded.get("type"),
+                user_id=UUID(decoded["sub"]),
+                expires_at=float(decoded["exp"]),
+            )
         except (
             InvalidTokenError,
             ExpiredSignatureError,
@@ -62,3 +57,15 @@ class JwtProvider:
             Exception,
         ):
             return None
+
+    def validate_access_token(self, token: str) -> bool:
+        claims = self.decode(token)
+        return bool(claims and claims.token_type == "access")
+
+    def validate_refresh_token(self, token: str) -> bool:
+        claims = self.decode(token)
+        return bool(claims and claims.token_type == "refresh")
+
+    def get_uuid_from_token(self, token: str) -> Optional[UUID]:
+        claims = self.decode(token)
+        return claims.user_id if claims else None
@@ -0,0 +1,75 @@
+import threading
+from collections import OrderedDict
+from typing import Dict, Optional, Tuple
+from uuid import UUID
+
+# Очередь подбора соперника: размер поля и длина линии
+QueueKey = Tuple[int, int]
+
+
+# Очереди быстрой игры в памяти процесса: партии, созданные через quickmatch
+# и ожидающие второго игрока, в порядке создания (FIFO) для каждого вида поля.
+# Одновременные претенденты получают из очереди разные партии, поэтому их
+# захваты в БД не конкурируют за одну строку. Очередь - только подсказка:
+# занятость партии решает условный UPDATE, а партии других процессов
+# находятся запросом к БД
+class Matchmaker:
+    MAX_QUEUE = 10_000
+
+    def __init__(self, max_queue: int = MAX_QUEUE):
+        self._max_queue = max_queue
+        # вид поля -> (game_id -> player_id создателя)
+        self._queues: Dict[QueueKey, "OrderedDict[UUID, UUID]"] = {}
+        # (вид поля, игрок) -> его партия быстрой игры: ожидающая соперника
+        # или уже начатая, пока игрок не запросит новую после её окончания
+        self._waiting: "OrderedDict[Tuple[QueueKey, UUID], UUID]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def push(self, key: QueueKey, game_id: UUID, player_id: UUID) -> None:
+        with self._lock:
+            queue = self._queues.setdefault(key, OrderedDict())
+            queue[game_id] = player_id
+            self._remember(key, player_id, game_id)
+            while len(queue) > self._max_queue:
+                # Вытесненная партия остаётся доступной через БД
+                evicted, owner = queue.popitem(last=False)
+                self._forget(key, owner, evicted)
+
+    def joined(self, key: QueueKey, game_id: UUID, player_id: UUID) -> None:
+        # Партия, занятая игроком: повторный запрос вернёт её же
+        with self._lock:
+            self._remember(key, player_id, game_id)
+
+    def pop(self, key: QueueKey, player_id: UUID) -> Optional[UUID]:
+        # Самая старая партия другого игрока; собственная остаётся в очереди
+        with self._lock:
+            queue = self._queues.get(key)
+            if not queue:
+                return None
+            for game_id, owner in queue.items():
+                if owner != player_id:
+                    # Запись создателя остаётся: его повторный запрос вернёт
+                    # уже занятую партию, а не подберёт вторую
+                    del queue[game_id]
+                    return game_id
+            return None
+
+    def waiting_game(self, key: QueueKey, player_id: UUID) -> Optional[UUID]:
+        with self._lock:
+            return self._waiting.get((key, player_id))
+
+    def discard(self, key: QueueKey, game_id: UUID, player_id: UUID) -> None:
+        with self._lock:
+            self._queues.get(key, {}).pop(game_id, None)
+            self._forget(key, player_id, game_id)
+
+    def _remember(self, key: QueueKey, player_id: UUID, game_id: UUID) -> None:
+        self._waiting[(key, player_id)] = game_id
+        self._waiting.move_to_end((key, player_id))
+        # Записи о начатых партиях, за которыми игроки не вернулись
+        while len(self._waiting) > self._max_queue:
+            self._waiting.popitem(last=False)
+
+    def _forget(self, key: QueueKey, player_id: UUID, game_id: UUID) -> None:
+        if self._waiting.get((key, player_id)) == game_id:
+            del self._waiting[(key, player_id)]
@@ -0,0 +1,270 @@
+import math
+import multiprocessing
+import os
+import random
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List, Optional, Tuple
+from domain.model.game_field import GameField
+from domain.model.player_symbol import PlayerSymbol
+from domain.model.search_result import SearchResult
+from domain.service.search_engine_interface import SearchEngineInterface
+
+_EXPLORATION = 1.4
+
+
+class SearchPool:
+    # Пул процессов создаётся лениво, чтобы не форкаться до старта воркеров сервера.
+    # Процессы запускаются через forkserver: копия воркера с его потоками
+    # (хэширование паролей, фоновые ходы, шина событий) им не нужна
+    START_METHOD = (
+        "forkserver"
+        if "forkserver" in multiprocessing.get_all_start_methods()
+        else "spawn"
+    )
+
+    def __init__(self, workers: Optional[int] = None):
+        self.workers = workers if workers else os.cpu_count() or 1
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._lock = threading.Lock()
+
+    @property
+    def executor(self) -> ProcessPoolExecutor:
+        with self._lock:
+            if self._executor is None:
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self.workers,
+                    mp_context=multiprocessing.get_context(self.START_METHOD),
+                )
+            return self._executor
+
+    def shutdown(self) -> None:
+        with self._lock:
+            if self._executor is not None:
+                self._executor.shutdown(cancel_futures=True)
+                self._executor = None
+
+
+class MctsEngine(SearchEngineInterface):
+    def __init__(
+        self,
+        pool: SearchPool,
+        playouts: Optional[int] = None,
+        time_budget: Optional[float] = None,
+    ):
+        if not playouts and not time_budget:
+            raise ValueError("MCTS needs a playout or a time budget")
+        self.pool = pool
+        self.playouts = playouts
+        self.time_budget = time_budget
+        self._lock = threading.Lock()
+        self._searches = 0
+        self._total_playouts = 0
+        self._total_time = 0.0
+
+    def supports(self, game_field: GameField) -> bool:
+        return True
+
+    def search(self, game_field: GameField, symbol: PlayerSymbol) -> SearchResult:
+        started = time.perf_counter()
+        own = game_field.mask_of(symbol.value)
+        other = game_field.occupied_mask & ~own
+
+        tactical_move = _tactical_move(game_field, own, other)
+        if tactical_move is not None:
+            return SearchResult(
+                move=tactical_move, score=1.0, elapsed=time.perf_counter() - started
+            )
+
+        # Параллелизм по корню: каждый процесс строит своё дерево, визиты суммируются
+        workers = self.pool.workers
+        playouts = -(-self.playouts // workers) if self.playouts else None
+        args = (
+            own,
+            other,
+            game_field.size,
+            game_field.win_length,
+            playouts,
+            self.time_budget,
+        )
+        if workers > 1:
+            futures = [
+                self.pool.executor.submit(_run_tree, *args, random.getrandbits(32))
+                for _ in range(workers)
+            ]
+            trees = [future.result() for future in futures]
+        else:
+            trees = [_run_tree(*args, random.getrandbits(32))]
+
+        visits: Dict[int, int] = {}
+        wins: Dict[int, float] = {}
+        total_playouts = 0
+        for tree_visits, tree_wins, tree_playouts in trees:
+            total_playouts += tree_playouts
+            for move, count in tree_visits.items():
+                visits[move] = visits.get(move, 0) + count
+                wins[move] = wins.get(move, 0.0) + tree_wins[move]
+
+        best_move = max(visits, key=visits.get) if visits else None
+        result = SearchResult(
+            move=best_move,
+            score=wins[best_move] / visits[best_move] if best_move is not None else 0,
+            nodes=total_playouts,
+            elapsed=time.perf_counter() - started,
+        )
+        with self._lock:
+            self._searches += 1
+            self._total_playouts += result.nodes
+            self._total_time += result.elapsed
+        return result
+
+    def get_stats(self) -> dict:
+        with self._lock:
+            return {
+                "engine": "mcts",
+                "workers": self.pool.workers,
+                "playout_budget": self.playouts,
+                "time_budget": self.time_budget,
+                "searches": self._searches,
+                "playouts": self._total_playouts,
+                "seconds": round(self._total_time, 3),
+                "playouts_per_second": (
+                    round(self._total_playouts / self._total_time)
+                    if self._total_time > 0
+                    else 0
+                ),
+            }
+
+
+def _is_win(masks_by_cell: List[Tuple[int, ...]], mask: int, cell: int) -> bool:
+    for win_mask in masks_by_cell[cell]:
+        if mask & win_mask == win_mask:
+            return True
+    return False
+
+
+def _masks_by_cell(size: int, win_length: int) -> List[Tuple[int, ...]]:
+    win_masks = GameField.win_masks_for(size, win_length)
+    return [
+        tuple(mask for mask in win_masks if mask >> cell & 1)
+        for cell in range(size * size)
+    ]
+
+
+def _tactical_move(game_field: GameField, own: int, other: int) -> Optional[int]:
+    # Выигрыш в один ход и блок выигрыша соперника не доверяем случайным плейаутам
+    masks_by_cell = _masks_by_cell(game_field.size, game_field.win_length)
+    free = game_field.empty_mask
+    block = None
+    for cell in range(game_field.cells):
+        if not free >> cell & 1:
+            continue
+        if _is_win(masks_by_cell, own | 1 << cell, cell):
+            return cell
+        if block is None and _is_win(masks_by_cell, other | 1 << cell, cell):
+            block = cell
+    return block
+
+
+class _Node:
+    __slots__ = ("move", "player", "parent", "children", "untried", "visits", "wins")
+
+    def __init__(
+        self,
+        move: Optional[int],
+        player: Optional[int],
+        parent: Optional["_Node"],
+        untried: List[int],
+    ):
+        self.move = move
+        self.player = player
+        self.parent = parent
+        self.children: List["_Node"] = []
+        self.untried = untried
+        self.visits = 0
+        # Выигрыши с точки зрения игрока `player`, сделавшего ход `move`
+        self.wins = 0.0
+
+
+def _run_tree(
+    own: int,
+    other: int,
+    size: int,
+    win_length: int,
+    playouts: Optional[int],
+    time_budget: Optional[float],
+    seed: int,
+) -> Tuple[Dict[int, int], Dict[int, float], int]:
+    rng = random.Random(seed)
+    cells = size * size
+    masks_by_cell = _masks_by_cell(size, win_length)
+    deadline = time.perf_counter() + time_budget if time_budget else None
+
+    def free_cells(occupied: int) -> List[int]:
+        moves = [cell for cell in range(cells) if not occupied >> cell & 1]
+        rng.shuffle(moves)
+        return moves
+
+    root = _Node(None, None, None, free_cells(own | other))
+    done = 0
+    while True:
+        if playouts is not None and done >= playouts:
+            break
+        if deadline is not None and not done & 15 and time.perf_counter() >= deadline:
+            break
+
+        node = root
+        # masks[0] - ходящий в корне, masks[1] - соперник
+        masks = [own, other]
+        mover = 0
+        winner = None
+
+        # Выбор по UCT
+        while not node.untried and node.children:
+            log_visits = math.log(node.visits)
+            node = max(
+                node.children,
+                key=lambda child: child.wins / child.visits
+                + _EXPLORATION * math.sqrt(log_visits / child.visits),
+            )
+            masks[mover] |= 1 << node.move
+            if _is_win(masks_by_cell, masks[mover], node.move):
+                winner = mover
+            mover = 1 - mover
+
+        # Расширение
+        if winner is None and node.untried:
+            move = node.untried.pop()
+            masks[mover] |= 1 << move
+            if _is_win(masks_by_cell, masks[mover], move):
+                winner = mover
+            untried = [] if winner is not None else free_cells(masks[0] | masks[1])
+            child = _Node(move, mover, node, untried)
+            node.children.append(child)
+            node = child
+            mover = 1 - mover
+
+        # Случайный плейаут
+        if winner is None:
+            moves = free_cells(masks[0] | masks[1])
+            for move in moves:
+                masks[mover] |= 1 << move
+                if _is_win(masks_by_cell, masks[mover], move):
+                    winner = mover
+                    break
+                mover = 1 - mover
+
+        # Обратное распространение, ничья даёт половину очка
+        while node is not None:
+            node.visits += 1
+            if winner is None:
+                node.wins += 0.5
+            elif winner == node.player:
+                node.wins += 1.0
+            node = node.parent
+        done += 1
+
+    visits = {child.move: child.visits for child in root.children}
+    wins = {child.move: child.wins for child in root.children}
+    return visits, wins, done
@@ -0,0 +1,85 @@
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, List, Optional, Tuple
+from domain.service.cache_backend_interface import CacheBackendInterface
+
+
+# Кэш в памяти процесса: LRU с ограничением числа записей
+class MemoryCacheBackend(CacheBackendInterface):
+    MAX_SIZE = 10_000
+
+    def __init__(self, max_size: int = MAX_SIZE):
+        self._max_size = max_size
+        # ключ -> (версия, значение, момент истечения)
+        self._entries: "OrderedDict[str, Tuple[int, bytes, float]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._evictions = 0
+        self._expired = 0
+        self._stale_writes = 0
+
+    def get(self, key: str) -> Optional[bytes]:
+        with self._lock:
+            entry = self._live_entry(key)
+            if entry is None:
+                return None
+            self._entries.move_to_end(key)
+            return entry[1]
+
+    def set(
+        self, key: str, value: bytes, ttl: float, version: Optional[int] = None
+    ) -> bool:
+        with self._lock:
+            if version is not None:
+                entry = self._live_entry(key)
+                if entry is not None and entry[0] >= version:
+                    if entry[0] > version:
+                        self._stale_writes += 1
+                    return False
+            self._entries[key] = (version or 0, value, time.monotonic() + ttl)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self._max_size:
+                self._entries.popitem(last=False)
+                self._evictions += 1
+            return True
+
+    def get_many(self, keys: List[str]) -> List[Optional[bytes]]:
+        with self._lock:
+            values = []
+            for key in keys:
+                entry = self._live_entry(key)
+                if entry is not None:
+                    self._entries.move_to_end(key)
+                values.append(entry[1] if entry is not None else None)
+            return values
+
+    def set_many(self, items: Dict[str, bytes], ttl: float) -> None:
+        for key, value in items.items():
+            self.set(key, value, ttl)
+
+    def delete(self, key: str) -> None:
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def get_stats(self) -> dict:
+        with self._lock:
+            return {
+                "backend": "memory",
+                "size": len(self._entries),
+                "max_size": self._max_size,
+                "evictions": self._evictions,
+                "expired": self._expired,
+                "stale_writes": self._stale_writes,
+            }
+
+    def close(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def _live_entry(self, key: str) -> Optional[Tuple[int, bytes, float]]:
+        entry = self._entries.get(key)
+        if entry is not None and entry[2] < time.monotonic():
+            del self._entries[key]
+            self._expired += 1
+            return None
+        return entry
@@ -0,0 +1,114 @@
+import base64
+import hashlib
+import hmac
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable
+from domain.service.password_hasher_busy_error import PasswordHasherBusyError
+
+
+class PasswordHasher:
+    # Хэш scrypt: "scrypt$N$r$p$<соль>$<хэш>", N = 2 ** cost. На хэш уходит
+    # 128 * r * N байт памяти (16 МиБ при cost=14) и десятки миллисекунд
+    # процессора, поэтому он считается в ограниченном пуле потоков: не больше
+    # `workers` хэшей одновременно и не больше `max_queue` в очереди
+    PREFIX = "scrypt"
+    COST = 14
+    BLOCK_SIZE = 8
+    PARALLELISM = 1
+    SALT_SIZE = 16
+    KEY_SIZE = 32
+
+    def __init__(self, cost: int = COST, workers: int = 1, max_queue: int = 100):
+        self.cost = cost
+        self.workers = workers
+        self.max_queue = max_queue
+        self._executor = ThreadPoolExecutor(
+            max_workers=workers, thread_name_prefix="password-hash"
+        )
+        self._slots = threading.BoundedSemaphore(workers + max_queue)
+        # Хэш, которому не соответствует ни один пароль: с ним сверяется пароль
+        # при входе с неизвестным логином
+        self._dummy_hash = self._format(
+            os.urandom(self.SALT_SIZE), os.urandom(self.KEY_SIZE)
+        )
+
+    def hash(self, password: str) -> str:
+        return self._run(self._scrypt_hash, password)
+
+    def verify(self, password: str, hashed: str) -> bool:
+        if not hashed.startswith(f"{self.PREFIX}$"):
+            # Прежний формат: SHA-256 без соли, проверяется без пула
+            legacy = hashlib.sha256(password.encode("utf-8")).hexdigest()
+            return hmac.compare_digest(legacy, hashed)
+        return self._run(self._scrypt_verify, password, hashed)
+
+    def verify_dummy(self, password: str) -> None:
+        # Та же работа scrypt, что и для настоящего пароля: по времени ответа
+        # не понять, существует ли логин
+        self.verify(password, self._dummy_hash)
+
+    def needs_rehash(self, hashed: str) -> bool:
+        # Прежний SHA-256 или scrypt с другими параметрами стоимости
+        parts = hashed.split("$")
+        return len(parts) != 6 or parts[:4] != [
+            self.PREFIX,
+            str(2**self.cost),
+            str(self.BLOCK_SIZE),
+            str(self.PARALLELISM),
+        ]
+
+    def shutdown(self, wait: bool = True) -> None:
+        self._executor.shutdown(wait=wait)
+
+    def _run(self, fn: Callable, *args):
+        if not self._slots.acquire(blocking=False):
+            raise PasswordHasherBusyError("Too many login attempts, try again later")
+        try:
+            future = self._executor.submit(fn, *args)
+        except Exception:
+            self._slots.release()
+            raise
+        future.add_done_callback(lambda _: self._slots.release())
+        return future.result()
+
+    def _scrypt_hash(self, password: str) -> str:
+        salt = os.urandom(self.SALT_SIZE)
+        n, r, p = 2**self.cost, self.BLOCK_SIZE, self.PARALLELISM
+        return self._format(salt, self._scrypt(password, salt, n, r, p))
+
+    def _format(self, salt: bytes, key: bytes) -> str:
+        return "$".join(
+            [
+                self.PREFIX,
+                str(2**self.cost),
+                str(self.BLOCK_SIZE),
+                str(self.PARALLELISM),
+                base64.b64encode(salt).decode(),
+                base64.b64encode(key).decode(),
+            ]
+        )
+
+    def _scrypt_verify(self, password: str, hashed: str) -> bool:
+        try:
+            _, n, r, p, salt, key = hashed.split("$")
+            expected = base64.b64decode(key)
+            actual = self._scrypt(
+                password, base64.b64decode(salt), int(n), int(r), int(p)
+            )
+        except ValueError:
+            return False
+        return hmac.compare_digest(actual, expected)
+
+    def _scrypt(self, password: str, salt: bytes, n: int, r: int, p: int) -> bytes:
+        return hashlib.scrypt(
+            password.encode("utf-8"),
+            salt=salt,
+            n=n,
+            r=r,
+            p=p,
+            # Запас над 128 * r * N, иначе OpenSSL отказывает уже при cost=15
+            maxmem=256 * r * n,
+            dklen=self.KEY_SIZE,
+        )
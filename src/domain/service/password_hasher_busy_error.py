@@ -0,0 +1,4 @@
+# Очередь хэширования паролей заполнена: запрос входа или регистрации
+# отклоняется сразу, а не ждёт, занимая поток сервера
+class PasswordHasherBusyError(Exception):
+    pass
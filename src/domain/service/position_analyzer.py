@@ -0,0 +1,91 @@
+import numpy as np
+from typing import List
+from domain.model.game_field import GameField
+from domain.model.position_analysis import PositionAnalysis
+from domain.service.tablebase import Tablebase
+
+
+class PositionAnalyzer:
+    # Пакетный разбор позиций 3x3: все доски обрабатываются как тензор (N, 9)
+    MAX_BATCH = 10_000
+
+    def __init__(self, tablebase: Tablebase):
+        self._table = np.frombuffer(
+            tablebase.buffer, dtype=np.uint8, offset=len(Tablebase.MAGIC)
+        ).reshape(2, Tablebase.POSITIONS, Tablebase.ENTRY_SIZE)
+        lines = np.zeros((9, len(GameField.win_masks_for(3, 3))), dtype=np.int16)
+        for line, mask in enumerate(GameField.win_masks_for(3, 3)):
+            for cell in range(9):
+                if mask >> cell & 1:
+                    lines[cell, line] = 1
+        self._lines = lines
+        self._powers = 3 ** np.arange(9, dtype=np.int32)
+
+    def analyze(self, boards: List) -> PositionAnalysis:
+        if not boards:
+            raise ValueError("boards must not be empty")
+        if len(boards) > self.MAX_BATCH:
+            raise ValueError(f"No more than {self.MAX_BATCH} boards per request")
+        try:
+            cells = np.asarray(boards)
+        except (TypeError, ValueError):
+            raise ValueError("Each board must be a 3x3 array")
+        if cells.ndim not in [2, 3] or cells.shape[1:] not in [(3, 3), (9,)]:
+            raise ValueError("Each board must be a 3x3 array")
+        # Значения проверяются до приведения к int16: иначе дробные клетки
+        # усекаются, а большие числа переполняются в допустимые
+        if (
+            cells.dtype.kind not in "iu"
+            or ((cells < GameField.EMPTY) | (cells > GameField.PLAYER_O)).any()
+        ):
+            raise ValueError("Board cells must be 0, 1 or 2")
+        cells = cells.reshape(len(boards), 9).astype(np.int16)
+
+        x_cells = cells == GameField.PLAYER_X
+        o_cells = cells == GameField.PLAYER_O
+        x_lines = x_cells.astype(np.int16) @ self._lines == 3
+        o_lines = o_cells.astype(np.int16) @ self._lines == 3
+
+        # Как и в GameField.winner(): побеждает символ первой собранной линии
+        won_lines = x_lines | o_lines
+        has_winner = won_lines.any(axis=1)
+        first_line = won_lines.argmax(axis=1)
+        rows = np.arange(len(cells))
+        winners = np.where(
+            has_winner,
+            np.where(x_lines[rows, first_line], GameField.PLAYER_X, GameField.PLAYER_O),
+            0,
+        )
+        full = (cells != GameField.EMPTY).all(axis=1)
+        terminal = has_winner | full
+
+        # Очередь хода определяется по числу фигур: X ходит первым
+        to_move = np.where(
+            x_cells.sum(axis=1) <= o_cells.sum(axis=1),
+            GameField.PLAYER_X,
+            GameField.PLAYER_O,
+        )
+        indexes = cells.astype(np.int32) @ self._powers
+        entries = self._table[to_move - 1, indexes]
+        best_moves = entries[:, 0]
+        scores = entries[:, 1].view(np.int8)
+        has_move = ~terminal & (best_moves != Tablebase.NO_MOVE)
+
+        terminal_list = terminal.tolist()
+        has_move_list = has_move.tolist()
+        return PositionAnalysis(
+            winners=[winner or None for winner in winners.tolist()],
+            terminal=terminal_list,
+            to_move=[
+                None if done else symbol
+                for symbol, done in zip(to_move.tolist(), terminal_list)
+            ],
+            best_moves=[
+                move if ok else None
+                for move, ok in zip(best_moves.tolist(), has_move_list)
+            ],
+            scores=[
+                score if ok else None
+                for score, ok in zip(scores.tolist(), has_move_list)
+            ],
+        )
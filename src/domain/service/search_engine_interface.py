@@ -0,0 +1,18 @@
+from abc import ABC, abstractmethod
+from ..model.game_field import GameField
+from ..model.player_symbol import PlayerSymbol
+from ..model.search_result import SearchResult
+
+
+class SearchEngineInterface(ABC):
+    @abstractmethod
+    def supports(self, game_field: GameField) -> bool:
+        pass
+
+    @abstractmethod
+    def search(self, game_field: GameField, symbol: PlayerSymbol) -> SearchResult:
+        pass
+
+    @abstractmethod
+    def get_stats(self) -> dict:
+        pass
@@ -0,0 +1,309 @@
+import mmap
+import os
+import sys
+from typing import Dict, List, Optional, Tuple
+from domain.model.game_field import GameField
+from domain.model.player_symbol import PlayerSymbol
+from domain.model.search_result import SearchResult
+from domain.service.search_engine_interface import SearchEngineInterface
+
+
+_CELLS = 9
+_FULL_MASK = (1 << _CELLS) - 1
+_WIN_MASKS = GameField.win_masks_for(3, 3)
+
+# Троичный вес каждой 9-битной маски: индекс позиции = B[x] + 2 * B[o]
+_BASE3 = tuple(
+    sum(3**cell for cell in range(_CELLS) if mask >> cell & 1)
+    for mask in range(1 << _CELLS)
+)
+
+
+# Решённая таблица ходов для поля 3x3. Позиция кодируется троичным числом
+# (клетка i даёт cell * 3**i), так что все 3**9 досок укладываются в плоский
+# массив. Для каждого символа компьютера хранится пара байт: лучший ход
+# (0..8, 0xFF - хода нет) и его оценка в шкале `_minimax` (10 - depth / depth - 10 / 0).
+class Tablebase(SearchEngineInterface):
+
+    MAGIC = b"TTTB\x01\x00\x00\x00"
+    POSITIONS = 3**9
+    ENTRY_SIZE = 2
+    NO_MOVE = 0xFF
+
+    def __init__(self, data):
+        if bytes(data[: len(self.MAGIC)]) != self.MAGIC:
+            raise ValueError("Invalid tablebase header")
+        expected = len(self.MAGIC) + 2 * self.POSITIONS * self.ENTRY_SIZE
+        if len(data) != expected:
+            raise ValueError("Invalid tablebase size")
+        self._data = data
+
+    @classmethod
+    def build(cls) -> "Tablebase":
+        return cls(cls._solve())
+
+    @classmethod
+    def load(cls, path: str) -> "Tablebase":
+        with open(path, "rb") as f:
+            # Отображение только для чтения: страницы делятся между форкнутыми воркерами
+            data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        return cls(data)
+
+    @classmethod
+    def load_or_build(cls, path: Optional[str] = None) -> "Tablebase":
+        if not path:
+            return cls.build()
+        if not os.path.exists(path):
+            tablebase = cls.build()
+            try:
+                tablebase.save(path)
+            except OSError:
+                return tablebase
+        return cls.load(path)
+
+    def save(self, path: str) -> None:
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(bytes(self._data))
+        os.replace(tmp_path, path)
+
+    @property
+    def buffer(self):
+        return self._data
+
+    def supports(self, game_field: GameField) -> bool:
+        return game_field.size == 3 and game_field.win_length == 3
+
+    def search(self, game_field: GameField, symbol: PlayerSymbol) -> SearchResult:
+        best_move = self.lookup(game_field, symbol)
+        if best_move is None:
+            return SearchResult(move=None, score=0)
+        move, score = best_move
+        return SearchResult(move=move, score=score, nodes=1)
+
+    def get_stats(self) -> dict:
+        return {"engine": "tablebase", "positions": self.POSITIONS}
+
+    def lookup(
+        self, game_field: GameField, computer_symbol: PlayerSymbol
+    ) -> Optional[Tuple[int, int]]:
+        offset = self._offset(self.encode(game_field), computer_symbol.value)
+        move = self._data[offset]
+        if move == self.NO_MOVE:
+            return None
+        score = int.from_bytes(
+            self._data[offset + 1 : offset + 2], "little", signed=True
+        )
+        return move, score
+
+    @classmethod
+    def encode(cls, game_field: GameField) -> int:
+        return _BASE3[game_field.x_mask] + 2 * _BASE3[game_field.o_mask]
+
+    @classmethod
+    def decode(cls, index: int) -> GameField:
+        x_mask = 0
+        o_mask = 0
+        for cell in range(_CELLS):
+            index, value = divmod(index, 3)
+            if value == GameField.PLAYER_X:
+                x_mask |= 1 << cell
+            elif value == GameField.PLAYER_O:
+                o_mask |= 1 << cell
+        return GameField(x_mask, o_mask)
+
+    @classmethod
+    def _offset(cls, index: int, symbol_value: int) -> int:
+        return len(cls.MAGIC) + (
+            (symbol_value - 1) * cls.POSITIONS + index
+        ) * cls.ENTRY_SIZE
+
+    @classmethod
+    def _solve(cls) -> bytearray:
+        data = bytearray(cls.MAGIC)
+        data.extend(b"\x00" * (2 * cls.POSITIONS * cls.ENTRY_SIZE))
+        values: Dict[Tuple[int, int, int], int] = {}
+        cells = [1 << cell for cell in range(_CELLS)]
+
+        # Негамакс со штрафом за глубину: s - sign(s) на каждый полуход,
+        # что даёт те же числа, что и 10 - depth / depth - 10 в `_minimax`.
+        # Маски передаются как (ходящий, соперник).
+        def negamax(own: int, other: int) -> int:
+            key = (own, other)
+            if key in values:
+                return values[key]
+            value = None
+            for win_mask in _WIN_MASKS:
+                if own & win_mask == win_mask:
+                    value = 10
+                    break
+                if other & win_mask == win_mask:
+                    value = -10
+                    break
+            if value is None:
+                free = ~(own | other) & _FULL_MASK
+                if not free:
+                    value = 0
+                else:
+                    value = -11
+                    for bit in cells:
+                        if free & bit:
+                            child = negamax(other, own | bit)
+                            child -= (child > 0) - (child < 0)
+                            value = max(value, -child)
+            values[key] = value
+            return value
+
+        for index in range(cls.POSITIONS):
+            field = cls.decode(index)
+            terminal = field.winner() is not None or field.is_full()
+            for computer in (PlayerSymbol.X.value, PlayerSymbol.O.value):
+                offset = cls._offset(index, computer)
+                data[offset] = cls.NO_MOVE
+                if terminal:
+                    continue
+                own = field.mask_of(computer)
+                other = field.occupied_mask & ~own
+                free = field.empty_mask
+                best_score = None
+                for cell, bit in enumerate(cells):
+                    if not free & bit:
+                        continue
+                    score = -negamax(other, own | bit)
+                    if best_score is None or score > best_score:
+                        best_score = score
+                        data[offset] = cell
+                        data[offset + 1] = score & 0xFF
+        return data
+
+    # Сверка с эталонным `_minimax` на всех достижимых позициях
+    def verify(self, computer_symbol: PlayerSymbol = PlayerSymbol.O) -> int:
+        player_symbol = computer_symbol.opposite()
+        checked = 0
+        for game_field in self._reachable(computer_symbol.value):
+            board = game_field.to_board()
+            expected = _reference_best_move(board, computer_symbol, player_symbol)
+            actual = self.lookup(game_field, computer_symbol)
+            if expected != actual:
+                raise ValueError(
+                    f"Tablebase mismatch at {board}: expected {expected}, got {actual}"
+                )
+            checked += 1
+        return checked
+
+    @classmethod
+    def _reachable(cls, to_move: int) -> List[GameField]:
+        seen = set()
+        result = []
+        stack = [(GameField(), PlayerSymbol.X.value)]
+        while stack:
+            game_field, mover = stack.pop()
+            key = (game_field.x_mask, game_field.o_mask)
+            if key in seen:
+                continue
+            seen.add(key)
+            if game_field.winner() is not None or game_field.is_full():
+                continue
+            if mover == to_move:
+                result.append(game_field)
+            for cell in range(_CELLS):
+                if game_field.empty_mask >> cell & 1:
+                    stack.append((game_field.with_move(cell, mover), 3 - mover))
+        return result
+
+
+def _reference_best_move(
+    board: List[List[int]], computer_symbol: PlayerSymbol, player_symbol: PlayerSymbol
+) -> Optional[Tuple[int, int]]:
+    best_score = float("-inf")
+    best_move = None
+    for i in range(3):
+        for j in range(3):
+            if board[i][j] == 0:
+                board[i][j] = computer_symbol.value
+                score = _reference_minimax(
+                    board, 0, False, computer_symbol, player_symbol
+                )
+                board[i][j] = 0
+                if score > best_score:
+                    best_score = score
+                    best_move = (i * 3 + j, score)
+    return best_move
+
+
+def _reference_minimax(
+    board: List[List[int]],
+    depth: int,
+    is_maximizing: bool,
+    computer_symbol: PlayerSymbol,
+    player_symbol: PlayerSymbol,
+) -> int:
+    # Полный перебор без отсечений - прежняя реализация GameServiceImpl._minimax
+    winner_symbol = _reference_winner_symbol(board)
+
+    if winner_symbol == computer_symbol.value:
+        return 10 - depth
+    elif winner_symbol == player_symbol.value:
+        return depth - 10
+    elif all(board[i][j] != 0 for i in range(3) for j in range(3)):
+        return 0
+
+    if is_maximizing:
+        best_score = float("-inf")
+        for i in range(3):
+            for j in range(3):
+                if board[i][j] == 0:
+                    board[i][j] = computer_symbol.value
+                    score = _reference_minimax(
+                        board, depth + 1, False, computer_symbol, player_symbol
+                    )
+                    board[i][j] = 0
+                    best_score = max(score, best_score)
+        return best_score
+    else:
+        best_score = float("inf")
+        for i in range(3):
+            for j in range(3):
+                if board[i][j] == 0:
+                    board[i][j] = player_symbol.value
+                    score = _reference_minimax(
+                        board, depth + 1, True, computer_symbol, player_symbol
+                    )
+                    board[i][j] = 0
+                    best_score = min(score, best_score)
+        return best_score
+
+
+def _reference_winner_symbol(board: List[List[int]]) -> Optional[int]:
+    for i in range(3):
+        if board[i][0] == board[i][1] == board[i][2] != 0:
+            return board[i][0]
+
+    for j in range(3):
+        if board[0][j] == board[1][j] == board[2][j] != 0:
+            return board[0][j]
+
+    if board[0][0] == board[1][1] == board[2][2] != 0:
+        return board[0][0]
+
+    if board[0][2] == board[1][1] == board[2][0] != 0:
+        return board[0][2]
+
+    return None
+
+
+if __name__ == "__main__":
+    # python -m domain.service.tablebase build <path> | verify [<path>]
+    command = sys.argv[1] if len(sys.argv) > 1 else "verify"
+    target = sys.argv[2] if len(sys.argv) > 2 else None
+    if command == "build":
+        if not target:
+            sys.exit("usage: python -m domain.service.tablebase build <path>")
+        Tablebase.build().save(target)
+        print(f"Tablebase written to {target}")
+    elif command == "verify":
+        tablebase = Tablebase.load(target) if target else Tablebase.build()
+        count = tablebase.verify()
+        print(f"Tablebase matches _minimax on {count} positions")
+    else:
+        sys.exit(f"Unknown command: {command}")
@@ -0,0 +1,87 @@
+import struct
+import threading
+from typing import Dict, List, Optional
+from uuid import UUID
+from domain.model.users import User
+from domain.service.cache_backend_interface import CacheBackendInterface
+
+
+# Кэш пользователей по id: логины нужны таблице лидеров и /auth/me на
+# каждый запрос, а меняются пользователи редко. Хэш пароля в кэш (в том
+# числе общий сетевой) не попадает: пользователи из кэша - без пароля
+class UserCache:
+    TTL = 300.0
+    KEY_PREFIX = "ttt:user:"
+
+    def __init__(self, backend: CacheBackendInterface, ttl: float = TTL):
+        self._backend = backend
+        self._ttl = ttl
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._misses = 0
+
+    @property
+    def remote(self) -> bool:
+        return self._backend.remote
+
+    def get(self, user_id: UUID) -> Optional[User]:
+        data = self._backend.get(self._key(user_id))
+        with self._lock:
+            if data is None:
+                self._misses += 1
+            else:
+                self._hits += 1
+        return unpack_user(data) if data is not None else None
+
+    def put(self, user: User) -> None:
+        self._backend.set(self._key(user.user_id), pack_user(user), self._ttl)
+
+    def get_many(self, user_ids: List[UUID]) -> Dict[UUID, User]:
+        values = self._backend.get_many([self._key(user_id) for user_id in user_ids])
+        users = {}
+        for user_id, data in zip(user_ids, values):
+            user = unpack_user(data) if data is not None else None
+            if user:
+                users[user_id] = user
+        with self._lock:
+            self._hits += len(users)
+            self._misses += len(user_ids) - len(users)
+        return users
+
+    def put_many(self, users: List[User]) -> None:
+        self._backend.set_many(
+            {self._key(user.user_id): pack_user(user) for user in users}, self._ttl
+        )
+
+    def invalidate(self, user_id: UUID) -> None:
+        self._backend.delete(self._key(user_id))
+
+    def get_stats(self) -> dict:
+        with self._lock:
+            return {"hits": self._hits, "misses": self._misses}
+
+    def _key(self, user_id: UUID) -> str:
+        return f"{self.KEY_PREFIX}{user_id.hex}"
+
+
+# Номер формата, UUID и длина логина, затем сам логин в UTF-8
+_FORMAT = 2
+_USER = struct.Struct(">B16sH")
+
+
+def pack_user(user: User) -> bytes:
+    login = user.login.encode("utf-8")
+    return _USER.pack(_FORMAT, user.user_id.bytes, len(login)) + login
+
+
+def unpack_user(data: bytes) -> Optional[User]:
+    if len(data) < _USER.size or data[0] != _FORMAT:
+        return None
+    _, user_id, login_length = _USER.unpack_from(data)
+    if len(data) != _USER.size + login_length:
+        return None
+    return User(
+        user_id=UUID(bytes=user_id),
+        login=data[_USER.size :].decode("utf-8"),
+        password=None,
+    )
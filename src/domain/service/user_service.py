@@ -1,17 +1,32 @@
-from typing import Optional
+from typing import Dict, List, Optional
 from uuid import UUID
-import hashlib
 from datasource.repository.user_repository import UserRepository
+from datasource.repository.user_stats_repository import UserStatsRepository
 from datasource.mapper.user_mapper import UserMapper
+from datasource.mapper.user_stats_mapper import UserStatsMapper
 from datasource.model.user_entity import UserEntity
 from domain.model.users import User
 from domain.model.sign_up_request import SignUpRequest
+from domain.model.user_stats import UserStats
+from domain.service.user_cache import UserCache
+from domain.service.password_hasher import PasswordHasher
+from domain.service.password_hasher_busy_error import PasswordHasherBusyError
 
 
 class UserService:
-    def __init__(self, user_repository: UserRepository):
+    def __init__(
+        self,
+        user_repository: UserRepository,
+        cache: UserCache = None,
+        stats_repository: UserStatsRepository = None,
+        password_hasher: PasswordHasher = None,
+    ):
         self.user_repository = user_repository
         self.user_mapper = UserMapper()
+        self.cache = cache
+        self.stats_repository = stats_repository
+        self.stats_mapper = UserStatsMapper()
+        self.password_hasher = password_hasher if password_hasher else PasswordHasher()
 
     def create_user(self, sign_up_request: SignUpRequest) -> User:
         existing_user = self.user_repository.find_by_login(sign_up_request.login)
@@ -20,7 +35,9 @@ class UserService:
                 f"User with login '{sign_up_request.login}' already exists"
             )
 
-        hashed_password = self._hash_password(sign_up_request.password)
+        # Соединение с БД не удерживается, пока пароль хэшируется
+        self.user_repository.close()
+        hashed_password = self.password_hasher.hash(sign_up_request.password)
 
         user_entity = UserEntity()
         user_entity.login = sign_up_request.login
@@ -28,20 +45,78 @@ class UserService:
 
         saved_entity = self.user_repository.save(user_entity)
 
-        return self.user_mapper.to_domain(saved_entity)
+        user = self.user_mapper.to_domain(saved_entity)
+        if self.cache:
+            self.cache.put(user)
+        return user
 
     def find_by_login(self, login: str) -> Optional[User]:
         entity = self.user_repository.find_by_login(login)
         return self.user_mapper.to_domain(entity) if entity else None
 
     def find_by_id(self, user_id: UUID) -> Optional[User]:
+        use_cache = self.cache is not None and isinstance(user_id, UUID)
+        if use_cache:
+            user = self.cache.get(user_id)
+            if user:
+                return user
+
         entity = self.user_repository.find_by_id(str(user_id))
-        return self.user_mapper.to_domain(entity) if entity else None
+        if not entity:
+            return None
+        user = self.user_mapper.to_domain(entity)
+        if use_cache:
+            self.cache.put(user)
+        return user
+
+    def find_by_ids(self, user_ids: List[UUID]) -> Dict[UUID, User]:
+        # Пользователи для списков (лидеры, соперники): кэш и один запрос IN
+        # на все промахи вместо запроса на каждого
+        user_ids = list(dict.fromkeys(user_ids))
+        users = self.cache.get_many(user_ids) if self.cache else {}
+
+        missing = [user_id for user_id in user_ids if user_id not in users]
+        if missing:
+            found = [
+                self.user_mapper.to_domain(entity)
+                for entity in self.user_repository.find_by_ids(missing)
+            ]
+            if self.cache:
+                self.cache.put_many(found)
+            users.update((user.user_id, user) for user in found)
+        return users
+
+    def get_stats(self, user_id: UUID) -> Optional[UserStats]:
+        if not self.find_by_id(user_id):
+            return None
+        entity = (
+            self.stats_repository.find_by_user_id(user_id)
+            if self.stats_repository
+            else None
+        )
+        # Игрок без завершённых партий
+        return self.stats_mapper.to_domain(entity) if entity else UserStats(user_id)
 
     def verify_password(self, user: User, password: str) -> bool:
-        hashed_password = self._hash_password(password)
-        return user.password == hashed_password
+        self.user_repository.close()
+        if not self.password_hasher.verify(password, user.password):
+            return False
+        if self.password_hasher.needs_rehash(user.password):
+            self._rehash_password(user, password)
+        return True
+
+    def verify_unknown_login(self, password: str) -> None:
+        # Вход с несуществующим логином сверяет пароль с фиктивным хэшем
+        self.user_repository.close()
+        self.password_hasher.verify_dummy(password)
 
-    @staticmethod
-    def _hash_password(password: str) -> str:
-        return hashlib.sha256(password.encode("utf-8")).hexdigest()
+    def _rehash_password(self, user: User, password: str) -> None:
+        # Открытый пароль известен только при входе: тогда прежний SHA-256 (или
+        # хэш с устаревшей стоимостью) и заменяется
+        try:
+            hashed_password = self.password_hasher.hash(password)
+        except PasswordHasherBusyError:
+            # Заменим при следующем входе
+            return
+        self.user_repository.update_password(user.user_id, hashed_password)
+        user.password = hashed_password
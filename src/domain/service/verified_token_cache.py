@@ -0,0 +1,43 @@
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+from typing import Optional, Tuple
+from uuid import UUID
+from domain.model.token_claims import TokenClaims
+
+
+# Уже проверенные токены доступа: повторный запрос с тем же токеном не
+# проверяет подпись заново. Ключ - SHA-256 токена, запись живёт до exp токена
+class VerifiedTokenCache:
+    MAX_SIZE = 10_000
+
+    def __init__(self, max_size: int = MAX_SIZE):
+        self._max_size = max_size
+        # хэш токена -> (пользователь, момент истечения)
+        self._entries: "OrderedDict[bytes, Tuple[UUID, float]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, token: str) -> Optional[UUID]:
+        key = self._key(token)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[1] <= time.time():
+                del self._entries[key]
+                entry = None
+            if entry is None:
+                return None
+            self._entries.move_to_end(key)
+            return entry[0]
+
+    def put(self, token: str, claims: TokenClaims) -> None:
+        key = self._key(token)
+        with self._lock:
+            self._entries[key] = (claims.user_id, claims.expires_at)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self._max_size:
+                self._entries.popitem(last=False)
+
+    @staticmethod
+    def _key(token: str) -> bytes:
+        return hashlib.sha256(token.encode()).digest()
@@ -0,0 +1,63 @@
+import gc
+import os
+
+# Запуск из каталога src: gunicorn wsgi:app (этот файл подхватывается автоматически)
+bind = os.getenv("SERVER_BIND", "0.0.0.0:5000")
+workers = int(os.getenv("SERVER_WORKERS", str(os.cpu_count() or 1)))
+# Контейнер делит ядра между воркерами (пулы поиска и хэширования паролей)
+os.environ["SERVER_WORKERS"] = str(workers)
+# Потоки, а не синхронные воркеры: открытый поток SSE или long-poll занимает
+# один поток, а таймаут воркера (timeout) не обрывает долгие запросы. В gthread
+# это пульс процесса воркера из его главного цикла, а не предел запроса
+worker_class = os.getenv("SERVER_WORKER_CLASS", "gthread")
+threads = int(os.getenv("SERVER_THREADS", "32"))
+# Очередь хэширования паролей меньше числа потоков запроса (di/container.py)
+os.environ["SERVER_THREADS"] = str(threads)
+timeout = int(os.getenv("SERVER_TIMEOUT", "30"))
+# Сколько ждать завершения начатых запросов при остановке и перезапуске (SIGTERM / SIGHUP)
+graceful_timeout = int(os.getenv("SERVER_GRACEFUL_TIMEOUT", "30"))
+keepalive = int(os.getenv("SERVER_KEEPALIVE", "5"))
+max_requests = int(os.getenv("SERVER_MAX_REQUESTS", "0"))
+max_requests_jitter = int(os.getenv("SERVER_MAX_REQUESTS_JITTER", "0"))
+accesslog = os.getenv("SERVER_ACCESS_LOG") or None
+# Токен из ?access_token= потока событий не попадает в журнал доступа
+logger_class = "web.module.access_log.AccessLogger"
+loglevel = os.getenv("SERVER_LOG_LEVEL", "info")
+
+# С несколькими воркерами события о ходах по умолчанию рассылаются через
+# PostgreSQL: иначе поток SSE и long-poll в одном воркере не узнают о ходе,
+# записанном другим
+if workers > 1:
+    os.environ.setdefault("EVENTS_TRANSPORT", "postgres")
+
+# Если рассылка всё же выключена явно (EVENTS_TRANSPORT=local), кэш партий в
+# памяти одного воркера не узнает о чужих ходах, поэтому по умолчанию он выключается
+if (
+    workers > 1
+    and os.getenv("CACHE_BACKEND", "memory").lower() == "memory"
+    and os.getenv("EVENTS_TRANSPORT").lower() != "postgres"
+):
+    os.environ.setdefault("CACHE_SIZE", "0")
+
+# Приложение, таблица ходов и движки загружаются до fork и делятся воркерами
+preload_app = True
+
+
+def when_ready(server):
+    # Прогретые объекты мастера переносятся в постоянное поколение, чтобы сборщик
+    # мусора в воркерах не трогал их страницы и не ломал copy-on-write
+    gc.collect()
+    gc.freeze()
+
+
+def post_fork(server, worker):
+    from datasource.database import engine
+
+    # Соединения пула, открытые мастером, не должны использоваться воркерами
+    engine.dispose(close=False)
+
+
+def worker_exit(server, worker):
+    # Дожидаемся фоновых ходов компьютера и закрываем пулы воркера
+    container = worker.wsgi.config["CONTAINER"]
+    container.close()
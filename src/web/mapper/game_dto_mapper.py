@@ -1,16 +1,37 @@
-from typing import List
+import base64
+import json
+from dataclasses import asdict
+from datetime import datetime
+from typing import List, Optional, Tuple, Union
+from uuid import UUID
 from domain.model.current_game import CurrentGame
+from domain.model.game_field import GameField
+from domain.model.game_state import GameState
+from domain.model.lobby_game import LobbyGame
+from domain.model.move import Move
+from domain.model.position_analysis import PositionAnalysis
 from web.model.game_info_dto import GameInfoDto
 from web.model.available_game_dto import AvailableGameDto
 from web.model.game_history_dto import GameHistoryDto
+from web.model.make_move_request_dto import MakeMoveRequestDto
 
 
 class GameDtoMapper:
+    @staticmethod
+    def to_move(dto: MakeMoveRequestDto) -> Move:
+        return Move(
+            row=dto.row,
+            col=dto.col,
+            cell=dto.cell,
+            board=GameField.from_board(dto.board) if dto.board is not None else None,
+        )
+
     @staticmethod
     def to_game_info_dto(game: CurrentGame) -> GameInfoDto:
         return GameInfoDto(
             game_id=str(game.game_id),
-            board=game.game_field.board,
+            board=game.game_field.to_board(),
+            win_length=game.game_field.win_length,
             game_type=game.game_type.value,
             game_state=game.game_state.value,
             player1_id=str(game.player1_id),
@@ -21,25 +42,37 @@ class GameDtoMapper:
                 str(game.current_player_id) if game.current_player_id else None
             ),
             winner_id=str(game.winner_id) if game.winner_id else None,
+            difficulty=game.difficulty.value if game.difficulty else None,
+            version=game.version,
         )
 
     @staticmethod
-    def to_available_game_dto(game: CurrentGame) -> AvailableGameDto:
+    def to_sse_event(game: CurrentGame) -> str:
+        # Событие потока /events: id - версия партии, данные - как в GET /game
+        data = json.dumps(asdict(GameDtoMapper.to_game_info_dto(game)))
+        return f"id: {game.version}\nevent: game\ndata: {data}\n\n"
+
+    @staticmethod
+    def to_available_game_dto(game: LobbyGame) -> AvailableGameDto:
         return AvailableGameDto(
             game_id=str(game.game_id),
             player1_id=str(game.player1_id),
-            player2_id=str(game.player2_id) if game.player2_id else None,
             game_type=game.game_type.value,
+            board_size=game.board_size,
+            win_length=game.win_length,
         )
 
     @staticmethod
-    def to_available_games_list(games: List[CurrentGame]) -> List[dict]:
+    def to_available_games_list(games: List[LobbyGame]) -> List[dict]:
+        # В лобби только ожидающие партии: второго игрока у них ещё нет
         return [
             {
                 "game_id": str(game.game_id),
                 "player1_id": str(game.player1_id),
-                "player2_id": str(game.player2_id) if game.player2_id else None,
+                "player2_id": None,
                 "game_type": game.game_type.value,
+                "board_size": game.board_size,
+                "win_length": game.win_length,
             }
             for game in games
         ]
@@ -48,7 +81,7 @@ class GameDtoMapper:
     def to_game_history_dto(game: CurrentGame) -> GameHistoryDto:
         return GameHistoryDto(
             game_id=str(game.game_id),
-            board=game.game_field.board,
+            board=game.game_field.to_board(),
             game_type=game.game_type.value,
             game_state=game.game_state.value,
             player1_id=str(game.player1_id),
@@ -67,7 +100,7 @@ class GameDtoMapper:
         return [
             {
                 "game_id": str(game.game_id),
-                "board": game.game_field.board,
+                "board": game.game_field.to_board(),
                 "game_type": game.game_type.value,
                 "game_state": game.game_state.value,
                 "player1_id": str(game.player1_id),
@@ -82,3 +115,57 @@ class GameDtoMapper:
             }
             for game in games
         ]
+
+    @staticmethod
+    def to_cursor(
+        games: List[Union[CurrentGame, LobbyGame]], limit: int
+    ) -> Optional[str]:
+        # Курсор следующей страницы - ключ последней партии страницы
+        if len(games) < limit:
+            return None
+        last = games[-1]
+        key = f"{last.created_at.isoformat()}|{last.game_id}"
+        return base64.urlsafe_b64encode(key.encode()).decode().rstrip("=")
+
+    @staticmethod
+    def from_cursor(cursor: str) -> Tuple[datetime, UUID]:
+        try:
+            padded = cursor + "=" * (-len(cursor) % 4)
+            created_at, game_id = (
+                base64.urlsafe_b64decode(padded.encode()).decode().split("|")
+            )
+            return datetime.fromisoformat(created_at), UUID(game_id)
+        except (ValueError, UnicodeDecodeError):
+            raise ValueError("Invalid cursor")
+
+    @staticmethod
+    def to_analysis_list(analysis: PositionAnalysis) -> List[dict]:
+        results = []
+        for winner, terminal, to_move, best_move, score in zip(
+            analysis.winners,
+            analysis.terminal,
+            analysis.to_move,
+            analysis.best_moves,
+            analysis.scores,
+        ):
+            if winner:
+                game_state = GameState.PLAYER_WON.value
+            elif terminal:
+                game_state = GameState.DRAW.value
+            else:
+                game_state = GameState.PLAYER_TURN.value
+            results.append(
+                {
+                    "winner": winner,
+                    "terminal": terminal,
+                    "game_state": game_state,
+                    "to_move": to_move,
+                    "best_move": (
+                        {"row": best_move // 3, "col": best_move % 3}
+                        if best_move is not None
+                        else None
+                    ),
+                    "score": score,
+                }
+            )
+        return results
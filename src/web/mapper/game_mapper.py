@@ -7,10 +7,10 @@ from web.model.current_game_dto import CurrentGameDTO
 class WebGameMapper:
     @staticmethod
     def to_domain(dto: CurrentGameDTO) -> CurrentGame:
-        game_field = GameField(board=dto.game_field.board)
+        game_field = GameField.from_board(dto.game_field.board)
         return CurrentGame(game_id=dto.game_id, game_field=game_field)
 
     @staticmethod
     def to_dto(domain: CurrentGame) -> CurrentGameDTO:
-        game_field_dto = GameFieldDTO(board=domain.game_field.board)
+        game_field_dto = GameFieldDTO(board=domain.game_field.to_board())
         return CurrentGameDTO(game_id=domain.game_id, game_field=game_field_dto)
@@ -0,0 +1,15 @@
+from domain.model.user_stats import UserStats
+from web.model.user_stats_dto import UserStatsDto
+
+
+class UserStatsMapper:
+    @staticmethod
+    def to_dto(stats: UserStats) -> UserStatsDto:
+        return UserStatsDto(
+            user_id=str(stats.user_id),
+            wins=stats.wins,
+            losses=stats.losses,
+            draws=stats.draws,
+            total=stats.total,
+            win_ratio=round(stats.win_ratio, 3),
+        )
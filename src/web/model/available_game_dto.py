@@ -7,4 +7,6 @@ class AvailableGameDto:
     game_id: str
     player1_id: str
     game_type: str
+    board_size: int
+    win_length: int
     player2_id: Optional[str] = None
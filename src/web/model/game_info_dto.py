@@ -6,6 +6,7 @@ from typing import Optional, List
 class GameInfoDto:
     game_id: str
     board: List[List[int]]
+    win_length: int
     game_type: str
     game_state: str
     player1_id: str
@@ -14,3 +15,5 @@ class GameInfoDto:
     player2_symbol: int
     current_player_id: Optional[str]
     winner_id: Optional[str]
+    difficulty: Optional[str] = None
+    version: int = 1
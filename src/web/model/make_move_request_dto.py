@@ -1,7 +1,11 @@
 from dataclasses import dataclass
+from typing import List, Optional
 
 
 @dataclass
 class MakeMoveRequestDto:
-    row: int
-    col: int
+    row: Optional[int] = None
+    col: Optional[int] = None
+    cell: Optional[int] = None
+    board: Optional[List[List[int]]] = None
+    async_reply: bool = False
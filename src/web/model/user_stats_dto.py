@@ -0,0 +1,11 @@
+from dataclasses import dataclass
+
+
+@dataclass
+class UserStatsDto:
+    user_id: str
+    wins: int
+    losses: int
+    draws: int
+    total: int
+    win_ratio: float
@@ -0,0 +1,21 @@
+import re
+from gunicorn.glogging import Logger
+
+# Поток событий принимает токен в ?access_token= (EventSource не умеет
+# заголовки), а строка запроса попадает в журнал доступа целиком
+QUERY_TOKEN = re.compile(r"(access_token=)[^&\s]*")
+
+
+def mask_query_token(value: str) -> str:
+    return QUERY_TOKEN.sub(r"\1***", value)
+
+
+# Журнал доступа gunicorn без токенов: маскируются все строковые поля записи
+# (строка запроса, Referer, переменные окружения)
+class AccessLogger(Logger):
+    def atoms(self, resp, req, environ, request_time):
+        atoms = super().atoms(resp, req, environ, request_time)
+        return {
+            key: mask_query_token(value) if isinstance(value, str) else value
+            for key, value in atoms.items()
+        }
@@ -21,6 +21,11 @@ def create_app(container) -> Flask:
     app.config["JWT_REFRESH_TOKEN_EXPIRES"] = timedelta(days=30)
 
     jwt = JWTManager(app)
+    container.jwt_provider.init_app(app)
+    container.authenticator.init_app(app)
+
+    # Сессия БД живёт ровно один запрос
+    app.teardown_appcontext(container.close_session)
 
     auth_controller = AuthController(
         container.auth_service, container.user_service, container.authenticator
@@ -0,0 +1,28 @@
+from contextlib import asynccontextmanager
+from a2wsgi import WSGIMiddleware
+from starlette.applications import Starlette
+from starlette.routing import Mount
+from web.module.app import create_app
+from web.route.async_game_controller import AsyncGameController
+
+
+def create_asgi_app(container) -> Starlette:
+    # Игровые маршруты обслуживаются асинхронно, остальное (авторизация,
+    # пользователи, анализ, статистика движков) - прежним Flask-приложением
+    flask_app = create_app(container)
+
+    # Контекст Flask-приложения для проверки подписи JwtProvider открывает сам,
+    # и только если токена ещё нет среди проверенных
+    game_controller = AsyncGameController(
+        container.async_game_service, container.auth_service.authenticate_by_token
+    )
+
+    @asynccontextmanager
+    async def lifespan(app):
+        yield
+        await container.close_async()
+
+    return Starlette(
+        routes=game_controller.routes + [Mount("/", WSGIMiddleware(flask_app))],
+        lifespan=lifespan,
+    )
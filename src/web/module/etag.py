@@ -0,0 +1,16 @@
+# ETag партии - её версия: меняется при каждой записи хода или присоединения
+
+
+def etag(version: int) -> str:
+    return f'"{version}"'
+
+
+def etag_matches(if_none_match: str, version: int) -> bool:
+    expected = etag(version)
+    for tag in if_none_match.split(","):
+        tag = tag.strip()
+        if tag.startswith("W/"):
+            tag = tag[2:]
+        if tag == expected or tag == "*":
+            return True
+    return False
@@ -0,0 +1,112 @@
+from typing import Optional, Tuple
+from uuid import UUID
+from domain.model.difficulty import Difficulty
+from domain.model.game_field import GameField
+from domain.model.game_type import GameType
+from domain.model.move import Move
+from web.mapper.game_dto_mapper import GameDtoMapper
+from web.model.make_move_request_dto import MakeMoveRequestDto
+
+# Проверка тел и параметров запросов /game, общая для GameController и
+# AsyncGameController. Ошибка - ValueError с текстом ответа 400
+
+MAX_LIMIT = 100
+
+
+def is_int(value) -> bool:
+    # Ровно int из JSON: bool и подклассы int не принимаются
+    return type(value) is int
+
+
+def parse_game_id(game_id: str) -> UUID:
+    try:
+        return UUID(game_id)
+    except ValueError:
+        raise ValueError("Invalid game_id format")
+
+
+def check_limit(limit: int) -> int:
+    if limit < 1:
+        raise ValueError("limit must be greater than 0")
+    if limit > MAX_LIMIT:
+        raise ValueError(f"limit must not exceed {MAX_LIMIT}")
+    return limit
+
+
+def parse_board(data: dict) -> Tuple[int, int]:
+    board_size = data.get("board_size", GameField.DEFAULT_SIZE)
+    if not is_int(board_size):
+        raise ValueError("board_size must be an integer")
+
+    # По умолчанию: "три в ряд" на 3x3, "пять в ряд" на крупных полях
+    win_length = data.get("win_length", min(board_size, 5))
+    if not is_int(win_length):
+        raise ValueError("win_length must be an integer")
+    return board_size, win_length
+
+
+def parse_create_game(
+    data: Optional[dict],
+) -> Tuple[GameType, int, int, Optional[Difficulty]]:
+    if not data or "game_type" not in data:
+        raise ValueError("game_type is required")
+
+    game_type_str = str(data["game_type"]).lower()
+    if game_type_str not in ["pvp", "pvc"]:
+        raise ValueError('game_type must be "pvp" or "pvc"')
+
+    board_size, win_length = parse_board(data)
+
+    difficulty = None
+    if data.get("difficulty") is not None:
+        difficulty_str = str(data["difficulty"]).lower()
+        if difficulty_str not in [level.value for level in Difficulty]:
+            raise ValueError('difficulty must be "easy", "medium" or "hard"')
+        difficulty = Difficulty(difficulty_str)
+
+    return GameType(game_type_str), board_size, win_length, difficulty
+
+
+def parse_move(data: Optional[dict]) -> Tuple[Move, bool]:
+    # Ход и флаг async: ответ компьютера вычисляется в фоне
+    if not data:
+        raise ValueError("row and col (or cell) are required")
+
+    async_reply = data.get("async", False)
+    if not isinstance(async_reply, bool):
+        raise ValueError("async must be a boolean")
+
+    if "cell" in data:
+        if not is_int(data["cell"]):
+            raise ValueError("cell must be an integer")
+        dto = MakeMoveRequestDto(cell=data["cell"], async_reply=async_reply)
+    elif "row" in data or "col" in data:
+        if not is_int(data.get("row")) or not is_int(data.get("col")):
+            raise ValueError("row and col must be integers")
+        dto = MakeMoveRequestDto(
+            row=data["row"], col=data["col"], async_reply=async_reply
+        )
+    elif "board" in data:
+        board = data["board"]
+        if not isinstance(board, list) or any(
+            not isinstance(row, list) or len(row) != len(board) for row in board
+        ):
+            raise ValueError("board must be a square array")
+        dto = MakeMoveRequestDto(board=board, async_reply=async_reply)
+    else:
+        raise ValueError("row and col (or cell) are required")
+
+    try:
+        move = GameDtoMapper.to_move(dto)
+    except ValueError:
+        raise ValueError("board contains invalid cells")
+    return move, dto.async_reply
+
+
+def parse_lobby_game_type(value: Optional[str]) -> Optional[GameType]:
+    if not value:
+        return None
+    # PvC-партии не ждут второго игрока и в лобби не попадают
+    if value.lower() != "pvp":
+        raise ValueError('game_type must be "pvp"')
+    return GameType.PVP
@@ -1,5 +1,5 @@
 from functools import wraps
-from flask import request, jsonify
+from flask import Flask, current_app, request, jsonify
 from domain.service.auth_service import AuthService
 
 
@@ -7,57 +7,86 @@ class UserAuthenticator:
     def __init__(self, auth_service: AuthService):
         self.auth_service = auth_service
 
-    def require_auth(self, f):
+    def init_app(self, app: Flask) -> None:
+        # Проверка токена один раз на запрос, до обработчика маршрута
+        app.before_request(self._authenticate_request)
+
+    def require_auth(self, f, allow_query_token: bool = False):
+        # Оборачивает обработчик один раз при регистрации маршрута
         @wraps(f)
         def decorated_function(*args, **kwargs):
-            auth_header = request.headers.get("Authorization")
-
-            if not auth_header:
-                return (
-                    jsonify(
-                        {
-                            "error": "Authorization required",
-                            "message": "Please provide Authorization header",
-                        }
-                    ),
-                    401,
-                )
-
-            if not auth_header.startswith("Bearer "):
-                return (
-                    jsonify(
-                        {
-                            "error": "Invalid authorization format",
-                            "message": "Authorization header must be in format: Bearer <token>",
-                        }
-                    ),
-                    401,
-                )
-
-            token = auth_header[7:]  # После "Bearer "
-
-            if not token:
-                return (
-                    jsonify(
-                        {
-                            "error": "Token missing",
-                            "message": "Authorization token is missing",
-                        }
-                    ),
-                    401,
-                )
-
-            user_id = self.auth_service.authenticate_by_token(token)
-
-            if not user_id:
-                return (
-                    jsonify(
-                        {"error": "Unauthorized", "message": "Invalid or expired token"}
-                    ),
-                    401,
-                )
-
-            request.user_id = user_id
+            error = self._authenticate(allow_query_token)
+            if error:
+                return error
             return f(*args, **kwargs)
 
+        decorated_function.auth_required = True
+        decorated_function.allow_query_token = allow_query_token
         return decorated_function
+
+    def _authenticate_request(self):
+        view = current_app.view_functions.get(request.endpoint)
+        if not getattr(view, "auth_required", False):
+            return None
+        return self._authenticate(view.allow_query_token)
+
+    def _authenticate(self, allow_query_token: bool):
+        # Запрос уже проверен в before_request
+        if getattr(request, "user_id", None):
+            return None
+
+        auth_header = request.headers.get("Authorization")
+
+        # EventSource в браузере не умеет передавать заголовки
+        if not auth_header and allow_query_token:
+            query_token = request.args.get("access_token")
+            if query_token:
+                auth_header = f"Bearer {query_token}"
+
+        if not auth_header:
+            return (
+                jsonify(
+                    {
+                        "error": "Authorization required",
+                        "message": "Please provide Authorization header",
+                    }
+                ),
+                401,
+            )
+
+        if not auth_header.startswith("Bearer "):
+            return (
+                jsonify(
+                    {
+                        "error": "Invalid authorization format",
+                        "message": "Authorization header must be in format: Bearer <token>",
+                    }
+                ),
+                401,
+            )
+
+        token = auth_header[7:]  # После "Bearer "
+
+        if not token:
+            return (
+                jsonify(
+                    {
+                        "error": "Token missing",
+                        "message": "Authorization token is missing",
+                    }
+                ),
+                401,
+            )
+
+        user_id = self.auth_service.authenticate_by_token(token)
+
+        if not user_id:
+            return (
+                jsonify(
+                    {"error": "Unauthorized", "message": "Invalid or expired token"}
+                ),
+                401,
+            )
+
+        request.user_id = user_id
+        return None
@@ -0,0 +1,338 @@
+import asyncio
+from dataclasses import asdict
+from typing import Callable, Optional
+from uuid import UUID
+from starlette.requests import Request
+from starlette.responses import JSONResponse, Response, StreamingResponse
+from starlette.routing import Route
+from domain.service.game_conflict_error import GameConflictError
+from domain.service.async_game_service_interface import AsyncGameServiceInterface
+from domain.model.game_state import GameState
+from web.mapper.game_dto_mapper import GameDtoMapper
+from web.mapper.leaderboard_mapper import LeaderboardMapper
+from web.module.etag import etag, etag_matches
+from web.module.game_request import (
+    check_limit,
+    parse_board,
+    parse_create_game,
+    parse_game_id,
+    parse_lobby_game_type,
+    parse_move,
+)
+
+
+# Асинхронные версии игровых маршрутов /game для ASGI-приложения.
+# Формат запросов и ответов совпадает с GameController.
+class AsyncGameController:
+    SSE_KEEPALIVE = 15
+    LONG_POLL_TIMEOUT = 25.0
+    MAX_LONG_POLL_TIMEOUT = 60.0
+
+    def __init__(
+        self,
+        game_service: AsyncGameServiceInterface,
+        authenticate: Callable[[str], Optional[UUID]],
+    ):
+        self.game_service = game_service
+        self.authenticate = authenticate
+        self.mapper = GameDtoMapper()
+        self.leaderboard_mapper = LeaderboardMapper()
+        self.routes = [
+            Route("/game/create", self.create_game, methods=["POST"]),
+            Route("/game/quickmatch", self.quickmatch, methods=["POST"]),
+            Route("/game/available", self.get_available_games, methods=["GET"]),
+            Route("/game/history", self.get_game_history, methods=["GET"]),
+            Route("/game/leaderboard", self.get_leaderboard, methods=["GET"]),
+            Route("/game/{game_id}/join", self.join_game, methods=["POST"]),
+            Route("/game/{game_id}/move", self.make_move, methods=["POST"]),
+            Route("/game/{game_id}/events", self.get_game_events, methods=["GET"]),
+            Route("/game/{game_id}", self.get_game, methods=["GET"]),
+        ]
+
+    def _require_auth(self, request: Request, allow_query_token: bool = False):
+        auth_header = request.headers.get("Authorization")
+
+        if not auth_header and allow_query_token:
+            query_token = request.query_params.get("access_token")
+            if query_token:
+                auth_header = f"Bearer {query_token}"
+
+        if not auth_header:
+            return None, JSONResponse(
+                {
+                    "error": "Authorization required",
+                    "message": "Please provide Authorization header",
+                },
+                401,
+            )
+
+        if not auth_header.startswith("Bearer ") or not auth_header[7:]:
+            return None, JSONResponse(
+                {
+                    "error": "Invalid authorization format",
+                    "message": "Authorization header must be in format: Bearer <token>",
+                },
+                401,
+            )
+
+        user_id = self.authenticate(auth_header[7:])
+        if not user_id:
+            return None, JSONResponse(
+                {"error": "Unauthorized", "message": "Invalid or expired token"}, 401
+            )
+        return user_id, None
+
+    def _game_response(self, game, status: int = 200) -> JSONResponse:
+        return JSONResponse(asdict(self.mapper.to_game_info_dto(game)), status)
+
+    @staticmethod
+    async def _json(request: Request):
+        try:
+            return await request.json()
+        except ValueError:
+            return None
+
+    @staticmethod
+    def _query_number(request: Request, name: str, kind):
+        # Как request.args.get(type=...) во Flask: некорректное значение игнорируется
+        try:
+            return kind(request.query_params[name])
+        except (KeyError, ValueError):
+            return None
+
+    @staticmethod
+    def _game_uuid(request: Request) -> UUID:
+        return parse_game_id(request.path_params["game_id"])
+
+    async def create_game(self, request: Request):
+        player_id, error = self._require_auth(request)
+        if error:
+            return error
+        try:
+            game_type, board_size, win_length, difficulty = parse_create_game(
+                await self._json(request)
+            )
+
+            game = await self.game_service.create_game(
+                player_id, game_type, board_size, win_length, difficulty
+            )
+            return self._game_response(game, 201)
+
+        except ValueError as e:
+            return JSONResponse({"error": str(e)}, 400)
+        except Exception as e:
+            return JSONResponse({"error": str(e)}, 500)
+
+    async def quickmatch(self, request: Request):
+        player_id, error = self._require_auth(request)
+        if error:
+            return error
+        try:
+            board_size, win_length = parse_board(await self._json(request) or {})
+            game = await self.game_service.quickmatch(player_id, board_size, win_length)
+            # 200 - соперник найден, 202 - игрок ждёт соперника в своей партии
+            status = 202 if game.game_state == GameState.WAITING_FOR_PLAYER else 200
+            return self._game_response(game, status)
+
+        except ValueError as e:
+            return JSONResponse({"error": str(e)}, 400)
+        except Exception as e:
+            return JSONResponse({"error": str(e)}, 500)
+
+    async def get_available_games(self, request: Request):
+        _, error = self._require_auth(request)
+        if error:
+            return error
+        try:
+            limit = self._query_number(request, "limit", int)
+            limit = check_limit(20 if limit is None else limit)
+
+            game_type = parse_lobby_game_type(request.query_params.get("game_type"))
+
+            after = None
+            if request.query_params.get("after"):
+                after = self.mapper.from_cursor(request.query_params["after"])
+
+            games = await self.game_service.get_available_games(limit, after, game_type)
+            return JSONResponse(
+                {
+                    "games": self.mapper.to_available_games_list(games),
+                    "next_cursor": self.mapper.to_cursor(games, limit),
+                }
+            )
+
+        except ValueError as e:
+            return JSONResponse({"error": str(e)}, 400)
+        except Exception as e:
+            return JSONResponse({"error": str(e)}, 500)
+
+    async def join_game(self, request: Request):
+        player_id, error = self._require_auth(request)
+        if error:
+            return error
+        try:
+            game = await self.game_service.join_game(
+                self._game_uuid(request), player_id
+            )
+            return self._game_response(game)
+
+        except GameConflictError as e:
+            return JSONResponse({"error": str(e)}, 409)
+        except ValueError as e:
+            return JSONResponse({"error": str(e)}, 400)
+        except Exception as e:
+            return JSONResponse({"error": str(e)}, 500)
+
+    async def make_move(self, request: Request):
+        player_id, error = self._require_auth(request)
+        if error:
+            return error
+        try:
+            move, async_reply = parse_move(await self._json(request))
+
+            game = await self.game_service.make_move(
+                self._game_uuid(request), player_id, move, async_reply
+            )
+            return self._game_response(game)
+
+        except GameConflictError as e:
+            return JSONResponse({"error": str(e)}, 409)
+        except ValueError as e:
+            return JSONResponse({"error": str(e)}, 400)
+        except Exception as e:
+            return JSONResponse({"error": str(e)}, 500)
+
+    async def get_game(self, request: Request):
+        _, error = self._require_auth(request)
+        if error:
+            return error
+        try:
+            game_uuid = self._game_uuid(request)
+
+            wait_for_version = self._query_number(request, "wait_for_version", int)
+            if wait_for_version is not None:
+                timeout = self._query_number(request, "timeout", float)
+                if timeout is None:
+                    timeout = self.LONG_POLL_TIMEOUT
+                timeout = min(max(timeout, 0.0), self.MAX_LONG_POLL_TIMEOUT)
+                game = await self.game_service.wait_for_version(
+                    game_uuid, wait_for_version, timeout
+                )
+            else:
+                if_none_match = request.headers.get("If-None-Match")
+                if if_none_match:
+                    version = await self.game_service.get_game_version(game_uuid)
+                    if version is not None and etag_matches(if_none_match, version):
+                        return Response(
+                            status_code=304, headers={"ETag": etag(version)}
+                        )
+                game = await self.game_service.get_game(game_uuid)
+
+            if not game:
+                return JSONResponse({"error": "Game not found"}, 404)
+
+            response = self._game_response(game)
+            response.headers["ETag"] = etag(game.version)
+            return response
+
+        except ValueError as e:
+            return JSONResponse({"error": str(e)}, 400)
+        except Exception as e:
+            return JSONResponse({"error": str(e)}, 500)
+
+    async def get_game_events(self, request: Request):
+        _, error = self._require_auth(request, allow_query_token=True)
+        if error:
+            return error
+        try:
+            game_uuid = self._game_uuid(request)
+
+            # События приходят из потоков шины, в цикл событий их передаёт loop
+            loop = asyncio.get_running_loop()
+            updates: asyncio.Queue = asyncio.Queue()
+
+            def listener(game):
+                loop.call_soon_threadsafe(updates.put_nowait, game)
+
+            self.game_service.subscribe(game_uuid, listener)
+            try:
+                game = await self.game_service.get_game(game_uuid)
+            except Exception:
+                self.game_service.unsubscribe(game_uuid, listener)
+                raise
+
+            if not game:
+                self.game_service.unsubscribe(game_uuid, listener)
+                return JSONResponse({"error": "Game not found"}, 404)
+
+            return StreamingResponse(
+                self._stream_game_events(game_uuid, game, updates, listener),
+                media_type="text/event-stream",
+                headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+            )
+
+        except ValueError as e:
+            return JSONResponse({"error": str(e)}, 400)
+        except Exception as e:
+            return JSONResponse({"error": str(e)}, 500)
+
+    async def _stream_game_events(self, game_uuid, game, updates, listener):
+        try:
+            yield self.mapper.to_sse_event(game)
+            while not game.is_game_over():
+                try:
+                    game = await asyncio.wait_for(updates.get(), self.SSE_KEEPALIVE)
+                except asyncio.TimeoutError:
+                    if game.game_state == GameState.COMPUTER_THINKING:
+                        # Фоновый ход мог пропасть: без этого поток ждал бы вечно
+                        await self.game_service.recover_computer_move(game_uuid)
+                    yield ": keepalive\n\n"
+                    continue
+                yield self.mapper.to_sse_event(game)
+        finally:
+            self.game_service.unsubscribe(game_uuid, listener)
+
+    async def get_game_history(self, request: Request):
+        user_id, error = self._require_auth(request)
+        if error:
+            return error
+        try:
+            limit = self._query_number(request, "limit", int)
+            limit = check_limit(20 if limit is None else limit)
+
+            after = None
+            if request.query_params.get("after"):
+                after = self.mapper.from_cursor(request.query_params["after"])
+
+            games = await self.game_service.get_completed_games_by_user(
+                user_id, limit, after
+            )
+            return JSONResponse(
+                {
+                    "games": self.mapper.to_game_history_list(games),
+                    "next_cursor": self.mapper.to_cursor(games, limit),
+                }
+            )
+
+        except ValueError as e:
+            return JSONResponse({"error": str(e)}, 400)
+        except Exception as e:
+            return JSONResponse({"error": str(e)}, 500)
+
+    async def get_leaderboard(self, request: Request):
+        _, error = self._require_auth(request)
+        if error:
+            return error
+        try:
+            limit = self._query_number(request, "limit", int)
+            limit = check_limit(10 if limit is None else limit)
+
+            leaders = await self.game_service.get_leaderboard(limit)
+            return JSONResponse(
+                {"leaderboard": self.leaderboard_mapper.to_dto_list(leaders)}
+            )
+
+        except ValueError as e:
+            return JSONResponse({"error": str(e)}, 400)
+        except Exception as e:
+            return JSONResponse({"error": str(e)}, 500)
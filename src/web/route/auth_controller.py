@@ -1,5 +1,6 @@
 from flask import Blueprint, request, jsonify
 from domain.service.auth_service import AuthService
+from domain.service.password_hasher_busy_error import PasswordHasherBusyError
 from domain.service.user_service import UserService
 from web.mapper.auth_mapper import AuthMapper
 from web.mapper.jwt_mapper import JwtMapper
@@ -32,7 +33,19 @@ class AuthController:
             "/refresh-access", "refresh_access", self.refresh_access, methods=["POST"]
         )
         self.bp.add_url_rule("/refresh", "refresh", self.refresh, methods=["POST"])
-        self.bp.add_url_rule("/me", "me", self.get_me, methods=["GET"])
+        self.bp.add_url_rule(
+            "/me",
+            "me",
+            self.authenticator.require_auth(self._get_me_impl),
+            methods=["GET"],
+        )
+
+    @staticmethod
+    def _busy(body: dict):
+        # Перегрузка, а не неверные данные: клиент может повторить запрос
+        response = jsonify(body)
+        response.headers["Retry-After"] = "1"
+        return response, 503
 
     def register(self):
         try:
@@ -68,6 +81,8 @@ class AuthController:
                     400,
                 )
 
+        except PasswordHasherBusyError as e:
+            return self._busy({"success": False, "message": str(e)})
         except Exception as e:
             return jsonify({"success": False, "message": f"Error: {str(e)}"}), 500
 
@@ -87,6 +102,8 @@ class AuthController:
             else:
                 return jsonify({"error": "Invalid credentials"}), 401
 
+        except PasswordHasherBusyError as e:
+            return self._busy({"error": str(e)})
         except Exception as e:
             return jsonify({"error": f"Error: {str(e)}"}), 500
 
@@ -130,9 +147,6 @@ class AuthController:
         except Exception as e:
             return jsonify({"error": f"Error: {str(e)}"}), 500
 
-    def get_me(self):
-        return self.authenticator.require_auth(self._get_me_impl)()
-
     def _get_me_impl(self):
         try:
             user_id = request.user_id
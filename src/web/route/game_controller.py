@@ -1,13 +1,31 @@
-from flask import Blueprint, request, jsonify
+import queue
+from dataclasses import asdict
+from flask import Blueprint, Response, request, jsonify
 from uuid import UUID
+from domain.service.game_conflict_error import GameConflictError
 from domain.service.game_service_interface import GameServiceInterface
-from domain.model.game_type import GameType
+from domain.model.game_state import GameState
 from web.mapper.game_dto_mapper import GameDtoMapper
 from web.mapper.leaderboard_mapper import LeaderboardMapper
+from web.module.etag import etag, etag_matches
+from web.module.game_request import (
+    check_limit,
+    parse_board,
+    parse_create_game,
+    parse_game_id,
+    parse_lobby_game_type,
+    parse_move,
+)
 from web.module.user_authenticator import UserAuthenticator
 
 
 class GameController:
+    # Как часто слать комментарий в поток SSE, чтобы прокси не закрывали соединение
+    SSE_KEEPALIVE = 15
+    # Сколько держать запрос с ?wait_for_version, если таймаут не указан и максимум
+    LONG_POLL_TIMEOUT = 25.0
+    MAX_LONG_POLL_TIMEOUT = 60.0
+
     def __init__(
         self, game_service: GameServiceInterface, authenticator: UserAuthenticator
     ):
@@ -20,117 +38,137 @@ class GameController:
 
     def _register_routes(self):
         self.blueprint.add_url_rule(
-            "/create", "create_game", self.create_game, methods=["POST"]
+            "/create",
+            "create_game",
+            self.authenticator.require_auth(self._create_game_impl),
+            methods=["POST"],
+        )
+        self.blueprint.add_url_rule(
+            "/quickmatch",
+            "quickmatch",
+            self.authenticator.require_auth(self._quickmatch_impl),
+            methods=["POST"],
         )
         self.blueprint.add_url_rule(
             "/available",
             "get_available_games",
-            self.get_available_games,
+            self.authenticator.require_auth(self._get_available_games_impl),
+            methods=["GET"],
+        )
+        self.blueprint.add_url_rule(
+            "/analyze",
+            "analyze_positions",
+            self.authenticator.require_auth(self._analyze_positions_impl),
+            methods=["POST"],
+        )
+        self.blueprint.add_url_rule(
+            "/<game_id>/join",
+            "join_game",
+            self.authenticator.require_auth(self._join_game_impl),
+            methods=["POST"],
+        )
+        self.blueprint.add_url_rule(
+            "/<game_id>/move",
+            "make_move",
+            self.authenticator.require_auth(self._make_move_impl),
+            methods=["POST"],
+        )
+        self.blueprint.add_url_rule(
+            "/<game_id>",
+            "get_game",
+            self.authenticator.require_auth(self._get_game_impl),
             methods=["GET"],
         )
         self.blueprint.add_url_rule(
-            "/<game_id>/join", "join_game", self.join_game, methods=["POST"]
+            "/<game_id>/events",
+            "get_game_events",
+            self.authenticator.require_auth(
+                self._get_game_events_impl, allow_query_token=True
+            ),
+            methods=["GET"],
         )
         self.blueprint.add_url_rule(
-            "/<game_id>/move", "make_move", self.make_move, methods=["POST"]
+            "/history",
+            "get_game_history",
+            self.authenticator.require_auth(self._get_game_history_impl),
+            methods=["GET"],
         )
         self.blueprint.add_url_rule(
-            "/<game_id>", "get_game", self.get_game, methods=["GET"]
+            "/engine/stats",
+            "get_engine_stats",
+            self.authenticator.require_auth(self._get_engine_stats_impl),
+            methods=["GET"],
         )
         self.blueprint.add_url_rule(
-            "/history", "get_game_history", self.get_game_history, methods=["GET"]
+            "/engine/queue",
+            "get_computer_move_stats",
+            self.authenticator.require_auth(self._get_computer_move_stats_impl),
+            methods=["GET"],
+        )
+        self.blueprint.add_url_rule(
+            "/cache/stats",
+            "get_cache_stats",
+            self.authenticator.require_auth(self._get_cache_stats_impl),
+            methods=["GET"],
         )
         self.blueprint.add_url_rule(
             "/leaderboard",
             "get_leaderboard",
-            self.get_leaderboard,
+            self.authenticator.require_auth(self._get_leaderboard_impl),
             methods=["GET"],
         )
 
-    def create_game(self):
-        return self.authenticator.require_auth(self._create_game_impl)()
+    def _game_response(self, game, status: int = 200):
+        return jsonify(asdict(self.mapper.to_game_info_dto(game))), status
 
     def _create_game_impl(self):
         try:
-            player_id = request.user_id
-            data = request.get_json()
-
-            if not data or "game_type" not in data:
-                return jsonify({"error": "game_type is required"}), 400
-
-            game_type_str = data["game_type"].lower()
-            if game_type_str not in ["pvp", "pvc"]:
-                return jsonify({"error": 'game_type must be "pvp" or "pvc"'}), 400
-
-            game_type = GameType.PVP if game_type_str == "pvp" else GameType.PVC
-
-            game = self.game_service.create_game(player_id, game_type)
-
-            game_dto = self.mapper.to_game_info_dto(game)
+            game_type, board_size, win_length, difficulty = parse_create_game(
+                request.get_json()
+            )
 
-            return (
-                jsonify(
-                    {
-                        "game_id": game_dto.game_id,
-                        "board": game_dto.board,
-                        "game_type": game_dto.game_type,
-                        "game_state": game_dto.game_state,
-                        "player1_id": game_dto.player1_id,
-                        "player2_id": game_dto.player2_id,
-                        "player1_symbol": game_dto.player1_symbol,
-                        "player2_symbol": game_dto.player2_symbol,
-                        "current_player_id": game_dto.current_player_id,
-                        "winner_id": game_dto.winner_id,
-                    }
-                ),
-                201,
+            game = self.game_service.create_game(
+                request.user_id, game_type, board_size, win_length, difficulty
             )
+            return self._game_response(game, 201)
 
+        except ValueError as e:
+            return jsonify({"error": str(e)}), 400
         except Exception as e:
             return jsonify({"error": str(e)}), 500
 
-    def get_available_games(self):
-        return self.authenticator.require_auth(self._get_available_games_impl)()
-
-    def _get_available_games_impl(self):
+    def _quickmatch_impl(self):
         try:
-            games = self.game_service.get_available_games()
-            games_list = self.mapper.to_available_games_list(games)
+            board_size, win_length = parse_board(request.get_json(silent=True) or {})
+
+            game = self.game_service.quickmatch(request.user_id, board_size, win_length)
 
-            return jsonify({"games": games_list}), 200
+            # 200 - соперник найден, 202 - игрок ждёт соперника в своей партии
+            status = 202 if game.game_state == GameState.WAITING_FOR_PLAYER else 200
+            return self._game_response(game, status)
 
+        except ValueError as e:
+            return jsonify({"error": str(e)}), 400
         except Exception as e:
             return jsonify({"error": str(e)}), 500
 
-    def join_game(self, game_id: str):
-        return self.authenticator.require_auth(self._join_game_impl)(game_id)
-
-    def _join_game_impl(self, game_id: str):
+    def _get_available_games_impl(self):
         try:
-            player_id = request.user_id
-
-            try:
-                game_uuid = UUID(game_id)
-            except ValueError:
-                return jsonify({"error": "Invalid game_id format"}), 400
+            limit = check_limit(request.args.get("limit", default=20, type=int))
+            game_type = parse_lobby_game_type(request.args.get("game_type"))
 
-            game = self.game_service.join_game(game_uuid, player_id)
+            after = None
+            if request.args.get("after"):
+                after = self.mapper.from_cursor(request.args["after"])
 
-            game_dto = self.mapper.to_game_info_dto(game)
+            games = self.game_service.get_available_games(limit, after, game_type)
+            games_list = self.mapper.to_available_games_list(games)
 
             return (
                 jsonify(
                     {
-                        "game_id": game_dto.game_id,
-                        "board": game_dto.board,
-                        "game_type": game_dto.game_type,
-                        "game_state": game_dto.game_state,
-                        "player1_id": game_dto.player1_id,
-                        "player2_id": game_dto.player2_id,
-                        "player1_symbol": game_dto.player1_symbol,
-                        "player2_symbol": game_dto.player2_symbol,
-                        "current_player_id": game_dto.current_player_id,
-                        "winner_id": game_dto.winner_id,
+                        "games": games_list,
+                        "next_cursor": self.mapper.to_cursor(games, limit),
                     }
                 ),
                 200,
@@ -141,122 +179,164 @@ class GameController:
         except Exception as e:
             return jsonify({"error": str(e)}), 500
 
-    def make_move(self, game_id: str):
-        return self.authenticator.require_auth(self._make_move_impl)(game_id)
-
-    def _make_move_impl(self, game_id: str):
+    def _analyze_positions_impl(self):
         try:
-            player_id = request.user_id
             data = request.get_json()
 
-            if not data or "board" not in data:
-                return jsonify({"error": "board is required"}), 400
+            if not data or "boards" not in data:
+                return jsonify({"error": "boards is required"}), 400
 
-            board = data["board"]
+            if not isinstance(data["boards"], list):
+                return jsonify({"error": "boards must be an array"}), 400
 
-            if not isinstance(board, list) or len(board) != 3:
-                return jsonify({"error": "board must be a 3x3 array"}), 400
+            analysis = self.game_service.analyze_positions(data["boards"])
 
-            for row in board:
-                if not isinstance(row, list) or len(row) != 3:
-                    return jsonify({"error": "board must be a 3x3 array"}), 400
+            return jsonify({"results": self.mapper.to_analysis_list(analysis)}), 200
 
-            try:
-                game_uuid = UUID(game_id)
-            except ValueError:
-                return jsonify({"error": "Invalid game_id format"}), 400
+        except ValueError as e:
+            return jsonify({"error": str(e)}), 400
+        except Exception as e:
+            return jsonify({"error": str(e)}), 500
 
-            game = self.game_service.make_move(game_uuid, player_id, board)
+    def _join_game_impl(self, game_id: str):
+        try:
+            game = self.game_service.join_game(parse_game_id(game_id), request.user_id)
+            return self._game_response(game)
 
-            game_dto = self.mapper.to_game_info_dto(game)
+        except GameConflictError as e:
+            return jsonify({"error": str(e)}), 409
+        except ValueError as e:
+            return jsonify({"error": str(e)}), 400
+        except Exception as e:
+            return jsonify({"error": str(e)}), 500
 
-            return (
-                jsonify(
-                    {
-                        "game_id": game_dto.game_id,
-                        "board": game_dto.board,
-                        "game_type": game_dto.game_type,
-                        "game_state": game_dto.game_state,
-                        "player1_id": game_dto.player1_id,
-                        "player2_id": game_dto.player2_id,
-                        "player1_symbol": game_dto.player1_symbol,
-                        "player2_symbol": game_dto.player2_symbol,
-                        "current_player_id": game_dto.current_player_id,
-                        "winner_id": game_dto.winner_id,
-                    }
-                ),
-                200,
+    def _make_move_impl(self, game_id: str):
+        try:
+            move, async_reply = parse_move(request.get_json())
+
+            game = self.game_service.make_move(
+                parse_game_id(game_id), request.user_id, move, async_reply
             )
+            return self._game_response(game)
 
+        except GameConflictError as e:
+            return jsonify({"error": str(e)}), 409
         except ValueError as e:
             return jsonify({"error": str(e)}), 400
         except Exception as e:
             return jsonify({"error": str(e)}), 500
 
-    def get_game(self, game_id: str):
-        return self.authenticator.require_auth(self._get_game_impl)(game_id)
-
     def _get_game_impl(self, game_id: str):
         try:
-            try:
-                game_uuid = UUID(game_id)
-            except ValueError:
-                return jsonify({"error": "Invalid game_id format"}), 400
-
-            game = self.game_service.get_game(game_uuid)
+            game_uuid = parse_game_id(game_id)
+
+            wait_for_version = request.args.get("wait_for_version", type=int)
+            if wait_for_version is not None:
+                timeout = request.args.get(
+                    "timeout", default=self.LONG_POLL_TIMEOUT, type=float
+                )
+                timeout = min(max(timeout, 0.0), self.MAX_LONG_POLL_TIMEOUT)
+                game = self.game_service.wait_for_version(
+                    game_uuid, wait_for_version, timeout
+                )
+            else:
+                # Версия берётся из памяти или одной колонкой из БД, DTO не строится
+                if_none_match = request.headers.get("If-None-Match")
+                if if_none_match:
+                    version = self.game_service.get_game_version(game_uuid)
+                    if version is not None and etag_matches(if_none_match, version):
+                        response = Response(status=304)
+                        response.headers["ETag"] = etag(version)
+                        return response
+                game = self.game_service.get_game(game_uuid)
 
             if not game:
                 return jsonify({"error": "Game not found"}), 404
 
-            game_dto = self.mapper.to_game_info_dto(game)
+            response, status = self._game_response(game)
+            response.headers["ETag"] = etag(game.version)
+            return response, status
 
-            return (
-                jsonify(
-                    {
-                        "game_id": game_dto.game_id,
-                        "board": game_dto.board,
-                        "game_type": game_dto.game_type,
-                        "game_state": game_dto.game_state,
-                        "player1_id": game_dto.player1_id,
-                        "player2_id": game_dto.player2_id,
-                        "player1_symbol": game_dto.player1_symbol,
-                        "player2_symbol": game_dto.player2_symbol,
-                        "current_player_id": game_dto.current_player_id,
-                        "winner_id": game_dto.winner_id,
-                    }
-                ),
-                200,
+        except ValueError as e:
+            return jsonify({"error": str(e)}), 400
+        except Exception as e:
+            return jsonify({"error": str(e)}), 500
+
+    def _get_game_events_impl(self, game_id: str):
+        try:
+            game_uuid = parse_game_id(game_id)
+
+            # Подписка до чтения игры, чтобы не пропустить ход между ними
+            updates = queue.Queue()
+            self.game_service.subscribe(game_uuid, updates.put)
+
+            try:
+                game = self.game_service.get_game(game_uuid)
+            except Exception:
+                self.game_service.unsubscribe(game_uuid, updates.put)
+                raise
+
+            if not game:
+                self.game_service.unsubscribe(game_uuid, updates.put)
+                return jsonify({"error": "Game not found"}), 404
+
+            return Response(
+                self._stream_game_events(game_uuid, game, updates),
+                mimetype="text/event-stream",
+                headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
             )
 
+        except ValueError as e:
+            return jsonify({"error": str(e)}), 400
         except Exception as e:
             return jsonify({"error": str(e)}), 500
 
-    def get_game_history(self):
-        return self.authenticator.require_auth(self._get_game_history_impl)()
+    def _stream_game_events(self, game_uuid: UUID, game, updates: queue.Queue):
+        try:
+            yield self.mapper.to_sse_event(game)
+            while not game.is_game_over():
+                try:
+                    game = updates.get(timeout=self.SSE_KEEPALIVE)
+                except queue.Empty:
+                    if game.game_state == GameState.COMPUTER_THINKING:
+                        # Фоновый ход мог пропасть: без этого поток ждал бы вечно
+                        self.game_service.recover_computer_move(game_uuid)
+                    yield ": keepalive\n\n"
+                    continue
+                yield self.mapper.to_sse_event(game)
+        finally:
+            self.game_service.unsubscribe(game_uuid, updates.put)
 
     def _get_game_history_impl(self):
         try:
             user_id = request.user_id
+            limit = check_limit(request.args.get("limit", default=20, type=int))
+
+            after = None
+            if request.args.get("after"):
+                after = self.mapper.from_cursor(request.args["after"])
 
-            games = self.game_service.get_completed_games_by_user(user_id)
+            games = self.game_service.get_completed_games_by_user(user_id, limit, after)
             games_list = self.mapper.to_game_history_list(games)
 
-            return jsonify({"games": games_list}), 200
+            return (
+                jsonify(
+                    {
+                        "games": games_list,
+                        "next_cursor": self.mapper.to_cursor(games, limit),
+                    }
+                ),
+                200,
+            )
 
+        except ValueError as e:
+            return jsonify({"error": str(e)}), 400
         except Exception as e:
             return jsonify({"error": str(e)}), 500
 
-    def get_leaderboard(self):
-        return self.authenticator.require_auth(self._get_leaderboard_impl)()
-
     def _get_leaderboard_impl(self):
         try:
-            limit = request.args.get("limit", default=10, type=int)
-
-            if limit < 1:
-                return jsonify({"error": "limit must be greater than 0"}), 400
-            if limit > 100:
-                return jsonify({"error": "limit must not exceed 100"}), 400
+            limit = check_limit(request.args.get("limit", default=10, type=int))
 
             leaders = self.game_service.get_leaderboard(limit)
             leaders_list = self.leaderboard_mapper.to_dto_list(leaders)
@@ -267,3 +347,34 @@ class GameController:
             return jsonify({"error": str(e)}), 400
         except Exception as e:
             return jsonify({"error": str(e)}), 500
+
+    def _get_engine_stats_impl(self):
+        try:
+            return jsonify({"engines": self.game_service.get_engine_stats()}), 200
+
+        except Exception as e:
+            return jsonify({"error": str(e)}), 500
+
+    def _get_computer_move_stats_impl(self):
+        try:
+            stats = self.game_service.get_computer_move_stats()
+
+            if stats is None:
+                return jsonify({"error": "Async computer moves are disabled"}), 404
+
+            return jsonify(stats), 200
+
+        except Exception as e:
+            return jsonify({"error": str(e)}), 500
+
+    def _get_cache_stats_impl(self):
+        try:
+            stats = self.game_service.get_cache_stats()
+
+            if stats is None:
+                return jsonify({"error": "Game cache is disabled"}), 404
+
+            return jsonify(stats), 200
+
+        except Exception as e:
+            return jsonify({"error": str(e)}), 500
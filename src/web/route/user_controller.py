@@ -1,6 +1,7 @@
 from flask import Blueprint, request, jsonify
 from domain.service.user_service import UserService
 from web.mapper.auth_mapper import AuthMapper
+from web.mapper.user_stats_mapper import UserStatsMapper
 from web.module.user_authenticator import UserAuthenticator
 
 
@@ -9,20 +10,23 @@ class UserController:
         self.user_service = user_service
         self.authenticator = authenticator
         self.auth_mapper = AuthMapper()
+        self.stats_mapper = UserStatsMapper()
         self.blueprint = Blueprint("user", __name__, url_prefix="/user")
         self._register_routes()
 
     def _register_routes(self):
         self.blueprint.add_url_rule(
-            "/<user_id>", "get_user_info", self.get_user_info, methods=["GET"]
+            "/<user_id>",
+            "get_user_info",
+            self.authenticator.require_auth(self._get_user_info_impl),
+            methods=["GET"],
+        )
+        self.blueprint.add_url_rule(
+            "/<user_id>/stats",
+            "get_user_stats",
+            self.authenticator.require_auth(self._get_user_stats_impl),
+            methods=["GET"],
         )
-
-    @property
-    def _require_auth(self):
-        return self.authenticator.require_auth
-
-    def get_user_info(self, user_id: str):
-        return self._require_auth(self._get_user_info_impl)(user_id)
 
     def _get_user_info_impl(self, user_id: str):
         try:
@@ -49,3 +53,36 @@ class UserController:
 
         except Exception as e:
             return jsonify({"error": f"Error: {str(e)}"}), 500
+
+    def _get_user_stats_impl(self, user_id: str):
+        try:
+            from uuid import UUID
+
+            try:
+                uuid_obj = UUID(user_id)
+            except ValueError:
+                return jsonify({"error": "Invalid user_id format"}), 400
+
+            stats = self.user_service.get_stats(uuid_obj)
+
+            if not stats:
+                return jsonify({"error": "User not found"}), 404
+
+            stats_dto = self.stats_mapper.to_dto(stats)
+
+            return (
+                jsonify(
+                    {
+                        "user_id": stats_dto.user_id,
+                        "wins": stats_dto.wins,
+                        "losses": stats_dto.losses,
+                        "draws": stats_dto.draws,
+                        "total": stats_dto.total,
+                        "win_ratio": stats_dto.win_ratio,
+                    }
+                ),
+                200,
+            )
+
+        except Exception as e:
+            return jsonify({"error": f"Error: {str(e)}"}), 500
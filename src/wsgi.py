@@ -0,0 +1,7 @@
+from di.container import Container
+from web.module.app import create_app
+
+# Точка входа для WSGI-сервера: приложение собирается один раз в мастер-процессе
+# (preload_app) и наследуется воркерами после fork
+container = Container()
+app = create_app(container)
@@ -0,0 +1,158 @@
+import os
+import sys
+import tempfile
+
+import pytest
+
+# Тесты работают на отдельной базе SQLite, создаваемой на каждый запуск
+os.environ["DATABASE_URL"] = (
+    f"sqlite:///{tempfile.mkdtemp(prefix='ttt-tests-')}/test.db"
+)
+os.environ["ASYNC_DATABASE_URL"] = os.environ["DATABASE_URL"].replace(
+    "sqlite://", "sqlite+aiosqlite://"
+)
+os.environ.setdefault("PASSWORD_HASH_COST", "4")
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+
+from sqlalchemy.dialects.postgresql import UUID as PG_UUID  # noqa: E402
+from sqlalchemy.ext.compiler import compiles  # noqa: E402
+
+
+@compiles(PG_UUID, "sqlite")
+def _uuid_sqlite(type_, compiler, **kw):
+    return "CHAR(32)"
+
+
+def pytest_addoption(parser):
+    parser.addoption(
+        "--run-slow", action="store_true", help="run long load and memory tests"
+    )
+
+
+def pytest_configure(config):
+    config.addinivalue_line("markers", "slow: long load and memory tests")
+
+
+def pytest_collection_modifyitems(config, items):
+    if config.getoption("--run-slow"):
+        return
+    skip = pytest.mark.skip(reason="needs --run-slow")
+    for item in items:
+        if "slow" in item.keywords:
+            item.add_marker(skip)
+
+
+@pytest.fixture(scope="session")
+def db():
+    from datasource.database import init_db
+
+    init_db()
+
+
+@pytest.fixture(autouse=True)
+def clean_db(request):
+    # Каждый тест видит только свои данные: после теста, работавшего с БД,
+    # все строки удаляются. Кэши контейнера ссылаются на удалённые партии
+    # только по их уникальным id и чужим тестам не мешают
+    yield
+    if "db" not in request.fixturenames:
+        return
+    from datasource.database import Base, engine
+
+    with engine.begin() as connection:
+        for table in reversed(Base.metadata.sorted_tables):
+            connection.execute(table.delete())
+
+
+@pytest.fixture
+def session(db):
+    from datasource.database import db_session
+
+    yield db_session
+    db_session.remove()
+
+
+@pytest.fixture
+def statements(db):
+    # Запросы к БД, выполненные внутри теста
+    from sqlalchemy import event
+    from datasource.database import engine
+
+    executed = []
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        executed.append(statement)
+
+    event.listen(engine, "before_cursor_execute", record)
+    yield executed
+    event.remove(engine, "before_cursor_execute", record)
+
+
+@pytest.fixture(scope="session")
+def container(db):
+    from di.container import Container
+
+    container = Container()
+    yield container
+    container.close()
+
+
+@pytest.fixture(scope="session")
+def app(container):
+    from web.module.app import create_app
+
+    return create_app(container)
+
+
+@pytest.fixture
+def client(app):
+    return app.test_client()
+
+
+@pytest.fixture
+def register(client, container):
+    # Новый пользователь: (user_id, заголовок авторизации)
+    from uuid import uuid4
+
+    def register():
+        login = f"user-{uuid4().hex[:12]}"
+        client.post("/auth/register", json={"login": login, "password": "secret"})
+        response = client.post(
+            "/auth/login", json={"login": login, "password": "secret"}
+        )
+        user = container.user_service.find_by_login(login)
+        token = response.get_json()["access_token"]
+        return user.user_id, {"Authorization": f"Bearer {token}"}
+
+    return register
+
+
+@pytest.fixture(scope="session")
+def asgi_app(container):
+    from web.module.asgi_app import create_asgi_app
+
+    return create_asgi_app(container)
+
+
+@pytest.fixture
+def run_asgi(asgi_app):
+    # Запускает сценарий с httpx-клиентом ASGI-приложения в отдельном цикле
+    # событий; соединения пула привязаны к циклу и закрываются вместе с ним
+    import asyncio
+    import httpx
+    from datasource.async_database import async_engine
+
+    def run(scenario):
+        async def main():
+            transport = httpx.ASGITransport(app=asgi_app)
+            try:
+                async with httpx.AsyncClient(
+                    transport=transport, base_url="http://test"
+                ) as client:
+                    return await scenario(client)
+            finally:
+                await async_engine.dispose()
+
+        return asyncio.run(main())
+
+    return run
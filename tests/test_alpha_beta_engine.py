@@ -0,0 +1,86 @@
+import time
+
+import pytest
+
+from domain.model.game_field import GameField
+from domain.model.player_symbol import PlayerSymbol
+from domain.service.alpha_beta_engine import AlphaBetaEngine
+from domain.service.tablebase import Tablebase
+
+
+def sign(value):
+    return (value > 0) - (value < 0)
+
+
+def reachable(to_move):
+    # Все достижимые незаконченные позиции 3x3, где ходит to_move
+    seen, stack = set(), [(GameField(), PlayerSymbol.X.value)]
+    while stack:
+        field, mover = stack.pop()
+        if (field.x_mask, field.o_mask) in seen:
+            continue
+        seen.add((field.x_mask, field.o_mask))
+        if field.winner() is not None or field.is_full():
+            continue
+        if mover == to_move:
+            yield field
+        for cell in range(field.cells):
+            if field.empty_mask >> cell & 1:
+                stack.append((field.with_move(cell, mover), 3 - mover))
+
+
+def field_of(size, win_length, xs, os):
+    field = GameField(size=size, win_length=win_length)
+    for cell in xs:
+        field = field.with_move(cell, PlayerSymbol.X.value)
+    for cell in os:
+        field = field.with_move(cell, PlayerSymbol.O.value)
+    return field
+
+
+@pytest.mark.parametrize("symbol", [PlayerSymbol.X, PlayerSymbol.O])
+def test_outcome_matches_tablebase_on_3x3(symbol):
+    tablebase = Tablebase.build()
+    engine = AlphaBetaEngine(time_budget=10.0)
+    checked = 0
+
+    for field in reachable(symbol.value):
+        result = engine.search(field, symbol)
+        _, expected = tablebase.lookup(field, symbol)
+
+        assert field.empty_mask >> result.move & 1, field
+        assert sign(result.score) == sign(expected), field
+        checked += 1
+
+    assert checked == (2423 if symbol == PlayerSymbol.X else 2097)
+
+
+def test_takes_immediate_win_on_5x5():
+    field = field_of(5, 4, xs=[0, 1, 2], os=[10, 12, 24])
+
+    result = AlphaBetaEngine().search(field, PlayerSymbol.X)
+
+    assert result.move == 3
+    assert result.score > 0
+
+
+def test_blocks_immediate_loss_on_5x5():
+    field = field_of(5, 4, xs=[0, 1, 2], os=[10, 12])
+
+    result = AlphaBetaEngine().search(field, PlayerSymbol.O)
+
+    assert result.move == 3
+
+
+def test_returns_legal_move_within_budget_on_empty_7x7():
+    engine = AlphaBetaEngine(time_budget=0.3)
+    field = GameField(size=7, win_length=5)
+
+    started = time.perf_counter()
+    result = engine.search(field, PlayerSymbol.X)
+    elapsed = time.perf_counter() - started
+
+    assert 0 <= result.move < field.cells
+    assert result.depth >= 1
+    # Запас на завершение текущего узла после дедлайна
+    assert elapsed < engine.time_budget + 0.2
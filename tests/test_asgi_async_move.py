@@ -0,0 +1,49 @@
+import asyncio
+
+
+def test_async_move_returns_computer_thinking_under_asgi(run_asgi, register):
+    # register создаёт пользователя через Flask-приложение, ASGI видит ту же БД
+    _, headers = register()
+
+    async def scenario(client):
+        response = await client.post(
+            "/game/create", json={"game_type": "pvc"}, headers=headers
+        )
+        game_id = response.json()["game_id"]
+
+        response = await client.post(
+            f"/game/{game_id}/move", json={"cell": 4, "async": True}, headers=headers
+        )
+        thinking = response.json()
+
+        # Ответ компьютера записывает фоновый пул, клиент забирает его чтением
+        for _ in range(100):
+            game = (await client.get(f"/game/{game_id}", headers=headers)).json()
+            if game["game_state"] != "computer_thinking":
+                break
+            await asyncio.sleep(0.05)
+        return response.status_code, thinking, game
+
+    status, thinking, game = run_asgi(scenario)
+
+    assert status == 200
+    assert thinking["game_state"] == "computer_thinking"
+    assert thinking["current_player_id"] is None
+    assert game["game_state"] == "player_turn"
+    assert sum(cell == 2 for row in game["board"] for cell in row) == 1
+
+
+def test_async_flag_must_be_boolean_under_asgi(run_asgi, register):
+    _, headers = register()
+
+    async def scenario(client):
+        response = await client.post(
+            "/game/create", json={"game_type": "pvc"}, headers=headers
+        )
+        return await client.post(
+            f"/game/{response.json()['game_id']}/move",
+            json={"cell": 4, "async": "yes"},
+            headers=headers,
+        )
+
+    assert run_asgi(scenario).status_code == 400
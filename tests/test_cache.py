@@ -0,0 +1,114 @@
+from uuid import uuid4
+
+import pytest
+
+from datasource.repository.game_repository import GameRepository
+from domain.model.game_type import GameType
+from domain.model.move import Move
+from domain.model.users import User
+from domain.service.alpha_beta_engine import AlphaBetaEngine
+from domain.service.game_cache import GameCache
+from domain.service.game_rules import GameRules
+from domain.service.game_service_impl import GameServiceImpl
+from domain.service.memory_cache_backend import MemoryCacheBackend
+from domain.service.user_cache import UserCache, pack_user
+
+
+class SharedBackend(MemoryCacheBackend):
+    # Общий для узлов кэш (как Redis), в памяти теста
+    remote = True
+
+
+def test_user_cache_keeps_credentials_out():
+    cache = UserCache(SharedBackend())
+    user = User(uuid4(), "alice", "scrypt$16384$8$1$c2FsdA$a2V5")
+
+    cache.put(user)
+    cached = cache.get(user.user_id)
+
+    assert b"scrypt" not in pack_user(user)
+    assert (cached.user_id, cached.login, cached.password) == (
+        user.user_id,
+        "alice",
+        None,
+    )
+
+
+def test_pending_write_rejects_late_old_version():
+    cache = GameCache(SharedBackend())
+    game = GameRules([]).new_game(uuid4(), GameType.PVP)
+    cache.put(game)
+    old = cache.get(game.game_id)
+
+    game.version += 1
+    cache.pending(game)
+    cache.put(old)
+
+    assert cache.get(game.game_id) is None
+    cache.put(game)
+    assert cache.get(game.game_id).version == game.version
+
+
+def test_move_is_not_served_stale_after_crash_between_commit_and_cache_write(
+    session, monkeypatch
+):
+    backend = SharedBackend()
+
+    def node():
+        return GameServiceImpl(
+            GameRepository(session),
+            engines=[AlphaBetaEngine()],
+            cache=GameCache(backend),
+        )
+
+    first_node, second_node = node(), node()
+    first, second = uuid4(), uuid4()
+    game = first_node.create_game(first, GameType.PVP)
+    first_node.join_game(game.game_id, second)
+    assert second_node.get_game(game.game_id).version == 2
+
+    def crash(game):
+        raise SystemExit("process died after commit")
+
+    monkeypatch.setattr(first_node, "_saved", crash)
+    with pytest.raises(SystemExit):
+        first_node.make_move(game.game_id, first, Move(cell=0))
+
+    game = second_node.get_game(game.game_id)
+    assert game.version == 3
+    assert game.game_field.x_mask == 1
+    assert second_node.get_game(game.game_id).version == 3
+
+
+def test_move_on_stale_cached_game_rereads_database(session, statements):
+    # Кэш воркера не знает о ходе, записанном другим воркером
+    cached = GameServiceImpl(
+        GameRepository(session), cache=GameCache(MemoryCacheBackend())
+    )
+    other = GameServiceImpl(GameRepository(session))
+    first, second = uuid4(), uuid4()
+    game = cached.create_game(first, GameType.PVP)
+    cached.join_game(game.game_id, second)
+    other.make_move(game.game_id, first, Move(cell=0))
+    assert cached.get_game(game.game_id).current_player_id == first
+
+    game = cached.make_move(game.game_id, second, Move(cell=4))
+
+    assert game.version == 4
+    assert (game.game_field.x_mask, game.game_field.o_mask) == (1, 1 << 4)
+    assert cached.get_game(game.game_id).version == 4
+
+
+def test_invalid_move_fails_after_one_reread(session, statements):
+    cached = GameServiceImpl(
+        GameRepository(session), cache=GameCache(MemoryCacheBackend())
+    )
+    first, second = uuid4(), uuid4()
+    game = cached.create_game(first, GameType.PVP)
+    cached.join_game(game.game_id, second)
+    statements.clear()
+
+    with pytest.raises(ValueError, match="Not your turn"):
+        cached.make_move(game.game_id, second, Move(cell=4))
+
+    assert [statement.split()[0].upper() for statement in statements] == ["SELECT"]
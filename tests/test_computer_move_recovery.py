@@ -0,0 +1,187 @@
+from datetime import datetime, timedelta
+from uuid import uuid4
+
+from flask import Flask
+
+from datasource.database import get_db_session
+from datasource.mapper.game_mapper import GameMapper
+from datasource.repository.game_repository import GameRepository
+from domain.model.game_state import GameState
+from domain.model.game_type import GameType
+from domain.model.move import Move
+from domain.service.alpha_beta_engine import AlphaBetaEngine
+from domain.service.computer_move_worker import ComputerMoveWorker
+from domain.service.game_cache import GameCache
+from domain.service.game_event_bus import GameEventBus, decode_game, encode_game
+from domain.service.game_service_impl import GameServiceImpl
+from domain.service.memory_cache_backend import MemoryCacheBackend
+from domain.service.search_engine_interface import SearchEngineInterface
+from web.module.etag import etag
+from web.route.game_controller import GameController
+
+
+class FailingEngine(SearchEngineInterface):
+    def supports(self, game_field):
+        return True
+
+    def search(self, game_field, symbol):
+        raise RuntimeError("search crashed")
+
+    def get_stats(self):
+        return {}
+
+
+class OpenAuthenticator:
+    def require_auth(self, view, allow_query_token=False):
+        return view
+
+
+def make_service(session, engines, worker=None, cache=None, event_bus=None):
+    return GameServiceImpl(
+        GameRepository(session),
+        engines=engines,
+        computer_move_worker=worker,
+        repository_factory=lambda: GameRepository(get_db_session()),
+        event_bus=event_bus,
+        cache=cache,
+    )
+
+
+def make_client(service, keepalive=GameController.SSE_KEEPALIVE):
+    controller = GameController(service, OpenAuthenticator())
+    controller.SSE_KEEPALIVE = keepalive
+    app = Flask(__name__)
+    app.register_blueprint(controller.blueprint)
+    return app.test_client()
+
+
+def stuck_game(session, service):
+    player_id = uuid4()
+    game = service.create_game(player_id, GameType.PVC)
+    game = service.make_move(game.game_id, player_id, Move(cell=4))
+    mark_thinking(session, game, datetime.utcnow() - timedelta(minutes=5))
+    return player_id, game
+
+
+def play_async(session, engines):
+    worker = ComputerMoveWorker(workers=1)
+    service = make_service(session, engines, worker)
+    player_id = uuid4()
+    game = service.create_game(player_id, GameType.PVC)
+
+    game = service.make_move(game.game_id, player_id, Move(cell=4), async_reply=True)
+    assert game.game_state == GameState.COMPUTER_THINKING
+    worker.shutdown()
+    session.remove()
+    assert worker.get_stats()["failed"] == 0
+    return player_id, service.get_game(game.game_id)
+
+
+def mark_thinking(session, game, since):
+    game.game_state = GameState.COMPUTER_THINKING
+    game.current_player_id = None
+    game.version += 1
+    game.updated_at = since
+    assert GameRepository(session).update_game(
+        GameMapper.to_entity(game), game.version - 1
+    )
+
+
+def test_failed_background_search_falls_back_to_next_engine(session):
+    player_id, game = play_async(session, [FailingEngine(), AlphaBetaEngine()])
+
+    # Ответ компьютера на доске: ходы по-прежнему чередуются
+    assert game.game_state == GameState.PLAYER_TURN
+    assert game.current_player_id == player_id
+    assert bin(game.game_field.x_mask).count("1") == 1
+    assert bin(game.game_field.o_mask).count("1") == 1
+
+
+def test_search_failing_in_every_engine_aborts_game(session):
+    player_id, game = play_async(session, [FailingEngine()])
+
+    assert game.game_state == GameState.ABORTED
+    assert game.current_player_id is None
+    assert game.game_field.o_mask == 0
+
+
+def test_overdue_computer_move_is_computed_on_read(session):
+    service = make_service(session, [AlphaBetaEngine()])
+    player_id, game = stuck_game(session, service)
+
+    game = service.get_game(game.game_id)
+    assert game.game_state == GameState.PLAYER_TURN
+    assert game.current_player_id == player_id
+    assert bin(game.game_field.o_mask).count("1") == 2
+
+    free = next(
+        cell for cell in range(9) if not game.game_field.occupied_mask >> cell & 1
+    )
+    game = service.make_move(game.game_id, player_id, Move(cell=free))
+    assert game.game_field.x_mask >> free & 1
+
+
+def test_recent_computer_move_is_left_to_background_worker(session):
+    service = make_service(session, [AlphaBetaEngine()])
+    player_id = uuid4()
+    game = service.create_game(player_id, GameType.PVC)
+    mark_thinking(session, game, datetime.utcnow())
+
+    game = service.get_game(game.game_id)
+    assert game.game_state == GameState.COMPUTER_THINKING
+
+
+def test_async_move_from_other_worker_is_not_recovered(session):
+    service = make_service(session, [AlphaBetaEngine()])
+    player_id = uuid4()
+    game = service.create_game(player_id, GameType.PVC)
+    # Партия начата давно, ход игрока сделан только что
+    game.created_at = datetime.utcnow() - timedelta(minutes=5)
+    mark_thinking(session, game, datetime.utcnow())
+
+    # Кэш другого воркера получает партию из события о ходе
+    cache = GameCache(MemoryCacheBackend())
+    cache.put(decode_game(encode_game(game)))
+    other = make_service(session, [FailingEngine()], cache=cache)
+
+    game = other.get_game(game.game_id)
+    assert game.game_state == GameState.COMPUTER_THINKING
+    assert game.game_field.o_mask == 0
+
+
+def test_overdue_computer_move_is_computed_on_etag_poll(session):
+    service = make_service(session, [AlphaBetaEngine()], event_bus=GameEventBus())
+    player_id, game = stuck_game(session, service)
+
+    response = make_client(service).get(
+        f"/game/{game.game_id}", headers={"If-None-Match": etag(game.version)}
+    )
+    assert response.status_code == 200
+    assert response.get_json()["game_state"] == GameState.PLAYER_TURN.value
+    assert response.headers["ETag"] == etag(game.version + 1)
+
+
+def test_overdue_computer_move_is_computed_by_event_stream(session):
+    # Ход становится просроченным, когда поток уже открыт
+    service = GameServiceImpl(
+        GameRepository(session),
+        engines=[AlphaBetaEngine()],
+        repository_factory=lambda: GameRepository(get_db_session()),
+        event_bus=GameEventBus(),
+        computer_move_deadline=0.2,
+    )
+    player_id = uuid4()
+    game = service.create_game(player_id, GameType.PVC)
+    mark_thinking(session, game, datetime.utcnow())
+
+    response = make_client(service, keepalive=0.05).get(
+        f"/game/{game.game_id}/events", buffered=False
+    )
+    events = (
+        chunk for chunk in response.iter_encoded() if chunk.startswith(b"id: ")
+    )
+    try:
+        assert next(events).startswith(f"id: {game.version}\n".encode())
+        assert next(events).startswith(f"id: {game.version + 1}\n".encode())
+    finally:
+        response.close()
@@ -0,0 +1,146 @@
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from uuid import uuid4
+
+import pytest
+
+from datasource.repository.game_repository import GameRepository
+from domain.model.game_field import GameField
+from domain.model.game_state import GameState
+from domain.model.game_type import GameType
+from domain.model.move import Move
+from domain.service.game_cache import GameCache
+from domain.service.game_conflict_error import GameConflictError
+from domain.service.game_service_impl import GameServiceImpl
+from domain.service.memory_cache_backend import MemoryCacheBackend
+
+THREADS = 32
+# Во сколько раз одновременные запросы к одной партии могут выполняться
+# дольше тех же запросов по очереди: соперничество за строку не должно
+# превращаться в лавину повторов
+MAX_SLOWDOWN = 4
+
+
+def make_service(session, cached):
+    return GameServiceImpl(
+        GameRepository(session),
+        cache=GameCache(MemoryCacheBackend()) if cached else None,
+    )
+
+
+def hammer(session, task, threads=THREADS, concurrent=True):
+    # Все потоки стартуют одновременно, у каждого своя сессия. Без concurrent
+    # те же задачи выполняются по очереди в текущем потоке - для сравнения
+    barrier = threading.Barrier(threads) if concurrent else None
+
+    def run(thread):
+        if barrier:
+            barrier.wait()
+        try:
+            return task(thread)
+        finally:
+            session.remove()
+
+    started = time.perf_counter()
+    if concurrent:
+        with ThreadPoolExecutor(max_workers=threads) as executor:
+            results = list(executor.map(run, range(threads)))
+    else:
+        results = [run(thread) for thread in range(threads)]
+    return results, time.perf_counter() - started
+
+
+def play_randomly(session, service, concurrent):
+    first, second = uuid4(), uuid4()
+    game = service.create_game(first, GameType.PVP, 7, 7)
+    game = service.join_game(game.game_id, second)
+    session.remove()
+
+    accepted = []
+    conflicts = []
+    lock = threading.Lock()
+
+    def play(thread):
+        # Оба игрока ходят из половины потоков в случайные клетки
+        player = (first, second)[thread % 2]
+        rng = random.Random(thread)
+        for _ in range(50):
+            try:
+                service.make_move(game.game_id, player, Move(cell=rng.randrange(49)))
+            except GameConflictError:
+                # Запись не удалась за все попытки: клиент получил бы 409
+                with lock:
+                    conflicts.append(player)
+                continue
+            except ValueError:
+                # Не его ход или клетка занята
+                continue
+            with lock:
+                accepted.append(player)
+
+    _, elapsed = hammer(session, play, concurrent=concurrent)
+    return game, first, accepted, len(conflicts), elapsed
+
+
+@pytest.mark.parametrize("cached", [False, True])
+def test_concurrent_moves_lose_no_update(session, cached):
+    service = make_service(session, cached)
+    *_, serial_elapsed = play_randomly(session, service, concurrent=False)
+
+    game, first, accepted, conflicts, elapsed = play_randomly(
+        session, service, concurrent=True
+    )
+
+    # Состояние из БД, а не из кэша сервиса
+    final = make_service(session, cached=False).get_game(game.game_id)
+    field = final.game_field
+    moves = bin(field.x_mask).count("1") + bin(field.o_mask).count("1")
+    by_first = accepted.count(first)
+    first_mask = (
+        field.x_mask
+        if final.get_player_symbol(first).value == GameField.PLAYER_X
+        else field.o_mask
+    )
+
+    assert accepted
+    # Каждый принятый ход на доске и в версии, ходы чередуются
+    assert moves == len(accepted)
+    assert bin(first_mask).count("1") == by_first
+    assert by_first - (len(accepted) - by_first) in (0, 1)
+    assert final.version == game.version + len(accepted)
+    if cached:
+        assert service.get_game(game.game_id).version == final.version
+    # Пропускная способность: конфликты решаются повторами, а не ответами 409
+    assert conflicts < len(accepted)
+    assert elapsed < MAX_SLOWDOWN * serial_elapsed
+
+
+def test_concurrent_joins_admit_one_player(session):
+    service = make_service(session, cached=False)
+
+    def join_all(concurrent):
+        game = service.create_game(uuid4(), GameType.PVP)
+        session.remove()
+        joiners = [uuid4() for _ in range(THREADS)]
+
+        def join(thread):
+            try:
+                service.join_game(game.game_id, joiners[thread])
+                return joiners[thread]
+            except ValueError:
+                return None
+
+        results, elapsed = hammer(session, join, concurrent=concurrent)
+        return game, [player for player in results if player], elapsed
+
+    *_, serial_elapsed = join_all(concurrent=False)
+    game, admitted, elapsed = join_all(concurrent=True)
+
+    final = service.get_game(game.game_id)
+    assert len(admitted) == 1
+    assert final.player2_id == admitted[0]
+    assert final.game_state == GameState.PLAYER_TURN
+    assert final.version == game.version + 1
+    assert elapsed < MAX_SLOWDOWN * serial_elapsed
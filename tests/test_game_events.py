@@ -0,0 +1,48 @@
+import json
+
+from web.module.access_log import mask_query_token
+
+
+def events(response):
+    # События потока SSE по одному, без keepalive-комментариев
+    for chunk in response.response:
+        text = chunk.decode() if isinstance(chunk, bytes) else chunk
+        if text.startswith("id:"):
+            fields = dict(line.split(": ", 1) for line in text.strip().split("\n"))
+            yield int(fields["id"]), json.loads(fields["data"])
+
+
+def test_move_is_delivered_to_event_stream(client, register):
+    _, first = register()
+    _, second = register()
+    game_id = client.post(
+        "/game/create", json={"game_type": "pvp"}, headers=first
+    ).get_json()["game_id"]
+    client.post(f"/game/{game_id}/join", headers=second)
+    # EventSource не передаёт заголовки: токен в строке запроса
+    token = second["Authorization"].split()[1]
+
+    response = client.get(
+        f"/game/{game_id}/events",
+        query_string={"access_token": token},
+        buffered=False,
+    )
+    stream = events(response)
+
+    assert response.status_code == 200
+    assert response.mimetype == "text/event-stream"
+    version, game = next(stream)
+    assert game["board"][0][0] == 0
+
+    client.post(f"/game/{game_id}/move", json={"cell": 0}, headers=first)
+    moved_version, game = next(stream)
+
+    assert moved_version == version + 1
+    assert game["board"][0][0] == 1
+    response.close()
+
+
+def test_query_token_is_masked_in_access_log():
+    line = "GET /game/1/events?access_token=abc.def-1&x=2 HTTP/1.1"
+
+    assert mask_query_token(line) == "GET /game/1/events?access_token=***&x=2 HTTP/1.1"
@@ -0,0 +1,38 @@
+import pytest
+
+from domain.model.game_field import GameField
+
+
+@pytest.mark.parametrize("cell", [True, False, 1.0, 2.0, "1", None])
+def test_from_board_accepts_only_int_cells(cell):
+    board = [[0, 0, 0], [0, cell, 0], [0, 0, 0]]
+
+    with pytest.raises(ValueError):
+        GameField.from_board(board)
+
+
+def test_from_board_reads_marks():
+    field = GameField.from_board([[1, 0, 0], [0, 2, 0], [0, 0, 0]])
+
+    assert (field.x_mask, field.o_mask) == (1, 1 << 4)
+
+
+@pytest.mark.parametrize(
+    "params",
+    [
+        {"board_size": True},
+        {"board_size": 5.0},
+        {"board_size": 5, "win_length": True},
+        {"board_size": 5, "win_length": 4.0},
+    ],
+)
+def test_board_parameters_must_be_int(client, register, params):
+    _, headers = register()
+
+    created = client.post(
+        "/game/create", json={"game_type": "pvp", **params}, headers=headers
+    )
+    matched = client.post("/game/quickmatch", json=params, headers=headers)
+
+    assert created.status_code == 400
+    assert matched.status_code == 400
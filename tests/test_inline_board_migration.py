@@ -0,0 +1,121 @@
+import json
+
+from sqlalchemy import create_engine, text
+
+from datasource.migration.inline_board import migrate
+
+
+def old_schema_engine(tmp_path, boards):
+    engine = create_engine(f"sqlite:///{tmp_path}/old.db")
+    with engine.begin() as connection:
+        connection.execute(
+            text("CREATE TABLE game_fields (id INTEGER PRIMARY KEY, board_data TEXT)")
+        )
+        connection.execute(
+            text(
+                "CREATE TABLE current_games (id INTEGER PRIMARY KEY,"
+                " game_field_id INTEGER, win_length INTEGER NOT NULL DEFAULT 3,"
+                " game_state VARCHAR(30) NOT NULL DEFAULT 'player_turn',"
+                " current_player_id CHAR(32) DEFAULT 'p1')"
+            )
+        )
+        for game_id, (board_data, win_length) in enumerate(boards, start=1):
+            connection.execute(
+                text("INSERT INTO game_fields VALUES (:id, :board_data)"),
+                {"id": game_id, "board_data": board_data},
+            )
+            connection.execute(
+                text(
+                    "INSERT INTO current_games (id, game_field_id, win_length)"
+                    " VALUES (:id, :id, :win_length)"
+                ),
+                {"id": game_id, "win_length": win_length},
+            )
+    return engine
+
+
+def quarantine(engine):
+    with engine.connect() as connection:
+        return connection.execute(
+            text(
+                "SELECT game_id, game_field_id, board_data, game_state"
+                " FROM game_fields_quarantine ORDER BY game_id"
+            )
+        ).all()
+
+
+def test_malformed_boards_are_quarantined_and_do_not_abort_migration(tmp_path):
+    engine = old_schema_engine(
+        tmp_path,
+        [
+            (json.dumps([[1, 0, 0], [0, 2, 0], [0, 0, 0]]), 3),
+            ("not json", 3),
+            (json.dumps([[1, 7, 0], [0, 0, 0], [0, 0, 0]]), 3),
+            (None, 3),
+            (json.dumps([[0] * 4] * 4), 5),
+            (json.dumps([[0] * 5] * 5), 4),
+        ],
+    )
+
+    migrated, skipped, missing = migrate(engine)
+
+    assert migrated == 2
+    assert skipped == [2, 3, 4, 5]
+    assert missing == []
+    with engine.connect() as connection:
+        rows = connection.execute(
+            text(
+                "SELECT id, board_size, win_length, x_mask, o_mask,"
+                " game_state, current_player_id"
+                " FROM current_games ORDER BY id"
+            )
+        ).all()
+        tables = connection.execute(
+            text("SELECT name FROM sqlite_master WHERE type = 'table'")
+        ).scalars()
+        assert "game_fields" not in list(tables)
+    assert rows[0] == (1, 3, 3, 1, 1 << 4, "player_turn", "p1")
+    # Испорченные поля не подменяются пустыми: партии прерываются, а исходные
+    # строки и состояние остаются в карантине
+    assert all(row[5:] == ("aborted", None) for row in rows[1:5])
+    assert rows[5] == (6, 5, 4, 0, 0, "player_turn", "p1")
+    assert quarantine(engine) == [
+        (2, 2, "not json", "player_turn"),
+        (3, 3, json.dumps([[1, 7, 0], [0, 0, 0], [0, 0, 0]]), "player_turn"),
+        (4, 4, None, "player_turn"),
+        (5, 5, json.dumps([[0] * 4] * 4), "player_turn"),
+    ]
+    assert migrate(engine) == (0, [], [])
+
+
+def test_games_without_board_row_are_reported(tmp_path):
+    engine = old_schema_engine(
+        tmp_path,
+        [
+            (json.dumps([[1, 0, 0], [0, 2, 0], [0, 0, 0]]), 3),
+            (json.dumps([[0, 1, 0], [0, 0, 0], [0, 0, 0]]), 3),
+        ],
+    )
+    with engine.begin() as connection:
+        connection.execute(text("DELETE FROM game_fields WHERE id = 2"))
+        connection.execute(
+            text(
+                "INSERT INTO current_games (id, game_field_id, game_state)"
+                " VALUES (3, NULL, 'player_won')"
+            )
+        )
+
+    migrated, skipped, missing = migrate(engine)
+
+    assert migrated == 1
+    assert skipped == []
+    assert missing == [2, 3]
+    with engine.connect() as connection:
+        rows = connection.execute(
+            text("SELECT id, x_mask, game_state FROM current_games ORDER BY id")
+        ).all()
+    assert rows == [(1, 1, "player_turn"), (2, 0, "aborted"), (3, 0, "aborted")]
+    assert quarantine(engine) == [
+        (2, 2, None, "player_turn"),
+        (3, None, None, "player_won"),
+    ]
@@ -0,0 +1,72 @@
+from uuid import uuid4
+
+import pytest
+
+from datasource.model.user_entity import UserEntity
+from datasource.model.user_stats_entity import UserStatsEntity
+from datasource.repository.game_repository import GameRepository
+from datasource.repository.user_repository import UserRepository
+from domain.service.game_service_impl import GameServiceImpl
+from domain.service.memory_cache_backend import MemoryCacheBackend
+from domain.service.user_cache import UserCache
+from domain.service.user_service import UserService
+
+LIMITS = [1, 10, 100]
+
+
+@pytest.fixture
+def leaders(db):
+    # Сто игроков в рейтинге
+    from datasource.database import db_session
+
+    user_ids = [uuid4() for _ in range(100)]
+    for place, user_id in enumerate(user_ids):
+        wins = 10_000 + place
+        db_session.add(
+            UserEntity(user_id=user_id, login=f"leader-{place}", password="-")
+        )
+        db_session.add(
+            UserStatsEntity(
+                user_id=user_id, wins=wins, losses=0, draws=0, total=wins, win_ratio=2.0
+            )
+        )
+    db_session.commit()
+    db_session.remove()
+    return user_ids
+
+
+def make_service(session, cached):
+    cache = UserCache(MemoryCacheBackend()) if cached else None
+    return GameServiceImpl(
+        GameRepository(session),
+        user_service=UserService(UserRepository(session), cache),
+    )
+
+
+def count_statements(service, session, statements, limit):
+    session.remove()
+    statements.clear()
+    leaders = service.get_leaderboard(limit)
+    assert len(leaders) == limit
+    assert all(leader.login.startswith("leader-") for leader in leaders)
+    return len(statements)
+
+
+def test_leaderboard_statements_do_not_grow_with_limit(session, statements, leaders):
+    service = make_service(session, cached=False)
+
+    # Таблица лидеров и один запрос IN на всех пользователей
+    assert [
+        count_statements(service, session, statements, limit) for limit in LIMITS
+    ] == [2, 2, 2]
+
+
+def test_cached_leaderboard_reads_only_user_stats(session, statements, leaders):
+    service = make_service(session, cached=True)
+
+    cold = [count_statements(service, session, statements, limit) for limit in LIMITS]
+    warm = [count_statements(service, session, statements, limit) for limit in LIMITS]
+
+    # Дочитываются только пользователи, которых ещё нет в кэше
+    assert cold == [2, 2, 2]
+    assert warm == [1, 1, 1]
@@ -0,0 +1,70 @@
+def lobby_entry(pages, game_id):
+    # Листает лобби до нужной партии
+    for page in pages:
+        for entry in page["games"]:
+            if entry["game_id"] == game_id:
+                return entry
+    return None
+
+
+def test_lobby_shows_board_size_and_win_length(client, register):
+    _, headers = register()
+    game_id = client.post(
+        "/game/create",
+        json={"game_type": "pvp", "board_size": 7, "win_length": 5},
+        headers=headers,
+    ).get_json()["game_id"]
+
+    def pages():
+        cursor = None
+        while True:
+            params = {"limit": 100, "after": cursor} if cursor else {"limit": 100}
+            page = client.get(
+                "/game/available", query_string=params, headers=headers
+            ).get_json()
+            yield page
+            cursor = page["next_cursor"]
+            if not cursor:
+                return
+
+    entry = lobby_entry(pages(), game_id)
+
+    assert entry["board_size"] == 7
+    assert entry["win_length"] == 5
+    assert entry["player2_id"] is None
+
+
+def test_lobby_rejects_pvc_filter(client, register):
+    _, headers = register()
+
+    response = client.get(
+        "/game/available", query_string={"game_type": "pvc"}, headers=headers
+    )
+
+    assert response.status_code == 400
+
+
+def test_asgi_lobby_shows_board_size_and_win_length(run_asgi, register):
+    _, headers = register()
+
+    async def scenario(client):
+        response = await client.post(
+            "/game/create",
+            json={"game_type": "pvp", "board_size": 6, "win_length": 4},
+            headers=headers,
+        )
+        game_id = response.json()["game_id"]
+        pages, cursor = [], None
+        while True:
+            params = {"limit": 100, "after": cursor} if cursor else {"limit": 100}
+            page = (
+                await client.get("/game/available", params=params, headers=headers)
+            ).json()
+            pages.append(page)
+            cursor = page["next_cursor"]
+            if not cursor:
+                return lobby_entry(pages, game_id)
+
+    entry = run_asgi(scenario)
+
+    assert (entry["board_size"], entry["win_length"]) == (6, 4)
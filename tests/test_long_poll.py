@@ -0,0 +1,58 @@
+import threading
+import time
+
+
+def started_game(client, register):
+    # Партия PvP с двумя игроками: (game_id, версия, заголовки первого и второго)
+    _, first = register()
+    _, second = register()
+    game_id = client.post(
+        "/game/create", json={"game_type": "pvp"}, headers=first
+    ).get_json()["game_id"]
+    game = client.post(f"/game/{game_id}/join", headers=second).get_json()
+    return game_id, game["version"], first, second
+
+
+def test_unchanged_game_is_not_modified(client, register):
+    game_id, version, first, _ = started_game(client, register)
+
+    response = client.get(
+        f"/game/{game_id}", headers={**first, "If-None-Match": f'"{version}"'}
+    )
+
+    assert response.status_code == 304
+    assert response.headers["ETag"] == f'"{version}"'
+    assert response.data == b""
+
+    client.post(f"/game/{game_id}/move", json={"cell": 0}, headers=first)
+    response = client.get(
+        f"/game/{game_id}", headers={**first, "If-None-Match": f'"{version}"'}
+    )
+
+    assert response.status_code == 200
+    assert response.headers["ETag"] == f'"{version + 1}"'
+
+
+def test_long_poll_wakes_on_new_version(app, client, register):
+    game_id, version, first, second = started_game(client, register)
+    replies = []
+
+    def poll():
+        started = time.monotonic()
+        response = app.test_client().get(
+            f"/game/{game_id}",
+            query_string={"wait_for_version": version, "timeout": 10},
+            headers=second,
+        )
+        replies.append((response.get_json(), time.monotonic() - started))
+
+    poller = threading.Thread(target=poll)
+    poller.start()
+    time.sleep(0.3)
+    client.post(f"/game/{game_id}/move", json={"cell": 4}, headers=first)
+    poller.join(timeout=10)
+
+    game, elapsed = replies[0]
+    assert game["version"] == version + 1
+    assert game["board"][1][1] == 1
+    assert elapsed < 5
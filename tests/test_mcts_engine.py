@@ -0,0 +1,65 @@
+import pytest
+
+from domain.model.game_field import GameField
+from domain.model.player_symbol import PlayerSymbol
+from domain.service.mcts_engine import MctsEngine, SearchPool, _run_tree
+
+
+def field_of(size, win_length, xs, os):
+    field = GameField(size=size, win_length=win_length)
+    for cell in xs:
+        field = field.with_move(cell, PlayerSymbol.X.value)
+    for cell in os:
+        field = field.with_move(cell, PlayerSymbol.O.value)
+    return field
+
+
+@pytest.fixture(scope="module", params=[1, 2])
+def pool(request):
+    # С двумя процессами деревья строятся в пуле forkserver
+    pool = SearchPool(request.param)
+    yield pool
+    pool.shutdown()
+
+
+def test_returns_legal_move_and_spends_playout_budget(pool):
+    field = field_of(5, 4, xs=[12], os=[6])
+    engine = MctsEngine(pool, playouts=301)
+
+    result = engine.search(field, PlayerSymbol.X)
+
+    assert field.empty_mask >> result.move & 1
+    # Бюджет делится между процессами с округлением вверх
+    per_tree = -(-301 // pool.workers)
+    assert result.nodes == per_tree * pool.workers
+    assert engine.get_stats()["playouts"] == result.nodes
+
+
+def test_takes_win_in_one(pool):
+    field = field_of(5, 4, xs=[0, 1, 2], os=[10, 12, 24])
+
+    result = MctsEngine(pool, playouts=100).search(field, PlayerSymbol.X)
+
+    assert result.move == 3
+
+
+def test_blocks_win_in_one(pool):
+    field = field_of(5, 4, xs=[0, 1, 2], os=[10, 12])
+
+    result = MctsEngine(pool, playouts=100).search(field, PlayerSymbol.O)
+
+    assert result.move == 3
+
+
+def test_tree_visits_only_free_cells():
+    field = field_of(4, 3, xs=[0, 5], os=[1, 10])
+    own, other = field.x_mask, field.o_mask
+
+    visits, wins, done = _run_tree(own, other, 4, 3, 500, None, seed=7)
+
+    assert done == 500
+    assert set(visits) == {
+        cell for cell in range(field.cells) if field.empty_mask >> cell & 1
+    }
+    assert sum(visits.values()) == done
+    assert all(0 <= wins[move] <= visits[move] for move in visits)
@@ -0,0 +1,42 @@
+import resource
+
+import pytest
+
+REQUESTS = 100_000
+WARMUP = 5_000
+# Допустимый рост пикового RSS после прогрева
+MAX_GROWTH_KB = 8 * 1024
+
+
+def peak_rss_kb():
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+
+@pytest.mark.slow
+def test_rss_stays_flat_over_100k_requests(client, register):
+    _, first = register()
+    _, second = register()
+    game_ids = []
+    for _ in range(20):
+        response = client.post("/game/create", json={"game_type": "pvp"}, headers=first)
+        game_id = response.get_json()["game_id"]
+        client.post(f"/game/{game_id}/join", headers=second)
+        game_ids.append(game_id)
+
+    def request(number):
+        game_id = game_ids[number % len(game_ids)]
+        if number % 4 == 0:
+            response = client.get("/game/available?limit=5", headers=first)
+        elif number % 4 == 1:
+            response = client.get("/game/history?limit=5", headers=second)
+        else:
+            response = client.get(f"/game/{game_id}", headers=first)
+        assert response.status_code == 200
+
+    for number in range(WARMUP):
+        request(number)
+    baseline = peak_rss_kb()
+    for number in range(WARMUP, REQUESTS):
+        request(number)
+
+    assert peak_rss_kb() - baseline < MAX_GROWTH_KB
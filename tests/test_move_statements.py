@@ -0,0 +1,72 @@
+from uuid import uuid4
+
+import pytest
+
+from datasource.repository.game_repository import GameRepository
+from domain.model.game_type import GameType
+from domain.model.move import Move
+from domain.service.alpha_beta_engine import AlphaBetaEngine
+from domain.service.game_cache import GameCache
+from domain.service.game_service_impl import GameServiceImpl
+from domain.service.memory_cache_backend import MemoryCacheBackend
+
+
+def make_service(session, cached):
+    return GameServiceImpl(
+        GameRepository(session),
+        engines=[AlphaBetaEngine()],
+        cache=GameCache(MemoryCacheBackend()) if cached else None,
+    )
+
+
+def verbs(statements):
+    return [statement.split()[0].upper() for statement in statements]
+
+
+@pytest.mark.parametrize(
+    "cached, expected", [(False, ["SELECT", "UPDATE"]), (True, ["UPDATE"])]
+)
+def test_pvc_move_with_computer_reply_is_one_update(
+    session, statements, cached, expected
+):
+    service = make_service(session, cached)
+    player_id = uuid4()
+    game = service.create_game(player_id, GameType.PVC)
+    session.remove()
+    statements.clear()
+
+    game = service.make_move(game.game_id, player_id, Move(cell=4))
+
+    assert bin(game.game_field.o_mask).count("1") == 1
+    assert verbs(statements) == expected
+
+
+@pytest.mark.parametrize(
+    "cached, expected", [(False, ["SELECT", "UPDATE"]), (True, ["UPDATE"])]
+)
+def test_pvp_move_with_turn_switch_is_one_update(session, statements, cached, expected):
+    service = make_service(session, cached)
+    first, second = uuid4(), uuid4()
+    game = service.create_game(first, GameType.PVP)
+    service.join_game(game.game_id, second)
+    session.remove()
+    statements.clear()
+
+    game = service.make_move(game.game_id, first, Move(cell=0))
+
+    assert game.current_player_id == second
+    assert verbs(statements) == expected
+
+
+def test_statements_per_move_do_not_grow_with_game_length(session, statements):
+    service = make_service(session, cached=True)
+    first, second = uuid4(), uuid4()
+    game = service.create_game(first, GameType.PVP, board_size=5, win_length=5)
+    service.join_game(game.game_id, second)
+
+    # Ходы по столбцам без собранной линии: партия не заканчивается
+    players = [first, second]
+    for turn, cell in enumerate([0, 1, 5, 6, 10, 11, 15, 16]):
+        statements.clear()
+        service.make_move(game.game_id, players[turn % 2], Move(cell=cell))
+        assert verbs(statements) == ["UPDATE"]
@@ -0,0 +1,89 @@
+import hashlib
+import threading
+from uuid import uuid4
+
+from domain.service.password_hasher import PasswordHasher
+
+
+def registered(client, password="secret"):
+    login = f"user-{uuid4().hex[:12]}"
+    client.post("/auth/register", json={"login": login, "password": password})
+    return login
+
+
+def test_legacy_sha256_password_is_rehashed_on_login(client, container):
+    users = container.user_service
+    login = registered(client)
+    user = users.find_by_login(login)
+    users.user_repository.update_password(
+        user.user_id, hashlib.sha256(b"secret").hexdigest()
+    )
+
+    response = client.post("/auth/login", json={"login": login, "password": "secret"})
+
+    assert response.status_code == 200
+    hashed = users.find_by_login(login).password
+    assert hashed.startswith("scrypt$")
+    assert not users.password_hasher.needs_rehash(hashed)
+    response = client.post("/auth/login", json={"login": login, "password": "secret"})
+    assert response.status_code == 200
+
+
+def test_cost_change_needs_rehash():
+    old, new = PasswordHasher(cost=4), PasswordHasher(cost=5)
+    try:
+        hashed = old.hash("secret")
+
+        assert not old.needs_rehash(hashed)
+        assert new.needs_rehash(hashed)
+        assert new.verify("secret", hashed)
+        assert not new.needs_rehash(new.hash("secret"))
+        assert new.needs_rehash(hashlib.sha256(b"secret").hexdigest())
+    finally:
+        old.shutdown()
+        new.shutdown()
+
+
+def test_full_hash_pool_answers_503_with_retry_after(
+    app, client, container, monkeypatch
+):
+    login = registered(client)
+    # Один поток без очереди, занятый входом, который ждёт release
+    hasher = PasswordHasher(cost=4, workers=1, max_queue=0)
+    scrypt, release, started = hasher._scrypt, threading.Event(), threading.Event()
+
+    def blocking_scrypt(*args):
+        started.set()
+        release.wait(10)
+        return scrypt(*args)
+
+    monkeypatch.setattr(hasher, "_scrypt", blocking_scrypt)
+    monkeypatch.setattr(container.user_service, "password_hasher", hasher)
+    statuses = []
+    first = threading.Thread(
+        target=lambda: statuses.append(
+            app.test_client()
+            .post("/auth/login", json={"login": login, "password": "secret"})
+            .status_code
+        )
+    )
+    first.start()
+    try:
+        assert started.wait(10)
+
+        response = client.post(
+            "/auth/login", json={"login": login, "password": "secret"}
+        )
+        # Неизвестный логин тоже проверяется scrypt и упирается в тот же пул
+        unknown = client.post(
+            "/auth/login", json={"login": f"missing-{uuid4().hex}", "password": "x"}
+        )
+    finally:
+        release.set()
+        first.join(10)
+        hasher.shutdown()
+
+    assert response.status_code == 503
+    assert response.headers["Retry-After"] == "1"
+    assert unknown.status_code == 503
+    assert statuses == [200]
@@ -0,0 +1,35 @@
+import pytest
+
+from domain.service.position_analyzer import PositionAnalyzer
+from domain.service.tablebase import Tablebase
+
+
+@pytest.fixture(scope="module")
+def analyzer():
+    return PositionAnalyzer(Tablebase.build())
+
+
+def test_analyzes_flat_and_square_boards(analyzer):
+    analysis = analyzer.analyze([[1, 1, 1, 2, 2, 0, 0, 0, 0], [0] * 9])
+    assert analysis.winners == [1, None]
+    assert analysis.terminal == [True, False]
+    assert analysis.to_move == [None, 1]
+    assert analyzer.analyze([[[0] * 3] * 3]).to_move == [1]
+
+
+@pytest.mark.parametrize(
+    "cell",
+    [65537, -65535, 1.5, 1.0, "1", 10**30],
+)
+def test_rejects_cells_that_would_be_truncated_or_wrapped(analyzer, cell):
+    with pytest.raises(ValueError):
+        analyzer.analyze([[cell, 0, 0, 0, 0, 0, 0, 0, 0]])
+
+
+@pytest.mark.parametrize(
+    "boards",
+    [[[0] * 8], [[0] * 9, [[0] * 3] * 3], [[[0, 0], [0, 0, 0], [0, 0, 0]]], [5]],
+)
+def test_rejects_malformed_boards(analyzer, boards):
+    with pytest.raises(ValueError):
+        analyzer.analyze(boards)
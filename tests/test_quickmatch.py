@@ -0,0 +1,116 @@
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from uuid import uuid4
+
+import pytest
+
+from datasource.repository.game_repository import GameRepository
+from domain.model.game_state import GameState
+from domain.model.game_type import GameType
+from domain.model.move import Move
+from domain.service.game_service_impl import GameServiceImpl
+from domain.service.matchmaker import Matchmaker
+
+
+def make_service(session, matchmaker=None):
+    return GameServiceImpl(
+        GameRepository(session), matchmaker=matchmaker or Matchmaker()
+    )
+
+
+def test_repeat_returns_game_claimed_from_queue(session):
+    service = make_service(session)
+    first, second = uuid4(), uuid4()
+    waiting = service.quickmatch(first, 3, 3)
+
+    claimed = service.quickmatch(second, 3, 3)
+    repeated = service.quickmatch(first, 3, 3)
+
+    assert claimed.game_id == waiting.game_id
+    assert repeated.game_id == waiting.game_id
+    assert repeated.player2_id == second
+
+
+def test_repeat_returns_game_claimed_through_join(session):
+    service = make_service(session)
+    first, second = uuid4(), uuid4()
+    waiting = service.quickmatch(first, 3, 3)
+
+    service.join_game(waiting.game_id, second)
+    repeated = service.quickmatch(first, 3, 3)
+
+    assert repeated.game_id == waiting.game_id
+    assert repeated.game_state == GameState.PLAYER_TURN
+
+
+def test_repeat_returns_game_claimed_by_other_process(session):
+    # У второго процесса своя очередь: партию он находит только через БД
+    service, other = make_service(session), make_service(session)
+    first, second = uuid4(), uuid4()
+    waiting = service.quickmatch(first, 3, 3)
+
+    claimed = other.quickmatch(second, 3, 3)
+    repeated = service.quickmatch(first, 3, 3)
+
+    assert claimed.game_id == waiting.game_id
+    assert repeated.game_id == waiting.game_id
+
+
+def test_repeat_in_other_process_returns_waiting_game(session):
+    # Повторный запрос попал в другой процесс: там очередь о партии не знает
+    service, other = make_service(session), make_service(session)
+    first = uuid4()
+    waiting = service.quickmatch(first, 3, 3)
+
+    repeated = other.quickmatch(first, 3, 3)
+
+    assert repeated.game_id == waiting.game_id
+    assert repeated.game_state == GameState.WAITING_FOR_PLAYER
+
+
+def test_repeat_after_finished_game_looks_for_new_opponent(session):
+    service = make_service(session)
+    first, second = uuid4(), uuid4()
+    game = service.quickmatch(first, 3, 3)
+    service.join_game(game.game_id, second)
+    for cell, player in [(0, first), (3, second), (1, first), (4, second), (2, first)]:
+        game = service.make_move(game.game_id, player, Move(cell=cell))
+    assert game.game_state == GameState.PLAYER_WON
+
+    repeated = service.quickmatch(first, 3, 3)
+
+    assert repeated.game_id != game.game_id
+
+
+@pytest.mark.slow
+@pytest.mark.parametrize("players", [2000])
+def test_simultaneous_joiners_each_get_one_game(session, players):
+    matchmaker = Matchmaker()
+    services = [make_service(session, matchmaker), make_service(session)]
+    player_ids = [uuid4() for _ in range(players)]
+
+    def quickmatch(index):
+        # Второй сервис изображает другой процесс со своей очередью
+        service = services[index % 2]
+        try:
+            return service.quickmatch(player_ids[index], 6, 4)
+        finally:
+            session.remove()
+
+    with ThreadPoolExecutor(max_workers=64) as executor:
+        games = list(executor.map(quickmatch, range(players)))
+        # Повторный запрос каждого игрока возвращает ту же партию
+        repeated = list(executor.map(quickmatch, range(players)))
+
+    seats = Counter()
+    waiting = 0
+    for game_id in {game.game_id for game in games}:
+        game = services[0].get_game(game_id)
+        seats.update(player for player in (game.player1_id, game.player2_id) if player)
+        waiting += game.game_state == GameState.WAITING_FOR_PLAYER
+        assert game.game_type == GameType.PVP
+    assert set(seats) == set(player_ids)
+    assert max(seats.values()) == 1
+    assert [game.game_id for game in repeated] == [game.game_id for game in games]
+    # Ждут соперника лишь те, кто разминулся с другими в одновременных запросах
+    assert waiting < players // 10
@@ -0,0 +1,117 @@
+from uuid import uuid4
+
+import pytest
+
+from datasource.repository.game_repository import GameRepository
+from domain.model.game_type import GameType
+from domain.model.move import Move
+from domain.service.alpha_beta_engine import AlphaBetaEngine
+from domain.service.game_cache import GameCache
+from domain.service.game_rules import GameRules
+from domain.service.game_service_impl import GameServiceImpl
+
+fakeredis = pytest.importorskip("fakeredis")
+redis = pytest.importorskip("redis")
+
+from datasource.redis_cache_backend import RedisCacheBackend  # noqa: E402
+
+
+@pytest.fixture
+def server():
+    return fakeredis.FakeServer()
+
+
+@pytest.fixture
+def backend(server, monkeypatch):
+    # Узлы с общим сервером Redis в памяти теста
+    def connect(client_class=fakeredis.FakeRedis):
+        monkeypatch.setattr(
+            redis.Redis,
+            "from_url",
+            lambda url, **kwargs: client_class(server=server),
+        )
+        return RedisCacheBackend("redis://cache")
+
+    return connect
+
+
+def test_stale_write_is_rejected(backend):
+    cache = backend()
+
+    assert cache.set("game", b"new", 60, version=2)
+    assert not cache.set("game", b"old", 60, version=1)
+    # Повтор той же версии не считается устаревшей записью
+    assert not cache.set("game", b"new", 60, version=2)
+
+    assert cache.get("game") == b"new"
+    assert cache.get_stats()["stale_writes"] == 1
+
+
+def test_newer_write_between_watch_and_exec_wins(backend):
+    other = backend()
+    raced = []
+
+    class RacingRedis(fakeredis.FakeRedis):
+        # Другой узел записывает новую версию, пока эта запись под WATCH
+        def pipeline(self, *args, **kwargs):
+            pipe = super().pipeline(*args, **kwargs)
+            get = pipe.get
+
+            def racing_get(key):
+                value = get(key)
+                if not raced:
+                    raced.append(other.set(key, b"newer", 60, version=3))
+                return value
+
+            pipe.get = racing_get
+            return pipe
+
+    cache = backend(RacingRedis)
+
+    assert not cache.set("game", b"late", 60, version=2)
+    assert raced == [True]
+    assert cache.get("game") == b"newer"
+
+
+def test_pending_marker_blocks_late_old_version(backend):
+    cache = GameCache(backend())
+    game = GameRules([]).new_game(uuid4(), GameType.PVP)
+    cache.put(game)
+    old = cache.get(game.game_id)
+
+    game.version += 1
+    cache.pending(game)
+    cache.put(old)
+
+    assert cache.get(game.game_id) is None
+    cache.put(game)
+    assert cache.get(game.game_id).version == game.version
+    cache.invalidate(game.game_id)
+    assert cache.get(game.game_id) is None
+
+
+def test_many_and_delete(backend):
+    cache = backend()
+
+    cache.set_many({"a": b"1", "b": b"2"}, 60)
+    assert cache.get_many(["a", "missing", "b"]) == [b"1", None, b"2"]
+    cache.delete("a")
+    assert cache.get("a") is None
+
+
+def test_unreachable_redis_falls_back_to_database(session):
+    # Порт без сервера: каждое обращение к кэшу - ошибка соединения
+    backend = RedisCacheBackend("redis://127.0.0.1:1", socket_timeout=0.1)
+    service = GameServiceImpl(
+        GameRepository(session), engines=[AlphaBetaEngine()], cache=GameCache(backend)
+    )
+    first, second = uuid4(), uuid4()
+    game = service.create_game(first, GameType.PVP)
+    service.join_game(game.game_id, second)
+
+    game = service.make_move(game.game_id, first, Move(cell=0))
+
+    assert game.version == 3
+    assert service.get_game(game.game_id).game_field.x_mask == 1
+    assert backend.get_stats()["errors"] > 0
+    backend.close()
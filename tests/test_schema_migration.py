@@ -0,0 +1,63 @@
+from sqlalchemy import create_engine, text
+
+from datasource.migration.schema import add_missing_columns, add_missing_indexes
+
+
+def old_schema_engine(tmp_path):
+    # current_games до появления сложности, версий и времени записи
+    engine = create_engine(f"sqlite:///{tmp_path}/old.db")
+    with engine.begin() as connection:
+        connection.execute(
+            text(
+                "CREATE TABLE current_games (id INTEGER PRIMARY KEY,"
+                " game_id VARCHAR(36) NOT NULL, board_size SMALLINT NOT NULL,"
+                " x_mask BIGINT NOT NULL, o_mask BIGINT NOT NULL,"
+                " game_type VARCHAR(10) NOT NULL, game_state VARCHAR(30) NOT NULL,"
+                " win_length INTEGER NOT NULL, player1_id CHAR(32) NOT NULL,"
+                " player2_id CHAR(32), player1_symbol INTEGER NOT NULL,"
+                " player2_symbol INTEGER NOT NULL, current_player_id CHAR(32),"
+                " winner_id CHAR(32), created_at DATETIME NOT NULL)"
+            )
+        )
+        connection.execute(
+            text(
+                "INSERT INTO current_games VALUES (1, 'g', 3, 0, 0, 'pvp',"
+                " 'player_turn', 3, 'p1', NULL, 1, 2, 'p1', NULL, '2024-01-01')"
+            )
+        )
+    return engine
+
+
+def test_missing_columns_are_added_once(tmp_path):
+    engine = old_schema_engine(tmp_path)
+
+    added = add_missing_columns(engine)
+
+    assert added == [
+        "current_games.difficulty",
+        "current_games.version",
+        "current_games.updated_at",
+    ]
+    with engine.connect() as connection:
+        row = connection.execute(
+            text("SELECT difficulty, version, updated_at FROM current_games")
+        ).one()
+    assert tuple(row) == (None, 1, None)
+    assert add_missing_columns(engine) == []
+
+
+def test_missing_indexes_are_added_once(tmp_path):
+    engine = old_schema_engine(tmp_path)
+    add_missing_columns(engine)
+
+    added = add_missing_indexes(engine)
+
+    assert added == [
+        "ix_current_games_game_id",
+        "ix_current_games_player1_active",
+        "ix_current_games_player1_history",
+        "ix_current_games_player2_active",
+        "ix_current_games_player2_history",
+        "ix_current_games_waiting",
+    ]
+    assert add_missing_indexes(engine) == []
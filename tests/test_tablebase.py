@@ -0,0 +1,43 @@
+import mmap
+
+import pytest
+
+from domain.model.game_field import GameField
+from domain.model.player_symbol import PlayerSymbol
+from domain.service.tablebase import Tablebase
+
+
+@pytest.fixture(scope="module")
+def tablebase():
+    return Tablebase.build()
+
+
+@pytest.mark.parametrize(
+    "computer_symbol, positions", [(PlayerSymbol.O, 2097), (PlayerSymbol.X, 2423)]
+)
+def test_tablebase_matches_reference_minimax(tablebase, computer_symbol, positions):
+    # Все достижимые позиции, где ходит компьютер, сверяются с прежним _minimax
+    assert tablebase.verify(computer_symbol) == positions
+
+
+def test_saved_tablebase_loads_through_mmap(tablebase, tmp_path):
+    path = str(tmp_path / "tablebase.bin")
+    tablebase.save(path)
+
+    loaded = Tablebase.load(path)
+
+    assert isinstance(loaded.buffer, mmap.mmap)
+    assert bytes(loaded.buffer) == bytes(tablebase.buffer)
+    field = GameField().with_move(4, PlayerSymbol.X.value)
+    assert loaded.lookup(field, PlayerSymbol.O) == tablebase.lookup(
+        field, PlayerSymbol.O
+    )
+    loaded.buffer.close()
+
+
+def test_truncated_tablebase_file_is_rejected(tablebase, tmp_path):
+    path = tmp_path / "tablebase.bin"
+    path.write_bytes(bytes(tablebase.buffer)[:-1])
+
+    with pytest.raises(ValueError):
+        Tablebase.load(str(path))